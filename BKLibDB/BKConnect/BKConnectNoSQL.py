@@ -1,17 +1,58 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
-from pymongo import MongoClient
-from redis import Redis
-from cassandra.cluster import Cluster
-from neo4j import GraphDatabase
+import importlib
+import threading
+from contextlib import contextmanager
+
+
+def _import_driver(module, extra):
+    """
+    Importa el driver de un backend NoSQL en el momento de usarlo por primera vez,
+    de modo que los procesos que no lo usan no pagan su coste de importación.
+
+    Args:
+        module (str): Módulo a importar (e.g., "pymongo", "cassandra.cluster").
+        extra (str): Extra de instalación que lo proporciona.
+
+    Raises:
+        ImportError: Si el driver no está instalado.
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"El driver '{module}' no está instalado. Instálalo con: pip install BKLibDB[{extra}]"
+        ) from e
+
 
 class BKConnectNoSQL:
     """
     Clase para manejar conexiones a bases de datos NoSQL.
     Proporciona soporte para MongoDB, Redis, Cassandra y Neo4j.
+
+    Los clientes se guardan en un registro compartido por todo el proceso, indexado por
+    los parámetros de conexión: todas las instancias (y los managers) que usan el mismo
+    servidor con la misma configuración comparten un único cliente con su pool de
+    conexiones. El cliente se cierra cuando se libera la última referencia.
+
+    Opciones de pool y tiempos de espera por tipo:
+        MONGO: host, port, max_pool_size, min_pool_size, connect_timeout, socket_timeout,
+            max_idle_time (segundos).
+        REDIS: host, port, db, max_connections, socket_timeout, socket_connect_timeout,
+            socket_keepalive, health_check_interval.
+        CASSANDRA: hosts, port, keyspace, connect_timeout, executor_threads,
+            idle_heartbeat_interval.
+        NEO4J: host, port (o uri), username, password, max_connection_pool_size,
+            connection_acquisition_timeout, connection_timeout, keep_alive,
+            max_connection_lifetime.
+    Cualquier otro argumento se pasa tal cual al constructor del driver.
     """
 
+    _clients = {}  # clave -> {"client": ..., "refs": int, "sessions": {...}}
+    _lock = threading.Lock()
+    _key_locks = {}  # clave -> [Lock, usuarios], solo mientras alguien lo usa (ver _key_lock)
+
     def __init__(self, db_type, **kwargs):
         """
         Inicializa la conexión a una base de datos NoSQL.
@@ -21,9 +62,128 @@ class BKConnectNoSQL:
             kwargs (dict): Parámetros de conexión específicos según el tipo de base de datos.
         """
         self.db_type = db_type.upper()
-        self.connection = self._connect(db_type=self.db_type, **kwargs)
+        self._kwargs = kwargs
+        self.connection = self.get_client(self.db_type, **kwargs)
+
+    @staticmethod
+    def _freeze(value):
+        """
+        Convierte un valor en algo hashable para usarlo como parte de la clave del registro.
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((k, BKConnectNoSQL._freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(BKConnectNoSQL._freeze(v) for v in value)
+        return value
+
+    @classmethod
+    def _make_key(cls, db_type, kwargs):
+        # En Cassandra el keyspace no forma parte de la clave: un Cluster sirve a todos
+        params = {k: v for k, v in kwargs.items() if not (db_type == "CASSANDRA" and k == "keyspace")}
+        return db_type, cls._freeze(params)
+
+    @classmethod
+    @contextmanager
+    def _key_lock(cls, key):
+        """
+        Serializa la conexión y el cierre del cliente de `key`. El lock se descarta
+        cuando ningún hilo lo usa, para que no se acumulen los de claves ya cerradas.
+        """
+        with cls._lock:
+            holder = cls._key_locks.get(key)
+            if holder is None:
+                holder = cls._key_locks[key] = [threading.Lock(), 0]
+            holder[1] += 1
+        try:
+            with holder[0]:
+                yield
+        finally:
+            with cls._lock:
+                holder[1] -= 1
+                if holder[1] == 0:
+                    del cls._key_locks[key]
+
+    @staticmethod
+    def _handle(db_type, entry, keyspace):
+        return entry["sessions"][keyspace] if db_type == "CASSANDRA" else entry["client"]
 
-    def _connect(self, db_type, **kwargs):
+    @classmethod
+    def get_client(cls, db_type, **kwargs):
+        """
+        Devuelve el cliente compartido para estos parámetros, creándolo si no existe,
+        e incrementa su contador de referencias. En Cassandra devuelve una sesión
+        del Cluster compartido, una por keyspace.
+
+        La conexión se establece fuera del lock del registro, de modo que un servidor
+        lento o inaccesible no bloquea a los demás; un lock por clave evita abrir dos
+        clientes para los mismos parámetros. Si la conexión falla no se registra nada.
+
+        Returns:
+            object: Cliente o sesión de la base de datos.
+        """
+        db_type = db_type.upper()
+        key = cls._make_key(db_type, kwargs)
+        keyspace = kwargs.get("keyspace")
+        with cls._lock:
+            entry = cls._clients.get(key)
+            if entry is not None and (db_type != "CASSANDRA" or keyspace in entry["sessions"]):
+                entry["refs"] += 1
+                return cls._handle(db_type, entry, keyspace)
+
+        with cls._key_lock(key):
+            with cls._lock:
+                entry = cls._clients.get(key)
+            created = entry is None
+            if created:
+                entry = {"client": cls._connect(db_type, **kwargs), "refs": 0, "sessions": {}}
+            session = None
+            if db_type == "CASSANDRA" and keyspace not in entry["sessions"]:
+                try:
+                    session = entry["client"].connect(keyspace)
+                except Exception:
+                    if created:
+                        entry["client"].shutdown()
+                    raise
+            with cls._lock:
+                if session is not None:
+                    entry["sessions"][keyspace] = session
+                cls._clients[key] = entry
+                entry["refs"] += 1
+                return cls._handle(db_type, entry, keyspace)
+
+    @classmethod
+    def release(cls, db_type, **kwargs):
+        """
+        Libera una referencia obtenida con `get_client`. Cierra el cliente cuando
+        no quedan referencias.
+        """
+        db_type = db_type.upper()
+        key = cls._make_key(db_type, kwargs)
+        # Con el lock de la clave: no se cierra un cliente mientras otro hilo lo conecta
+        with cls._key_lock(key):
+            with cls._lock:
+                entry = cls._clients.get(key)
+                if entry is None:
+                    return
+                entry["refs"] -= 1
+                if entry["refs"] > 0:
+                    return
+                del cls._clients[key]
+            cls._close_client(db_type, entry)
+
+    @classmethod
+    def close_all(cls):
+        """
+        Cierra todos los clientes del registro, tengan o no referencias activas.
+        """
+        with cls._lock:
+            entries = list(cls._clients.items())
+            cls._clients.clear()
+        for (db_type, _), entry in entries:
+            cls._close_client(db_type, entry)
+
+    @staticmethod
+    def _connect(db_type, **kwargs):
         """
         Establece la conexión a la base de datos NoSQL especificada.
 
@@ -32,36 +192,90 @@ class BKConnectNoSQL:
             kwargs (dict): Parámetros de conexión.
 
         Returns:
-            object: Conexión al cliente de la base de datos.
+            object: Cliente de la base de datos (en Cassandra, el Cluster).
         """
+        options = dict(kwargs)
         if db_type == "MONGO":
-            return MongoClient(kwargs.get("host", "localhost"), kwargs.get("port", 27017))
+            MongoClient = _import_driver("pymongo", "mongo").MongoClient
+            host = options.pop("host", "localhost")
+            port = options.pop("port", 27017)
+            connect_timeout = options.pop("connect_timeout", 20)
+            socket_timeout = options.pop("socket_timeout", None)
+            max_idle_time = options.pop("max_idle_time", None)
+            return MongoClient(
+                host,
+                port,
+                maxPoolSize=options.pop("max_pool_size", 100),
+                minPoolSize=options.pop("min_pool_size", 0),
+                connectTimeoutMS=int(connect_timeout * 1000),
+                socketTimeoutMS=int(socket_timeout * 1000) if socket_timeout else None,
+                maxIdleTimeMS=int(max_idle_time * 1000) if max_idle_time else None,
+                **options,
+            )
         elif db_type == "REDIS":
-            return Redis(host=kwargs.get("host", "localhost"), port=kwargs.get("port", 6379))
+            redis = _import_driver("redis", "redis")
+            pool = redis.ConnectionPool(
+                host=options.pop("host", "localhost"),
+                port=options.pop("port", 6379),
+                db=options.pop("db", 0),
+                max_connections=options.pop("max_connections", 50),
+                socket_timeout=options.pop("socket_timeout", None),
+                socket_connect_timeout=options.pop("socket_connect_timeout", None),
+                socket_keepalive=options.pop("socket_keepalive", True),
+                health_check_interval=options.pop("health_check_interval", 30),
+                **options,
+            )
+            return redis.Redis(connection_pool=pool)
         elif db_type == "CASSANDRA":
-            cluster = Cluster(kwargs.get("hosts", ["localhost"]))
-            return cluster.connect(kwargs.get("keyspace"))
+            options.pop("keyspace", None)
+            Cluster = _import_driver("cassandra.cluster", "cassandra").Cluster
+            return Cluster(
+                options.pop("hosts", ["localhost"]),
+                port=options.pop("port", 9042),
+                connect_timeout=options.pop("connect_timeout", 5),
+                executor_threads=options.pop("executor_threads", 2),
+                idle_heartbeat_interval=options.pop("idle_heartbeat_interval", 30),
+                **options,
+            )
         elif db_type == "NEO4J":
-            uri = f"bolt://{kwargs.get('host', 'localhost')}:{kwargs.get('port', 7687)}"
-            return GraphDatabase.driver(uri, auth=(kwargs.get("username"), kwargs.get("password")))
+            host = options.pop("host", "localhost")
+            port = options.pop("port", 7687)
+            uri = options.pop("uri", None) or f"bolt://{host}:{port}"
+            auth = (options.pop("username", None), options.pop("password", None))
+            GraphDatabase = _import_driver("neo4j", "neo4j").GraphDatabase
+            return GraphDatabase.driver(
+                uri,
+                auth=auth,
+                max_connection_pool_size=options.pop("max_connection_pool_size", 100),
+                connection_acquisition_timeout=options.pop("connection_acquisition_timeout", 60),
+                connection_timeout=options.pop("connection_timeout", 30),
+                keep_alive=options.pop("keep_alive", True),
+                max_connection_lifetime=options.pop("max_connection_lifetime", 3600),
+                **options,
+            )
         else:
             raise ValueError(f"Unsupported NoSQL database type: {db_type}")
 
+    @staticmethod
+    def _close_client(db_type, entry):
+        client = entry["client"]
+        if db_type == "CASSANDRA":
+            for session in entry["sessions"].values():
+                session.shutdown()
+            client.shutdown()
+        else:
+            client.close()
+
     def close(self):
         """
-        Cierra la conexión a la base de datos.
-        """
-        if self.db_type == "MONGO":
-            self.connection.close()
-        elif self.db_type == "REDIS":
-            self.connection.close()
-        elif self.db_type == "CASSANDRA":
-            self.connection.cluster.shutdown()
-            self.connection.shutdown()
-        elif self.db_type == "NEO4J":
-            self.connection.close()
-        else:
+        Libera la conexión. El cliente compartido solo se cierra cuando
+        ninguna otra instancia o manager lo está usando.
+        """
+        if self.db_type not in ("MONGO", "REDIS", "CASSANDRA", "NEO4J"):
             raise ValueError(f"Unsupported NoSQL database type: {self.db_type}")
+        if self.connection is not None:
+            self.release(self.db_type, **self._kwargs)
+            self.connection = None
 
     def get_connection(self):
         """
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Agregados (SUM, COUNT, AVG por grupo) mantenidos en memoria a partir de los hooks
+after_insert/after_update/after_delete de un manager.
+
+El agregado se carga una vez con una consulta que devuelve una fila por registro (con
+su clave primaria) y guarda, por clave, los valores de las columnas que usa. Cada
+escritura del manager sustituye la fila de su clave y corrige los grupos afectados con
+la diferencia, de modo que aplicar dos veces el mismo evento no altera el resultado.
+
+Las escrituras que no pasan por los hooks (upsert_many, SQL externo) o cuyos
+parámetros no incluyen la clave primaria no se pueden aplicar: marcan el agregado como
+desfasado y la siguiente lectura lo reconcilia con la base de datos. La reconciliación
+también se hace cada `reconcile_every` segundos.
+"""
+
+import math
+import threading
+import time
+from decimal import Decimal
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import text
+
+FUNCTIONS = ("sum", "count", "avg")
+
+
+def _add(total, value, sign):
+    if isinstance(total, Decimal) and isinstance(value, float):
+        value = Decimal(str(value))
+    elif isinstance(total, float) and isinstance(value, Decimal):
+        value = float(value)
+    return total + value if sign > 0 else total - value
+
+
+def _same(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+class BKAggregate:
+    """
+    Agregado declarativo de un manager. Al declararlo como atributo de la clase se
+    registra en sus hooks after_*.
+
+    Args:
+        group_by (str | tuple[str]): Columnas de agrupación (vacío: un único grupo).
+        measures (dict): {nombre: (función, columna)}, con función "sum", "count" o
+            "avg". `("count", None)` cuenta filas; con columna, valores no nulos.
+        key (str | tuple[str], opcional): Clave primaria. Por defecto, la del modelo
+            del manager.
+        sql (str, opcional): Consulta de carga, con una fila por registro y las columnas
+            de la clave, `group_by`, `measures` y `columns`. Por defecto,
+            `SELECT ... FROM <table>` del manager.
+        params (dict, opcional): Parámetros de `sql`.
+        where (callable, opcional): Filtro de filas `where(fila) -> bool`. Las filas que
+            no lo cumplen se guardan pero no cuentan en los grupos (la consulta de carga
+            no debe filtrarlas, para poder seguir sus cambios).
+        columns (tuple[str], opcional): Columnas adicionales que necesita `where`.
+        reconcile_every (float, opcional): Segundos entre reconciliaciones.
+
+    Example:
+        class VentaManager(BKManagerDB):
+            auto_sql = True
+            table = "ventas"
+            por_region = BKAggregate(
+                group_by="region",
+                measures={"total": ("sum", "importe"), "ventas": ("count", None)},
+                reconcile_every=300,
+            )
+
+        VentaManager.por_region.seed(manager)
+        VentaManager.por_region.get("norte")  # {"total": ..., "ventas": ...}
+    """
+    def __init__(self, group_by=(), measures=None, key=None, sql=None, params=None,
+                 where=None, columns=(), reconcile_every=None):
+        if not measures:
+            raise ValueError("BKAggregate requiere al menos una medida.")
+        for name, (function, column) in measures.items():
+            if function not in FUNCTIONS:
+                raise ValueError(f"Función de agregado no soportada en '{name}': {function}")
+            if column is None and function != "count":
+                raise ValueError(f"La medida '{name}' ({function}) requiere una columna.")
+        self.group_by = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+        self.measures = dict(measures)
+        self.key = (key,) if isinstance(key, str) else (tuple(key) if key else None)
+        self.sql = sql
+        self.params = params or {}
+        self.where = where
+        self.extra_columns = tuple(columns)
+        self.reconcile_every = reconcile_every
+        self.name = None
+        # Columnas con valores por medida (sin repetir)
+        self._value_columns = tuple(dict.fromkeys(
+            column for _, column in self.measures.values() if column is not None
+        ))
+
+        self._lock = threading.RLock()
+        self._Session = None
+        self._rows = {}      # clave -> {columna: valor}
+        self._groups = {}    # grupo -> [filas, sumas..., no nulos...]
+        self._seeded = False
+        self._stale = False
+        self._replay = None  # Eventos recibidos durante una reconciliación
+        self._reconciled_at = None
+        self._stats = {"events": 0, "stale_events": 0, "reconciliations": 0, "drift": 0}
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        owner.add_hook("after_insert", self._on_insert)
+        owner.add_hook("after_update", self._on_update)
+        owner.add_hook("after_delete", self._on_delete)
+
+    # --- Carga y reconciliación ---
+
+    def _columns(self):
+        return tuple(dict.fromkeys(self.key + self.group_by + self._value_columns + self.extra_columns))
+
+    def seed(self, manager):
+        """
+        Carga el agregado desde la base de datos de `manager`. Las reconciliaciones
+        posteriores abren sus propias sesiones sobre el mismo motor.
+
+        Returns:
+            BKAggregate: El propio agregado.
+
+        Raises:
+            ValueError: Si no se puede deducir la clave o la consulta de carga.
+        """
+        if self.key is None:
+            model = manager.model
+            keys = model.get_primary_keys() if model is not None and hasattr(model, "get_primary_keys") else ()
+            if not keys:
+                raise ValueError("BKAggregate requiere `key` o un modelo con primary_key=True.")
+            self.key = tuple(keys)
+        if self.sql is None:
+            table = getattr(manager, "table", None)
+            if not table:
+                raise ValueError("BKAggregate requiere `sql` o `table` en el manager.")
+            self.sql = f"SELECT {', '.join(self._columns())} FROM {table}"
+        self._Session = sessionmaker(bind=manager.session.get_bind())
+        self.reconcile()
+        return self
+
+    def reconcile(self):
+        """
+        Vuelve a cargar el agregado desde la base de datos. Las escrituras recibidas
+        mientras se ejecuta la consulta se aplican de nuevo sobre el resultado.
+
+        Returns:
+            int: Número de grupos que diferían del estado en memoria.
+        """
+        if self._Session is None:
+            raise ValueError("El agregado no está inicializado: llamar antes a seed(manager).")
+        with self._lock:
+            if self._replay is not None:
+                return 0  # Ya hay una reconciliación en curso
+            self._replay = []
+            # La consulta ya incluye lo que marcó el agregado como desfasado
+            self._stale = False
+        try:
+            with self._Session() as session:
+                result = session.execute(text(self.sql), self.params).mappings()
+                rows = [dict(row) for row in result]
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+
+        with self._lock:
+            previous = self._snapshot() if self._seeded else None
+            self._rows = {}
+            self._groups = {}
+            for row in rows:
+                self._apply(self._row_key(row), row)
+            for key, values, partial in self._replay:
+                self._event(key, values, partial)
+            self._replay = None
+            self._seeded = True
+            self._reconciled_at = time.monotonic()
+            self._stats["reconciliations"] += 1
+            drift = 0
+            if previous is not None:
+                current = self._snapshot()
+                for group in set(previous) | set(current):
+                    old, new = previous.get(group), current.get(group)
+                    if old is None or new is None or any(not _same(old[m], new[m]) for m in self.measures):
+                        drift += 1
+                self._stats["drift"] += drift
+            return drift
+
+    def invalidate(self):
+        """
+        Marca el agregado como desfasado: la siguiente lectura lo reconcilia.
+        """
+        with self._lock:
+            self._stale = True
+
+    def _fresh(self):
+        if not self._seeded:
+            raise ValueError("El agregado no está inicializado: llamar antes a seed(manager).")
+        due = (
+            self.reconcile_every is not None
+            and time.monotonic() - self._reconciled_at >= self.reconcile_every
+        )
+        if (self._stale or due) and self._replay is None:
+            self.reconcile()
+
+    # --- Aplicación de cambios ---
+
+    def _row_key(self, row):
+        return tuple(row.get(column) for column in self.key)
+
+    def _contribute(self, row, sign):
+        if self.where is not None and not self.where(row):
+            return
+        group = tuple(row.get(column) for column in self.group_by)
+        width = len(self._value_columns)
+        state = self._groups.get(group)
+        if state is None:
+            state = self._groups[group] = [0] * (1 + 2 * width)
+        state[0] += sign
+        for index, column in enumerate(self._value_columns):
+            value = row.get(column)
+            if value is not None:
+                state[1 + index] = _add(state[1 + index], value, sign)
+                state[1 + width + index] += sign
+        if state[0] == 0:
+            del self._groups[group]
+
+    def _apply(self, key, row):
+        """
+        Sustituye la fila de `key` (None la elimina) y corrige sus grupos.
+        """
+        old = self._rows.pop(key, None)
+        if old is not None:
+            self._contribute(old, -1)
+        if row is not None:
+            self._rows[key] = row
+            self._contribute(row, 1)
+
+    def _event(self, key, values, partial):
+        """
+        Aplica un evento: `values` None es un borrado; con `partial`, solo trae las
+        columnas modificadas.
+
+        Un borrado o una actualización de una clave que no está en memoria (e.g., una
+        fila insertada con clave generada por la base de datos) marca el agregado como
+        desfasado: no se sabe qué aportaba la fila a los grupos.
+        """
+        if values is None or partial:
+            old = self._rows.get(key)
+            if old is None:
+                self._stale = True
+                self._stats["stale_events"] += 1
+                return
+            if values is not None:
+                values = {**old, **values}
+        self._apply(key, values)
+
+    def _on_write(self, params, operation):
+        if (not self._seeded and self._replay is None) or not isinstance(params, dict):
+            return
+        columns = self._columns()
+        values = {column: params[column] for column in columns if column in params}
+        key = tuple(values.get(column) for column in self.key)
+        with self._lock:
+            self._stats["events"] += 1
+            if any(part is None for part in key):
+                if operation == "insert" and all(column in values for column in columns if column not in self.key):
+                    # Clave generada por la base de datos: cuenta en su grupo, pero no se
+                    # guarda su fila; su borrado o actualización obligará a reconciliar
+                    self._contribute(values, 1)
+                    if self._replay is not None:
+                        self._stale = True
+                else:
+                    self._stale = True
+                    self._stats["stale_events"] += 1
+                return
+            event = (key, None if operation == "delete" else values, operation == "update")
+            self._event(*event)
+            if self._replay is not None:
+                self._replay.append(event)
+
+    def _on_insert(self, manager, params):
+        self._on_write(params, "insert")
+
+    def _on_update(self, manager, params):
+        self._on_write(params, "update")
+
+    def _on_delete(self, manager, params):
+        self._on_write(params, "delete")
+
+    # --- Lectura ---
+
+    def _measures(self, state):
+        width = len(self._value_columns)
+        result = {}
+        for name, (function, column) in self.measures.items():
+            if column is None:
+                result[name] = state[0]
+                continue
+            index = self._value_columns.index(column)
+            total, count = state[1 + index], state[1 + width + index]
+            if function == "sum":
+                result[name] = total if count else None
+            elif function == "count":
+                result[name] = count
+            else:
+                result[name] = total / count if count else None
+        return result
+
+    def get(self, *group):
+        """
+        Devuelve las medidas de un grupo (sin argumentos si no hay `group_by`).
+
+        Returns:
+            dict | None: {medida: valor}, o None si el grupo no tiene filas.
+        """
+        self._fresh()
+        with self._lock:
+            state = self._groups.get(group)
+            return self._measures(state) if state is not None else None
+
+    def groups(self):
+        """
+        Returns:
+            dict: {grupo (tupla): {medida: valor}} de todos los grupos con filas.
+        """
+        self._fresh()
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {group: self._measures(state) for group, state in self._groups.items()}
+
+    def stats(self):
+        """
+        Returns:
+            dict: `rows` y `groups` en memoria, `events` aplicados, `stale_events` que
+            obligaron a reconciliar, `reconciliations` y `drift` (grupos corregidos al
+            reconciliar).
+        """
+        with self._lock:
+            return {"rows": len(self._rows), "groups": len(self._groups), **self._stats}
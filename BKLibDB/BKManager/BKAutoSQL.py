@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Generación de sentencias CRUD a partir de los metadatos BKColumn de un modelo.
+
+Las sentencias usan parámetros nombrados (`:columna`) y se cachean por tabla y
+subconjunto de columnas, de modo que cada combinación se construye una sola vez.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1024)
+def build_insert(table, columns):
+    """
+    Args:
+        table (str): Nombre de la tabla (con esquema si aplica).
+        columns (tuple[str]): Columnas a insertar.
+
+    Returns:
+        str: Sentencia INSERT.
+    """
+    names = ", ".join(columns)
+    placeholders = ", ".join(f":{column}" for column in columns)
+    return f"INSERT INTO {table} ({names}) VALUES ({placeholders})"
+
+
+@lru_cache(maxsize=1024)
+def build_update(table, columns, keys):
+    """
+    Args:
+        table (str): Nombre de la tabla.
+        columns (tuple[str]): Columnas a actualizar.
+        keys (tuple[str]): Columnas de clave primaria para el WHERE.
+
+    Returns:
+        str: Sentencia UPDATE.
+    """
+    assignments = ", ".join(f"{column} = :{column}" for column in columns)
+    return f"UPDATE {table} SET {assignments} WHERE {_where(keys)}"
+
+
+@lru_cache(maxsize=1024)
+def build_delete(table, keys):
+    """
+    Args:
+        table (str): Nombre de la tabla.
+        keys (tuple[str]): Columnas de clave primaria para el WHERE.
+
+    Returns:
+        str: Sentencia DELETE.
+    """
+    return f"DELETE FROM {table} WHERE {_where(keys)}"
+
+
+@lru_cache(maxsize=1024)
+def build_select(table, keys):
+    """
+    Args:
+        table (str): Nombre de la tabla.
+        keys (tuple[str]): Columnas de clave primaria para el WHERE.
+
+    Returns:
+        str: Sentencia SELECT de una fila por clave primaria.
+    """
+    return f"SELECT * FROM {table} WHERE {_where(keys)}"
+
+
+@lru_cache(maxsize=1024)
+def build_upsert(dialect, table, columns, keys):
+    """
+    Genera un INSERT que actualiza la fila si ya existe, según el dialecto:
+    `ON CONFLICT ... DO UPDATE` (PostgreSQL, SQLite), `ON DUPLICATE KEY UPDATE`
+    (MySQL/MariaDB) o `MERGE` (SQL Server, Oracle).
+
+    Args:
+        dialect (str): Nombre del dialecto SQLAlchemy.
+        table (str): Nombre de la tabla.
+        columns (tuple[str]): Columnas a insertar.
+        keys (tuple[str]): Columnas que identifican el conflicto.
+
+    Returns:
+        str: Sentencia de upsert para una fila.
+
+    Raises:
+        NotImplementedError: Si el dialecto no está soportado.
+    """
+    names = ", ".join(columns)
+    placeholders = ", ".join(f":{column}" for column in columns)
+    updates = [column for column in columns if column not in keys]
+
+    if dialect in ("postgresql", "sqlite"):
+        if updates:
+            action = "DO UPDATE SET " + ", ".join(f"{column} = EXCLUDED.{column}" for column in updates)
+        else:
+            action = "DO NOTHING"
+        return f"INSERT INTO {table} ({names}) VALUES ({placeholders}) ON CONFLICT ({', '.join(keys)}) {action}"
+
+    if dialect in ("mysql", "mariadb"):
+        assignments = ", ".join(f"{column} = VALUES({column})" for column in updates or keys[:1])
+        return f"INSERT INTO {table} ({names}) VALUES ({placeholders}) ON DUPLICATE KEY UPDATE {assignments}"
+
+    if dialect in ("mssql", "oracle"):
+        source = ", ".join(f":{column} AS {column}" for column in columns)
+        on = " AND ".join(f"tgt.{key} = src.{key}" for key in keys)
+        matched = ""
+        if updates:
+            matched = " WHEN MATCHED THEN UPDATE SET " + ", ".join(f"tgt.{column} = src.{column}" for column in updates)
+        insert = f" WHEN NOT MATCHED THEN INSERT ({names}) VALUES ({', '.join(f'src.{column}' for column in columns)})"
+        if dialect == "mssql":
+            return f"MERGE INTO {table} WITH (HOLDLOCK) AS tgt USING (SELECT {source}) AS src ON {on}{matched}{insert};"
+        return f"MERGE INTO {table} tgt USING (SELECT {source} FROM DUAL) src ON ({on}){matched}{insert}"
+
+    raise NotImplementedError(f"upsert no implementado para el dialecto {dialect}")
+
+
+def _where(keys):
+    return " AND ".join(f"{key} = :{key}" for key in keys)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+def make_key(*parts):
+    """
+    Construye una clave hashable a partir de valores arbitrarios (diccionarios,
+    listas...). Los diccionarios se ordenan por clave.
+    """
+    return tuple(_freeze(part) for part in parts)
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+        return tuple(_freeze(item) for item in items)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class BKTTLCache:
+    """
+    Caché LRU acotada con caducidad por entrada, segura entre hilos.
+
+    Args:
+        maxsize (int): Número máximo de entradas; al superarlo se descarta la menos usada.
+        ttl (float, opcional): Caducidad por defecto en segundos (None: no caduca).
+    """
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # clave -> (valor, instante de caducidad)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=MISSING):
+        """
+        Devuelve el valor de `key` o `default` si no está o ha caducado.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=MISSING):
+        """
+        Guarda `value` con la caducidad `ttl` (por defecto, la de la caché).
+        """
+        ttl = self.ttl if ttl is MISSING else ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=MISSING, predicate=None):
+        """
+        Elimina una clave, las que cumplan `predicate(clave)` o, sin argumentos, todas.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        with self._lock:
+            if key is not MISSING:
+                return 1 if self._data.pop(key, None) is not None else 0
+            if predicate is None:
+                removed = len(self._data)
+                self._data.clear()
+                return removed
+            keys = [cached for cached in self._data if predicate(cached)]
+            for cached in keys:
+                del self._data[cached]
+            return len(keys)
+
+    def stats(self):
+        """
+        Returns:
+            dict: `size`, `hits`, `misses`, `hit_ratio`, `evictions` y `expirations`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
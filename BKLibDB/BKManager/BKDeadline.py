@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Plazos (deadlines) por consulta.
+
+El plazo activo se guarda en una variable de contexto, por lo que se propaga a las
+llamadas anidadas de los managers (y a las tareas asyncio creadas dentro del bloque):
+
+    with deadline(2.0):
+        manager.getlist()          # todas las consultas comparten los 2 segundos
+        with deadline(5.0):        # un plazo interior nunca amplía el exterior
+            otro_manager.call_function("f")
+
+Cada sentencia ejecutada con un plazo activo recibe el tiempo restante como timeout
+del lado del servidor, según el dialecto:
+    - PostgreSQL: `statement_timeout` local a la transacción.
+    - MySQL/MariaDB: `max_execution_time` de la sesión (solo afecta a SELECT).
+    - SQLite: manejador de progreso que interrumpe la sentencia y `busy_timeout`.
+    - SQL Server (pyodbc): `timeout` de la conexión.
+    - Oracle (oracledb): `call_timeout` de la conexión.
+Además, si el driver lo permite, la sentencia se cancela desde el cliente al vencer
+el plazo. Los plazos vencidos se cuentan por dialecto y operación (ver `timeout_stats`).
+"""
+
+import contextvars
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+_deadline = contextvars.ContextVar("bk_deadline", default=None)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Se ha superado el plazo de la consulta.
+    """
+    pass
+
+
+@contextmanager
+def deadline(seconds):
+    """
+    Establece un plazo para las consultas del bloque. Si ya hay uno activo, se usa el
+    más restrictivo de los dos. Con `seconds=None` no cambia el plazo actual.
+
+    Args:
+        seconds (float | None): Segundos disponibles desde ahora.
+
+    Yields:
+        float | None: Instante límite (reloj monotónico) en vigor dentro del bloque.
+    """
+    current = _deadline.get()
+    if seconds is None:
+        yield current
+        return
+    target = time.monotonic() + seconds
+    if current is not None:
+        target = min(current, target)
+    token = _deadline.set(target)
+    try:
+        yield target
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """
+    Returns:
+        float | None: Segundos que quedan del plazo activo, o None si no hay plazo.
+    """
+    target = _deadline.get()
+    if target is None:
+        return None
+    return target - time.monotonic()
+
+
+def record_timeout(dialect, operation):
+    """
+    Cuenta un plazo vencido.
+    """
+    with _stats_lock:
+        _stats[(dialect, operation)] += 1
+
+
+def timeout_stats():
+    """
+    Returns:
+        dict: {(dialecto, operación): número de plazos vencidos}.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_timeout_stats():
+    """
+    Pone a cero los contadores de plazos vencidos.
+    """
+    with _stats_lock:
+        _stats.clear()
+
+
+def _server_timeout(connection, dialect, budget):
+    """
+    Aplica `budget` segundos como timeout del servidor a la conexión.
+
+    Returns:
+        callable: Restaura la configuración anterior.
+    """
+    milliseconds = max(1, int(budget * 1000))
+    dbapi = connection.connection.dbapi_connection
+
+    if dialect == "postgresql":
+        previous = connection.exec_driver_sql(
+            f"SELECT current_setting('statement_timeout'), set_config('statement_timeout', '{milliseconds}', true)"
+        ).scalar()
+        return lambda: connection.exec_driver_sql(
+            f"SELECT set_config('statement_timeout', '{previous}', true)"
+        )
+
+    if dialect in ("mysql", "mariadb"):
+        previous = connection.exec_driver_sql("SELECT @@SESSION.max_execution_time").scalar()
+        connection.exec_driver_sql(f"SET SESSION max_execution_time = {milliseconds}")
+        return lambda: connection.exec_driver_sql(f"SET SESSION max_execution_time = {int(previous or 0)}")
+
+    if dialect == "sqlite":
+        target = time.monotonic() + budget
+        previous = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        if not previous or previous > milliseconds:
+            connection.exec_driver_sql(f"PRAGMA busy_timeout = {milliseconds}")
+        # Devolver un valor distinto de cero interrumpe la sentencia en curso
+        dbapi.set_progress_handler(lambda: time.monotonic() > target, 1000)
+
+        def restore():
+            dbapi.set_progress_handler(None, 0)
+            connection.exec_driver_sql(f"PRAGMA busy_timeout = {int(previous or 0)}")
+        return restore
+
+    if dialect == "mssql" and hasattr(dbapi, "timeout"):
+        previous = dbapi.timeout
+        dbapi.timeout = max(1, math.ceil(budget))
+        return lambda: setattr(dbapi, "timeout", previous)
+
+    if dialect == "oracle" and hasattr(dbapi, "call_timeout"):
+        previous = dbapi.call_timeout
+        dbapi.call_timeout = milliseconds
+        return lambda: setattr(dbapi, "call_timeout", previous)
+
+    return lambda: None
+
+
+def _cancel(dbapi, fired):
+    fired.set()
+    cancel = getattr(dbapi, "cancel", None) or getattr(dbapi, "interrupt", None)
+    if cancel is not None:
+        try:
+            cancel()
+        except Exception:
+            pass
+
+
+@contextmanager
+def bounded(session, operation):
+    """
+    Ejecuta el bloque sujeto al plazo activo: aplica el timeout del servidor y
+    programa la cancelación del cliente. Sin plazo activo no hace nada.
+
+    Args:
+        session (sqlalchemy.orm.session.Session): Sesión que ejecuta las sentencias.
+        operation (str): Nombre de la operación, para los contadores.
+
+    Raises:
+        DeadlineExceeded: Si el plazo ya había vencido o vence durante el bloque.
+    """
+    budget = remaining()
+    if budget is None:
+        yield
+        return
+    dialect = session.get_bind().dialect.name
+    if budget <= 0:
+        record_timeout(dialect, operation)
+        raise DeadlineExceeded(f"{operation}: plazo vencido antes de ejecutar la consulta")
+
+    connection = session.connection()
+    dbapi = connection.connection.dbapi_connection
+    restore = _server_timeout(connection, dialect, budget)
+    fired = threading.Event()
+    timer = None
+    if dialect != "sqlite":
+        # En SQLite el manejador de progreso ya interrumpe la sentencia
+        timer = threading.Timer(budget, _cancel, (dbapi, fired))
+        timer.daemon = True
+        timer.start()
+    try:
+        yield
+    except Exception as e:
+        if fired.is_set() or remaining() <= 0:
+            record_timeout(dialect, operation)
+            raise DeadlineExceeded(f"{operation}: plazo de {budget:.3f}s superado") from e
+        raise
+    finally:
+        if timer is not None:
+            timer.cancel()
+        try:
+            restore()
+        except Exception:
+            # La transacción puede haber quedado abortada; el rollback posterior la limpia
+            pass
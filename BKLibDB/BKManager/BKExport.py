@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Exportación en streaming de resultados de consultas a CSV, JSON Lines y Parquet.
+
+Los lotes se escriben según se leen del cursor, por lo que la memoria usada depende
+del tamaño de lote y no del tamaño del resultado.
+"""
+
+import base64
+import csv
+import datetime
+import decimal
+import gzip
+import importlib
+import json
+import os
+import time
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float)):
+        return value
+    return _json_default(value)
+
+
+def _open_text(path, compress):
+    if compress == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    if compress is None:
+        return open(path, "w", encoding="utf-8", newline="")
+    raise ValueError(f"Compresión no soportada: {compress}")
+
+
+class _Stats:
+    def __init__(self, on_progress):
+        self.on_progress = on_progress
+        self.start = time.perf_counter()
+        self.rows = 0
+
+    def add(self, count):
+        self.rows += count
+        if self.on_progress:
+            self.on_progress(self.as_dict())
+
+    def as_dict(self, path=None):
+        seconds = time.perf_counter() - self.start
+        stats = {
+            "rows": self.rows,
+            "seconds": seconds,
+            "rows_per_sec": self.rows / seconds if seconds else 0.0,
+        }
+        if path is not None:
+            stats["bytes"] = os.path.getsize(path)
+        return stats
+
+
+def _write_csv(batches, path, compress, stats):
+    with _open_text(path, compress) as handle:
+        writer = csv.writer(handle)
+        header = None
+        for batch in batches:
+            if not batch:
+                continue
+            if header is None:
+                header = list(batch[0])
+                writer.writerow(header)
+            writer.writerows([_csv_value(row.get(name)) for name in header] for row in batch)
+            stats.add(len(batch))
+
+
+def _write_jsonl(batches, path, compress, stats):
+    with _open_text(path, compress) as handle:
+        for batch in batches:
+            handle.write("".join(
+                json.dumps(row, default=_json_default, ensure_ascii=False) + "\n" for row in batch
+            ))
+            stats.add(len(batch))
+
+
+# Filas retenidas como máximo para fijar el esquema Parquet (ver _write_parquet)
+SCHEMA_BUFFER_ROWS = 10000
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return _json_default(value)
+
+
+def _declared_type(pa, columns, name):
+    """
+    Tipo Arrow de la columna BKColumn `name`, o None si no está declarada o su tipo no
+    tiene equivalente directo.
+    """
+    types = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bytes: pa.binary(),
+        datetime.datetime: pa.timestamp("us"),
+        datetime.date: pa.date32(),
+    }
+    column = columns.get(name)
+    return types.get(column.coltype) if column is not None else None
+
+
+def _arrow_schema(pa, columns, rows):
+    """
+    Construye el esquema Arrow: tipos de BKColumn para las columnas declaradas y, para
+    el resto, el de sus valores no nulos en `rows`. Las columnas sin ningún valor se
+    exportan como texto.
+
+    Returns:
+        tuple: (esquema, nombres de las columnas exportadas como texto).
+    """
+    fields = []
+    as_text = set()
+    for name in (list(rows[0]) if rows else list(columns)):
+        arrow_type = _declared_type(pa, columns, name)
+        if arrow_type is None:
+            values = [row.get(name) for row in rows if row.get(name) is not None]
+            if values:
+                arrow_type = pa.array(values).type
+            else:
+                arrow_type = pa.string()
+                as_text.add(name)
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields), as_text
+
+
+def _write_parquet(batches, path, compress, stats, columns):
+    """
+    Las columnas sin tipo declarado toman el de sus primeros valores no nulos: los lotes
+    se retienen hasta que todas tienen alguno (como mucho SCHEMA_BUFFER_ROWS filas; las
+    que sigan sin valores se exportan como texto).
+    """
+    try:
+        pa = importlib.import_module("pyarrow")
+        pq = importlib.import_module("pyarrow.parquet")
+    except ImportError as e:
+        raise ImportError("La exportación a Parquet requiere pyarrow: pip install pyarrow") from e
+    writer = None
+    as_text = set()
+    buffered = []
+    pending = None  # Columnas sin tipo declarado que aún no tienen valores
+
+    def open_writer():
+        nonlocal writer, as_text
+        schema, as_text = _arrow_schema(pa, columns, [row for batch in buffered for row in batch])
+        writer = pq.ParquetWriter(path, schema, compression=compress or "snappy")
+        for batch in buffered:
+            write(batch)
+        buffered.clear()
+
+    def write(batch):
+        if as_text:
+            batch = [{**row, **{name: _text(row.get(name)) for name in as_text}} for row in batch]
+        writer.write_table(pa.Table.from_pylist(batch, schema=writer.schema))
+        stats.add(len(batch))
+
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            if writer is not None:
+                write(batch)
+                continue
+            if pending is None:
+                pending = {name for name in batch[0] if _declared_type(pa, columns, name) is None}
+            pending = {name for name in pending if all(row.get(name) is None for row in batch)}
+            buffered.append(batch)
+            if not pending or sum(map(len, buffered)) >= SCHEMA_BUFFER_ROWS:
+                open_writer()
+        if writer is None:
+            # Resultado vacío o corto: se escribe igualmente, con su esquema
+            open_writer()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_batches(batches, path, format="csv", compress=None, columns=None, on_progress=None):
+    """
+    Escribe lotes de filas en un fichero de forma incremental.
+
+    Args:
+        batches (iterable[list[dict]]): Lotes de filas (e.g., `BKManager.stream_query`).
+        path (str): Fichero de destino.
+        format (str): "csv", "jsonl" o "parquet" (requiere pyarrow).
+        compress (str, opcional): "gzip" para CSV/JSONL; en Parquet, el códec interno
+            ("gzip", "snappy", "zstd"...).
+        columns (dict[str, BKColumn], opcional): Columnas del modelo para fijar los tipos.
+        on_progress (callable, opcional): Recibe las estadísticas tras cada lote.
+
+    Returns:
+        dict: `rows`, `seconds`, `rows_per_sec` y `bytes` del fichero generado.
+    """
+    stats = _Stats(on_progress)
+    if format == "csv":
+        _write_csv(batches, path, compress, stats)
+    elif format == "jsonl":
+        _write_jsonl(batches, path, compress, stats)
+    elif format == "parquet":
+        _write_parquet(batches, path, compress, stats, columns or {})
+    else:
+        raise ValueError(f"Formato de exportación no soportado: {format}. Usa uno de {FORMATS}.")
+    return stats.as_dict(path if os.path.exists(path) else None)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+HOOK_NAMES = (
+    "before_insert", "after_insert",
+    "before_update", "after_update",
+    "before_delete", "after_delete",
+)
+
+_executor_lock = threading.Lock()
+
+
+def default_hook(func):
+    """
+    Marca un hook como implementación por defecto (vacía). El registro de hooks
+    lo ignora, de modo que las operaciones sin hooks reales no pagan su llamada.
+    """
+    func.__bk_default_hook__ = True
+    return func
+
+
+class BKAfterHookExecutor:
+    """
+    Ejecuta hooks after_* en un pool de hilos acotado. Cuando hay `max_pending`
+    hooks pendientes, `submit` se bloquea hasta que alguno termine (backpressure).
+    Los errores de los hooks se registran con logging y no llegan al llamador.
+    """
+    def __init__(self, max_workers=4, max_pending=1000):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bk-hooks")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, func, *args):
+        """
+        Encola `func(*args)`.
+
+        Returns:
+            concurrent.futures.Future: Future de la ejecución del hook.
+        """
+        self._slots.acquire()
+        try:
+            return self._executor.submit(self._run, func, args)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _run(self, func, args):
+        try:
+            return func(*args)
+        except Exception:
+            logger.exception("Error en hook en segundo plano %s", getattr(func, "__qualname__", func))
+        finally:
+            self._slots.release()
+
+    def shutdown(self, wait=True):
+        """
+        Detiene el executor. Con `wait=True` espera a que terminen los hooks pendientes.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+class BKHookMixin:
+    """
+    Despacho de hooks before_/after_ común a todos los managers.
+
+    Los hooks se resuelven una sola vez por clase: solo se registran los métodos
+    sobrescritos por la subclase, no las implementaciones por defecto marcadas con
+    `default_hook`. Si la clase se modifica en tiempo de ejecución, llamar a
+    `refresh_hooks()`. Los hooks asignados en una instancia también se ejecutan.
+
+    Con `async_after_hooks = True` los hooks after_* se ejecutan en un executor
+    acotado por clase, fuera del camino de escritura.
+    """
+    async_after_hooks = False
+    after_hooks_workers = 4
+    after_hooks_max_pending = 1000
+
+    @classmethod
+    def _hook_registry(cls):
+        """
+        Devuelve {nombre_hook: (funciones,)} con los hooks reales de la clase.
+        Cada función se invoca como `func(manager, *args)`.
+        """
+        registry = cls.__dict__.get("_bk_hook_registry")
+        if registry is None:
+            registry = {}
+            for name in HOOK_NAMES:
+                funcs = []
+                func = getattr(cls, name, None)
+                if func is not None and not getattr(func, "__bk_default_hook__", False):
+                    funcs.append(func)
+                # Hooks añadidos con add_hook en la clase y sus bases
+                for klass in reversed(cls.__mro__):
+                    funcs.extend(klass.__dict__.get("_bk_extra_hooks", {}).get(name, ()))
+                if funcs:
+                    registry[name] = tuple(funcs)
+            cls._bk_hook_registry = registry
+        return registry
+
+    @classmethod
+    def add_hook(cls, name, func):
+        """
+        Añade un hook adicional a la clase (y a sus subclases), que se ejecuta después
+        del método `name` si la clase lo sobrescribe.
+
+        Args:
+            name (str): Nombre del hook (e.g., "after_insert").
+            func (callable): Se invoca como `func(manager, *args)`.
+
+        Raises:
+            ValueError: Si `name` no es un hook conocido.
+        """
+        if name not in HOOK_NAMES:
+            raise ValueError(f"Hook desconocido: {name}")
+        hooks = cls.__dict__.get("_bk_extra_hooks")
+        if hooks is None:
+            hooks = cls._bk_extra_hooks = {}
+        hooks[name] = hooks.get(name, ()) + (func,)
+        pending = [cls]
+        while pending:
+            klass = pending.pop()
+            klass.refresh_hooks()
+            pending.extend(klass.__subclasses__())
+
+    @classmethod
+    def refresh_hooks(cls):
+        """
+        Descarta el registro de hooks para que se vuelva a resolver en la próxima operación.
+        """
+        if "_bk_hook_registry" in cls.__dict__:
+            del cls._bk_hook_registry
+
+    @classmethod
+    def _after_hook_executor(cls):
+        executor = cls.__dict__.get("_bk_after_executor")
+        if executor is None:
+            with _executor_lock:
+                executor = cls.__dict__.get("_bk_after_executor")
+                if executor is None:
+                    executor = BKAfterHookExecutor(cls.after_hooks_workers, cls.after_hooks_max_pending)
+                    cls._bk_after_executor = executor
+        return executor
+
+    @classmethod
+    def shutdown_after_hooks(cls, wait=True):
+        """
+        Detiene el executor de hooks after_* de la clase, esperando a los pendientes si `wait`.
+        """
+        executor = cls.__dict__.get("_bk_after_executor")
+        if executor is not None:
+            del cls._bk_after_executor
+            executor.shutdown(wait=wait)
+
+    def _run_hook(self, name, *args):
+        """
+        Ejecuta los hooks registrados para `name`. No hace nada si no hay ninguno.
+
+        Un hook asignado en la instancia (`manager.after_insert = func`) sustituye al
+        método de la clase y se invoca como `func(*args)`; los añadidos con `add_hook`
+        se siguen ejecutando.
+        """
+        callbacks = self._hook_registry().get(name, ())
+        own = self.__dict__.get(name)
+        if own is not None:
+            method = getattr(type(self), name, None)
+            callbacks = tuple(func for func in callbacks if func is not method)
+        elif not callbacks:
+            return
+        if self.async_after_hooks and name.startswith("after_"):
+            executor = self._after_hook_executor()
+            if own is not None:
+                executor.submit(own, *args)
+            for func in callbacks:
+                executor.submit(func, self, *args)
+        else:
+            if own is not None:
+                own(*args)
+            for func in callbacks:
+                func(self, *args)
@@ -2,8 +2,18 @@
 # coding: utf-8
 
 from BKLibDB.BKManager.BKManager_Base import BKManager
+from BKLibDB.BKManager.BKHooks import default_hook
+from BKLibDB.BKManager.BKWriteBehind import BKWriteBehindBuffer
+from BKLibDB.BKManager import BKAutoSQL
+from BKLibDB.BKManager import BKDeadline
+from BKLibDB.BKManager.BKCache import BKTTLCache, MISSING, make_key
+from BKLibDB.BKManager.BKSingleFlight import BKSingleFlight
 from abc import ABC, abstractmethod
 from sqlalchemy.sql import text
+import threading
+
+# Protege la creación de la caché de funciones de cada clase (ver _function_cache)
+_function_cache_lock = threading.Lock()
 
 
 class BKManagerDB(BKManager):
@@ -12,19 +22,66 @@ class BKManagerDB(BKManager):
     y agrega manejo automático de finalización y transacciones.
     """
 
-    def __init__(self, model=None, db_type=None, session=None, chain_connection=None, **kwargs):
+    # Buffer de escritura diferida compartido por la clase (ver enable_write_behind)
+    write_behind = None
+
+    # Con auto_sql = True, las operaciones con `objmodel` generan su SQL sobre `table`
+    # a partir de las columnas BKColumn del modelo, y los UPDATE solo envían las
+    # columnas modificadas desde la carga o la última escritura.
+    auto_sql = False
+    table = None
+
+    # Funciones deterministas cuyo resultado se memoiza: {nombre: segundos de vigencia}.
+    # Cada subclase recibe su propia copia (ver __init_subclass__). La caché es de la
+    # clase, acotada a function_cache_size entradas (LRU), y las llamadas concurrentes
+    # idénticas se agrupan en una sola consulta.
+    deterministic_functions = {}
+    function_cache_size = 1024
+
+    # Tipo de base de datos (valores de get_dbsess) a partir del dialecto de la sesión
+    DIALECT_DB_TYPES = {
+        "oracle": "ORACLE",
+        "postgresql": "POSTGRESQL",
+        "mssql": "SQLSERVER",
+        "mysql": "MYSQL",
+        "mariadb": "MYSQL",
+        "sqlite": "SQLITE",
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Copia propia: registrar una función en una clase no afecta a las demás
+        cls.deterministic_functions = dict(cls.deterministic_functions)
+
+    def __init__(self, model=None, db_type=None, session=None, chain_connection=None, identity_map=None, **kwargs):
         """
         Inicializa BKManagerDB con una sesión activa y un modelo opcional.
 
         Args:
             session (sqlalchemy.orm.session.Session, opcional): Sesión de la base de datos.
             model (class, opcional): Modelo asociado al manager.
+            identity_map (bool | BKIdentityMap, opcional): Mapa de identidad (ver BKManager).
         """
         ### Si no se pasa una sesión explícita, intenta crearla con los parámetros.
         if session is None and db_type:
             session = self.open_session(db_type=db_type, chain_connection=chain_connection, **kwargs)
         
-        super().__init__(session=session, model=model)
+        super().__init__(session=session, model=model, identity_map=identity_map)
+        self._db_type = db_type.upper() if db_type else None
+
+    @property
+    def db_type(self):
+        """
+        str: Tipo de base de datos ("ORACLE", "POSTGRESQL", "SQLSERVER", "MYSQL", "SQLITE").
+        Si no se indicó al crear el manager, se deduce del dialecto de la sesión.
+        """
+        if self._db_type is None and self.session is not None:
+            return self.DIALECT_DB_TYPES.get(self.get_dialect())
+        return self._db_type
+
+    @db_type.setter
+    def db_type(self, value):
+        self._db_type = value.upper() if value else None
 
     def __enter__(self):
         """
@@ -72,17 +129,159 @@ class BKManagerDB(BKManager):
         """
         pass
 
+    @classmethod
+    def enable_write_behind(cls, bind, max_rows=500, max_delay_ms=50, max_queue=10000, put_timeout=None):
+        """
+        Activa la escritura diferida para `insert(objmodel=...)` en esta clase de manager.
+
+        A partir de ese momento, esas inserciones (desde cualquier hilo y cualquier
+        instancia de la clase) se encolan y se envían agrupadas en un executemany
+        cada `max_rows` filas o `max_delay_ms` milisegundos. `insert` devuelve un
+        Future que se resuelve cuando la fila está confirmada.
+
+        Args:
+            bind (sqlalchemy.engine.Engine): Motor para las sesiones del buffer
+                (e.g., `manager.session.get_bind()`).
+
+        Returns:
+            BKWriteBehindBuffer: Buffer asociado a la clase.
+        """
+        cls.disable_write_behind()
+        cls.write_behind = BKWriteBehindBuffer(
+            bind, max_rows=max_rows, max_delay_ms=max_delay_ms, max_queue=max_queue, put_timeout=put_timeout
+        )
+        return cls.write_behind
+
+    @classmethod
+    def disable_write_behind(cls, timeout=None):
+        """
+        Envía las filas pendientes, cierra el buffer y vuelve a las inserciones síncronas.
+        """
+        buffer = cls.__dict__.get("write_behind")
+        if buffer is not None:
+            cls.write_behind = None
+            buffer.close(timeout)
+
+    def _auto_statement(self, operation, objmodel):
+        """
+        Genera la sentencia y los parámetros de una operación a partir de las columnas
+        BKColumn del modelo.
+
+        Args:
+            operation (str): "insert", "update" o "delete".
+            objmodel (BKModel): Instancia sobre la que se opera.
+
+        Returns:
+            tuple: (sql, params). En "update", (None, None) si no hay cambios.
+
+        Raises:
+            ValueError: Si falta la tabla, la clave primaria o una columna obligatoria.
+        """
+        if not self.table:
+            raise ValueError("auto_sql requiere definir `table` en el manager.")
+        columns = objmodel.get_columns()
+        keys = objmodel.get_primary_keys()
+        values = objmodel.column_values()
+
+        if operation == "insert":
+            for name, column in columns.items():
+                if not column.nullable and not column.primary_key and values.get(name) is None:
+                    raise ValueError(f"La columna '{name}' no admite valores nulos.")
+            names = tuple(values)
+            return BKAutoSQL.build_insert(self.table, names), values
+
+        if not keys:
+            raise ValueError(f"{type(objmodel).__name__} no declara columnas con primary_key=True.")
+        missing = [key for key in keys if values.get(key) is None]
+        if missing:
+            raise ValueError(f"Faltan valores de clave primaria: {', '.join(missing)}")
+        key_values = {key: values[key] for key in keys}
+
+        if operation == "update":
+            changes = {name: value for name, value in objmodel.get_changes().items() if name not in key_values}
+            if not changes:
+                return None, None
+            for name, value in changes.items():
+                if value is None and not columns[name].nullable:
+                    raise ValueError(f"La columna '{name}' no admite valores nulos.")
+            sql = BKAutoSQL.build_update(self.table, tuple(changes), keys)
+            return sql, {**changes, **key_values}
+
+        return BKAutoSQL.build_delete(self.table, keys), key_values
+
+    def _objmodel_statement(self, operation, objmodel):
+        """
+        Devuelve (sql, params) para operar con `objmodel`, generados automáticamente
+        con auto_sql o a partir de get_sql_insert/get_sql_update/get_sql_delete.
+        """
+        if self.auto_sql:
+            return self._auto_statement(operation, objmodel)
+        getter = {
+            "insert": self.get_sql_insert,
+            "update": self.get_sql_update,
+            "delete": self.get_sql_delete,
+        }[operation]
+        sql, _ = getter()
+        return sql, type(objmodel).to_dict(objmodel)
+
+    def _hydrate(self, results):
+        """
+        Igual que BKManager._hydrate (fetch_all, afetch_all). Con auto_sql, guarda el
+        estado inicial de cada modelo para poder enviar después solo las columnas
+        modificadas.
+        """
+        models = super()._hydrate(results)
+        if self.auto_sql:
+            for model in models:
+                # Las instancias ya conocidas (mapa de identidad) conservan sus cambios
+                if getattr(model, "_bk_snapshot", None) is None:
+                    model.mark_clean()
+        return models
+
+    def get_by_pk(self, key, sql=None):
+        """
+        Obtiene un modelo por su clave primaria. Si el manager tiene mapa de identidad
+        y la instancia ya está cargada, la devuelve sin consultar la base de datos.
+
+        Args:
+            key (Any | tuple): Valor de la clave primaria (tupla si es compuesta).
+            sql (str, opcional): SELECT con un parámetro por columna de la clave. Por
+                defecto se genera sobre `table`.
+
+        Returns:
+            BKModel | None: El modelo, o None si no existe.
+        """
+        if not self.model:
+            raise ValueError("No se ha definido un modelo para este manager.")
+        keys = self.model.get_primary_keys()
+        if not keys:
+            raise ValueError(f"{self.model.__name__} no declara columnas con primary_key=True.")
+        values = key if isinstance(key, tuple) else (key,)
+        if self.identity_map is not None:
+            cached = self.identity_map.get(self.model, values)
+            if cached is not None:
+                return cached
+        if sql is None:
+            if not self.table:
+                raise ValueError("get_by_pk requiere `sql` o definir `table` en el manager.")
+            sql = BKAutoSQL.build_select(self.table, keys)
+        models = self.fetch_all(sql, dict(zip(keys, values)))
+        return models[0] if models else None
+
     # CRUD con manejo implícito de transacciones y hooks
-    def getlist(self):
+    def getlist(self, timeout=None):
         """
         Ejecuta una consulta SELECT genérica usando get_sql_query.
+
+        Args:
+            timeout (float, opcional): Plazo en segundos (ver BKManager.execute_query).
     
         Returns:
             list[BKModel]: Lista de instancias del modelo con los datos obtenidos.
         """
         try:
             sql, params = self.get_sql_select()
-            return self.fetch_all(sql, params)
+            return self.fetch_all(sql, params, timeout=timeout)
         except Exception as e:
             self.session.rollback()  # En caso de error, revierte la transacción
             raise e
@@ -97,20 +296,24 @@ class BKManagerDB(BKManager):
 
         Returns:
             int: Número de filas afectadas.
+            concurrent.futures.Future: Con escritura diferida activa y `objmodel`,
+                Future que se resuelve cuando la fila está confirmada.
         """
-        if sql is None or params is None and objmodel is None:
-            sql, params = self.get_sql_insert()
         if objmodel:
-            sql, _ = self.get_sql_insert()
-            params = objmodel.to_dict()
+            sql, params = self._objmodel_statement("insert", objmodel)
+            if self.write_behind is not None:
+                self._run_hook("before_insert", params)
+                return self.write_behind.submit(self, sql, params)
+        elif sql is None or params is None:
+            sql, params = self.get_sql_insert()
             
         try:
-            if hasattr(self, "before_insert"):
-                self.before_insert(params)  # Hook antes de la inserción
             rowcount = super().insert(sql, params)
             self.session.commit()  # Confirmar transacción tras la inserción exitosa
-            if hasattr(self, "after_insert"):
-                self.after_insert(params)  # Hook después de la inserción
+            if objmodel and self.auto_sql:
+                objmodel.mark_clean()
+            if objmodel and self.identity_map is not None:
+                self.identity_map.add(objmodel)
             return rowcount
         except Exception as e:
             self.session.rollback()  # Revertir transacción en caso de error
@@ -125,21 +328,20 @@ class BKManagerDB(BKManager):
             params (dict): Parámetros de la consulta.
 
         Returns:
-            int: Número de filas afectadas.
+            int: Número de filas afectadas (0 sin consulta si, con auto_sql, no hay cambios).
         """
-        if sql is None or params is None and objmodel is None:
-            sql, params = self.get_sql_update()
         if objmodel:
-            sql, _ = self.get_sql_update()
-            params = objmodel.to_dict()
+            sql, params = self._objmodel_statement("update", objmodel)
+            if sql is None:
+                return 0
+        elif sql is None or params is None:
+            sql, params = self.get_sql_update()
             
         try:
-            if hasattr(self, "before_update"):
-                self.before_update(params)  # Hook antes de la actualización
             rowcount = super().update(sql, params)
             self.session.commit()  # Confirmar transacción tras la actualización exitosa
-            if hasattr(self, "after_update"):
-                self.after_update(params)  # Hook después de la actualización
+            if objmodel and self.auto_sql:
+                objmodel.mark_clean()
             return rowcount
         except Exception as e:
             self.session.rollback()  # Revertir transacción en caso de error
@@ -156,38 +358,83 @@ class BKManagerDB(BKManager):
         Returns:
             int: Número de filas afectadas.
         """
-        if sql is None or params is None and objmodel is None:
-            sql, params = self.get_sql_delete()
         if objmodel:
-            sql, _ = self.get_sql_delete()
-            params = objmodel.to_dict()
+            sql, params = self._objmodel_statement("delete", objmodel)
+        elif sql is None or params is None:
+            sql, params = self.get_sql_delete()
                         
         try:
-            if hasattr(self, "before_delete"):
-                self.before_delete(params)  # Hook antes del borrado
             rowcount = super().delete(sql, params)
             self.session.commit()  # Confirmar transacción tras el borrado exitoso
-            if hasattr(self, "after_delete"):
-                self.after_delete(params)  # Hook después del borrado
+            if objmodel and self.identity_map is not None:
+                self.identity_map.discard(objmodel)
             return rowcount
         except Exception as e:
             self.session.rollback()  # Revertir transacción en caso de error
             raise e
 
+    def upsert_many(self, rows, conflict_keys=None, table=None, chunk_size=500):
+        """
+        Inserta o actualiza filas en bloque con la sentencia nativa del dialecto
+        (`ON CONFLICT`, `ON DUPLICATE KEY UPDATE` o `MERGE`), en una sola ida y vuelta
+        (executemany) y un commit por cada `chunk_size` filas. No ejecuta los hooks
+        before_/after_ por fila.
+
+        Args:
+            rows (list[BKModel | dict]): Filas a escribir. De los modelos se toman sus
+                columnas BKColumn asignadas.
+            conflict_keys (tuple[str], opcional): Columnas que identifican la fila. Por
+                defecto, las `primary_key=True` del modelo.
+            table (str, opcional): Tabla de destino. Por defecto, `self.table`.
+            chunk_size (int): Filas por transacción.
+
+        Returns:
+            int: Número de filas enviadas.
+        """
+        table = table or self.table
+        if not table:
+            raise ValueError("upsert_many requiere `table` en el manager o como argumento.")
+        if conflict_keys is None:
+            model = self.model or (type(rows[0]) if rows else None)
+            conflict_keys = model.get_primary_keys() if model and hasattr(model, "get_primary_keys") else ()
+        conflict_keys = tuple(conflict_keys)
+        if not conflict_keys:
+            raise ValueError("upsert_many requiere conflict_keys o un modelo con primary_key=True.")
+
+        dialect = self.get_dialect()
+        sent = 0
+        for start in range(0, len(rows), chunk_size):
+            # Las filas del bloque se agrupan por columnas: cada grupo es un executemany
+            groups = {}
+            for row in rows[start:start + chunk_size]:
+                values = row if isinstance(row, dict) else row.column_values()
+                groups.setdefault(tuple(values), []).append(values)
+            try:
+                for columns, params in groups.items():
+                    sql = BKAutoSQL.build_upsert(dialect, table, columns, conflict_keys)
+                    self.session.execute(text(sql), params)
+                    sent += len(params)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                raise e
+        return sent
+
     # Métodos CRUD genéricos
-    def execute_query(self, sql, params=None):
+    def execute_query(self, sql, params=None, timeout=None):
         """
         Ejecuta una consulta SQL genérica con manejo automático de transacciones.
 
         Args:
             sql (str): Sentencia SQL.
             params (dict, opcional): Parámetros de la consulta.
+            timeout (float, opcional): Plazo en segundos (ver BKManager.execute_query).
 
         Returns:
             list[dict]: Resultados de la consulta como una lista de diccionarios.
         """
         try:
-            result = super().execute_query(sql, params)
+            result = super().execute_query(sql, params, timeout=timeout)
             self.session.commit()  # Confirmar transacción tras la ejecución exitosa
             return result
         except Exception as e:
@@ -195,6 +442,7 @@ class BKManagerDB(BKManager):
             raise e
 
     # Hooks (opcionalmente definidos en los managers específicos)
+    @default_hook
     def before_insert(self, params):
         """
         Lógica personalizada antes de una operación de inserción.
@@ -202,6 +450,7 @@ class BKManagerDB(BKManager):
         """
         pass
 
+    @default_hook
     def after_insert(self, params):
         """
         Lógica personalizada después de una operación de inserción.
@@ -209,6 +458,7 @@ class BKManagerDB(BKManager):
         """
         pass
 
+    @default_hook
     def before_update(self, params):
         """
         Lógica personalizada antes de una operación de actualización.
@@ -216,6 +466,7 @@ class BKManagerDB(BKManager):
         """
         pass
 
+    @default_hook
     def after_update(self, params):
         """
         Lógica personalizada después de una operación de actualización.
@@ -223,6 +474,7 @@ class BKManagerDB(BKManager):
         """
         pass
 
+    @default_hook
     def before_delete(self, params):
         """
         Lógica personalizada antes de una operación de borrado.
@@ -230,6 +482,7 @@ class BKManagerDB(BKManager):
         """
         pass
 
+    @default_hook
     def after_delete(self, params):
         """
         Lógica personalizada después de una operación de borrado.
@@ -265,17 +518,86 @@ class BKManagerDB(BKManager):
         self.session.execute(text(sql), params)
         self.session.commit()
     
-    def call_function(self, func_name, params=None):
+    @classmethod
+    def _function_cache(cls):
+        """
+        Devuelve (caché, single-flight) de la clase, creándolos la primera vez.
+        """
+        state = cls.__dict__.get("_bk_function_cache")
+        if state is None:
+            with _function_cache_lock:
+                state = cls.__dict__.get("_bk_function_cache")
+                if state is None:
+                    state = (BKTTLCache(maxsize=cls.function_cache_size), BKSingleFlight())
+                    cls._bk_function_cache = state
+        return state
+
+    def _memoized(self, kind, func_name, params, call):
+        ttl = self.deterministic_functions.get(func_name)
+        if ttl is None:
+            return call()
+        cache, flights = self._function_cache()
+        key = make_key(kind, func_name, params or {}, str(self.session.get_bind().url))
+        value = cache.get(key)
+        if value is MISSING:
+            def load():
+                result = call()
+                cache.set(key, result, ttl)
+                return result
+            value = flights.do(key, load)
+        if kind == "multi":
+            # Copias: el llamador puede modificar las filas sin alterar la caché
+            return [dict(row) for row in value]
+        return value
+
+    @classmethod
+    def invalidate_function(cls, func_name=None, params=None):
+        """
+        Descarta resultados memoizados de funciones deterministas.
+
+        Args:
+            func_name (str, opcional): Función a invalidar. Sin ella, se vacía la caché.
+            params (dict, opcional): Solo los resultados de esa llamada concreta.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        cache, _ = cls._function_cache()
+        if func_name is None:
+            return cache.invalidate()
+        frozen = make_key(params)[0] if params is not None else None
+        return cache.invalidate(predicate=lambda key: key[1] == func_name and (
+            frozen is None or key[2] == frozen
+        ))
+
+    @classmethod
+    def function_cache_stats(cls):
+        """
+        Returns:
+            dict: Métricas de la caché (`size`, `hits`, `misses`, `hit_ratio`,
+            `evictions`, `expirations`) y de las llamadas agrupadas (`calls`, `shared`).
+        """
+        cache, flights = cls._function_cache()
+        return {**cache.stats(), **flights.stats()}
+
+    def call_function(self, func_name, params=None, timeout=None):
         """
         Ejecuta una función almacenada y retorna su resultado, adaptándose al tipo de base de datos.
+        Si `func_name` está en `deterministic_functions`, el resultado se memoiza.
     
         Args:
             func_name (str): Nombre de la función.
             params (dict, opcional): Parámetros a pasar.
+            timeout (float, opcional): Plazo en segundos (ver BKManager.execute_query).
     
         Returns:
             Cualquier valor retornado por la función.
         """
+        return self._memoized(
+            "scalar", func_name, params, lambda: self._call_function(func_name, params, timeout)
+        )
+
+    def _call_function(self, func_name, params=None, timeout=None):
         params = params or {}
         placeholders = ', '.join(f':{k}' for k in params.keys())
     
@@ -285,25 +607,33 @@ class BKManagerDB(BKManager):
             sql = f"SELECT {func_name}({placeholders}) AS result"
         elif self.db_type == "SQLSERVER":
             sql = f"SELECT dbo.{func_name}({placeholders}) AS result"
-        elif self.db_type == "MYSQL":
+        elif self.db_type in ("MYSQL", "SQLITE"):
             sql = f"SELECT {func_name}({placeholders}) AS result"
         else:
             raise NotImplementedError(f"call_function no implementado para {self.db_type}")
     
-        result = self.session.execute(text(sql), params)
-        return result.scalar()
+        with BKDeadline.deadline(timeout), BKDeadline.bounded(self.session, "call_function"):
+            result = self.session.execute(text(sql), params)
+            return result.scalar()
     
-    def call_function_multi(self, func_name, params=None):
+    def call_function_multi(self, func_name, params=None, timeout=None):
         """
         Ejecuta una función que retorna múltiples columnas/filas.
+        Si `func_name` está en `deterministic_functions`, el resultado se memoiza.
     
         Args:
             func_name (str): Nombre de la función.
             params (dict, opcional): Parámetros.
+            timeout (float, opcional): Plazo en segundos (ver BKManager.execute_query).
     
         Returns:
             list[dict]: Lista de resultados como diccionarios.
         """
+        return self._memoized(
+            "multi", func_name, params, lambda: self._call_function_multi(func_name, params, timeout)
+        )
+
+    def _call_function_multi(self, func_name, params=None, timeout=None):
         params = params or {}
         placeholders = ', '.join(f':{k}' for k in params)
     
@@ -317,5 +647,6 @@ class BKManagerDB(BKManager):
         else:
             raise NotImplementedError(f"call_function_multi no implementado para {self.db_type}")
     
-        result = self.session.execute(text(sql), params)
-        return [row._asdict() for row in result]
+        with BKDeadline.deadline(timeout), BKDeadline.bounded(self.session, "call_function_multi"):
+            result = self.session.execute(text(sql), params)
+            return [row._asdict() for row in result]
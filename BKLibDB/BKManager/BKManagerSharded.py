@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import bisect
+import contextvars
+import heapq
+import itertools
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BKHashRouter:
+    """
+    Reparte las claves entre los shards por hash (CRC32, estable entre procesos).
+
+    Args:
+        shards (list[str]): Nombres de los shards.
+    """
+    def __init__(self, shards):
+        self.shards = list(shards)
+
+    def route(self, key):
+        """
+        Returns:
+            str: Shard que corresponde a `key`.
+        """
+        return self.shards[zlib.crc32(repr(key).encode("utf-8")) % len(self.shards)]
+
+
+class BKRangeRouter:
+    """
+    Reparte las claves por rangos.
+
+    Args:
+        ranges (list[tuple]): Pares (límite superior exclusivo, shard), ordenados de menor
+            a mayor. El último límite puede ser None para abarcar el resto de claves.
+
+    Example:
+        BKRangeRouter([(1000, "s0"), (5000, "s1"), (None, "s2")])
+    """
+    def __init__(self, ranges):
+        self._bounds = [bound for bound, _ in ranges if bound is not None]
+        self._shards = [shard for _, shard in ranges]
+        self._open = ranges[-1][0] is None if ranges else False
+        self.shards = list(dict.fromkeys(self._shards))
+
+    def route(self, key):
+        index = bisect.bisect_right(self._bounds, key)
+        if index == len(self._bounds) and not self._open:
+            raise ValueError(f"La clave {key!r} está fuera de los rangos definidos.")
+        return self._shards[index]
+
+
+class BKManagerSharded:
+    """
+    Manager que reparte una tabla entre varias bases de datos.
+
+    Las operaciones sobre una clave (insert, update, delete, get_by_pk) se envían al
+    shard que indica el router; las consultas (getlist, execute_query, fetch_all) se
+    ejecutan en paralelo en todos los shards y sus resultados se combinan, con orden
+    y límite opcionales que se aplican también en cada shard.
+
+    Args:
+        manager_cls (type): Subclase de BKManagerDB usada en cada shard.
+        shards (dict): {nombre: conexión}. La conexión puede ser un diccionario con los
+            argumentos de `get_dbsess` (`db_type`, `chain_connection`, `host`...), una
+            sesión SQLAlchemy o un manager ya creado.
+        router (BKHashRouter | BKRangeRouter, opcional): Por defecto, hash sobre los shards.
+        key (str | callable, opcional): Clave de reparto. Un nombre de columna o una
+            función que recibe el modelo o los parámetros. Por defecto, la clave primaria
+            del modelo.
+        model (type, opcional): Modelo de los managers.
+        max_workers (int, opcional): Hilos para las consultas en paralelo (por defecto,
+            uno por shard).
+
+    Example:
+        clientes = BKManagerSharded(ClienteManager, {
+            "s0": {"db_type": "POSTGRESQL", "chain_connection": "postgresql+psycopg2://.../c0"},
+            "s1": {"db_type": "POSTGRESQL", "chain_connection": "postgresql+psycopg2://.../c1"},
+        }, key="tenant_id", model=Cliente)
+        clientes.insert(objmodel=Cliente(tenant_id=7, ...))
+        ultimos = clientes.getlist(order_by="-creado", limit=50)
+    """
+    def __init__(self, manager_cls, shards, router=None, key=None, model=None, max_workers=None):
+        self.model = model
+        self.managers = {name: self._build_manager(manager_cls, spec, model) for name, spec in shards.items()}
+        self.router = router or BKHashRouter(list(self.managers))
+        self.key = key
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.managers), thread_name_prefix="bk-shard"
+        )
+
+    @staticmethod
+    def _build_manager(manager_cls, spec, model):
+        if isinstance(spec, dict):
+            return manager_cls(model=model, **spec)
+        if hasattr(spec, "session") and hasattr(spec, "execute_query"):
+            return spec
+        return manager_cls(model=model, session=spec)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Cierra las sesiones de todos los shards.
+        """
+        self._executor.shutdown(wait=True)
+        for manager in self.managers.values():
+            if manager.session is not None:
+                manager.session.close()
+
+    # Enrutado
+    def shard_key(self, objmodel=None, params=None):
+        """
+        Obtiene la clave de reparto de un modelo o de unos parámetros.
+        """
+        source = objmodel if objmodel is not None else params
+        if callable(self.key):
+            return self.key(source)
+        values = source if isinstance(source, dict) else source.__dict__
+        if self.key is not None:
+            return values[self.key]
+        model = type(objmodel) if objmodel is not None else self.model
+        keys = model.get_primary_keys() if model is not None else ()
+        if not keys:
+            raise ValueError("BKManagerSharded requiere `key` o un modelo con primary_key=True.")
+        return values[keys[0]] if len(keys) == 1 else tuple(values[name] for name in keys)
+
+    def shard_for(self, key):
+        """
+        Returns:
+            BKManagerDB: Manager del shard que corresponde a `key`.
+        """
+        return self.managers[self.router.route(key)]
+
+    def _route(self, key, objmodel, params):
+        if key is None:
+            key = self.shard_key(objmodel=objmodel, params=params)
+        return self.shard_for(key)
+
+    # Operaciones sobre una clave
+    def insert(self, sql=None, params=None, objmodel=None, key=None):
+        return self._route(key, objmodel, params).insert(sql=sql, params=params, objmodel=objmodel)
+
+    def update(self, sql=None, params=None, objmodel=None, key=None):
+        return self._route(key, objmodel, params).update(sql=sql, params=params, objmodel=objmodel)
+
+    def delete(self, sql=None, params=None, objmodel=None, key=None):
+        return self._route(key, objmodel, params).delete(sql=sql, params=params, objmodel=objmodel)
+
+    def get_by_pk(self, key, sql=None, shard_key=None):
+        """
+        Obtiene un modelo por clave primaria del shard de `shard_key` (por defecto, la
+        propia clave primaria).
+        """
+        return self.shard_for(key if shard_key is None else shard_key).get_by_pk(key, sql=sql)
+
+    # Consultas repartidas
+    def _scatter(self, call):
+        """
+        Ejecuta `call(manager)` en todos los shards en paralelo, conservando el plazo
+        activo (BKDeadline) en cada hilo.
+
+        Returns:
+            list: Resultados en el orden de los shards.
+        """
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, call, manager)
+            for manager in self.managers.values()
+        ]
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _parse_order(order_by):
+        if order_by is None:
+            return []
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        return [(name[1:], True) if name.startswith("-") else (name, False) for name in order_by]
+
+    @staticmethod
+    def _pushdown(sql, dialect, order, limit):
+        """
+        Envuelve la consulta para que cada shard devuelva ya ordenadas, y como mucho
+        `limit`, las filas que pueden formar parte del resultado final.
+        """
+        if not order and limit is None:
+            return sql
+        wrapped = f"SELECT * FROM ({sql}) bk_shard"
+        if order:
+            wrapped += " ORDER BY " + ", ".join(f"{name} DESC" if desc else name for name, desc in order)
+        if limit is not None:
+            if dialect in ("oracle", "mssql"):
+                if not order and dialect == "mssql":
+                    wrapped += " ORDER BY (SELECT NULL)"
+                offset = "OFFSET 0 ROWS " if dialect == "mssql" else ""
+                wrapped += f" {offset}FETCH NEXT {int(limit)} ROWS ONLY"
+            else:
+                wrapped += f" LIMIT {int(limit)}"
+        return wrapped
+
+    @staticmethod
+    def _merge(streams, order, limit):
+        if order:
+            descending = {desc for _, desc in order}
+            # Los nulos, al final en orden ascendente (como PostgreSQL)
+            key = lambda row: tuple((row[name] is None, row[name]) for name, _ in order)
+            if len(descending) == 1:
+                rows = heapq.merge(*streams, key=key, reverse=descending.pop())
+            else:
+                rows = list(itertools.chain.from_iterable(streams))
+                for name, desc in reversed(order):
+                    rows.sort(key=lambda row: (row[name] is None, row[name]), reverse=desc)
+        else:
+            rows = itertools.chain.from_iterable(streams)
+        return list(itertools.islice(rows, limit))
+
+    def execute_query(self, sql, params=None, order_by=None, limit=None, timeout=None):
+        """
+        Ejecuta la consulta en todos los shards en paralelo y combina los resultados.
+
+        Args:
+            sql (str): Sentencia SQL.
+            params (dict, opcional): Parámetros de la consulta.
+            order_by (str | list[str], opcional): Columnas de orden ("-columna" para
+                descendente). Cada shard ordena y el resultado se mezcla sin reordenar.
+            limit (int, opcional): Máximo de filas; se aplica también en cada shard.
+            timeout (float, opcional): Plazo en segundos para cada shard.
+
+        Returns:
+            list[dict]: Filas combinadas.
+        """
+        order = self._parse_order(order_by)
+
+        def run(manager):
+            statement = self._pushdown(sql, manager.get_dialect(), order, limit)
+            return manager.execute_query(statement, params, timeout=timeout)
+
+        return self._merge(self._scatter(run), order, limit)
+
+    def fetch_all(self, sql, params=None, order_by=None, limit=None, timeout=None):
+        """
+        Como execute_query, pero mapea las filas al modelo.
+        """
+        if not self.model:
+            raise ValueError("No se ha definido un modelo para este manager.")
+        return self.model.from_query(self.execute_query(sql, params, order_by, limit, timeout))
+
+    def getlist(self, order_by=None, limit=None, timeout=None):
+        """
+        Ejecuta en todos los shards la consulta de `get_sql_select` de su manager, como
+        BKManagerDB.getlist.
+
+        Returns:
+            list[BKModel]: Modelos combinados de todos los shards.
+        """
+        if not self.model:
+            raise ValueError("No se ha definido un modelo para este manager.")
+        order = self._parse_order(order_by)
+
+        def run(manager):
+            sql, params = manager.get_sql_select()
+            statement = self._pushdown(sql, manager.get_dialect(), order, limit)
+            return manager.execute_query(statement, params, timeout=timeout)
+
+        return self.model.from_query(self._merge(self._scatter(run), order, limit))
@@ -1,25 +1,128 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
+import asyncio
+import contextvars
+import functools
+import re
+import threading
+import uuid
+from sqlalchemy import bindparam
 from sqlalchemy.sql import text
 from BKLibDB.BKConnect import get_dbsess  # Para abrir sesiones
+from BKLibDB.BKManager.BKHooks import BKHookMixin
+from BKLibDB.BKModel.BKIdentityMap import BKIdentityMap
+from BKLibDB.BKManager import BKSnapshot
+from BKLibDB.BKManager import BKExport
+from BKLibDB.BKManager.BKParallelScan import BKParallelScan
+from BKLibDB.BKManager import BKDeadline
+from BKLibDB.BKManager.BKProfiler import BKMemoryProfiler, profile_call
+from BKLibDB.BKManager.BKCache import MISSING, make_key
+from BKLibDB.BKManager.BKSingleFlight import BKSingleFlight
+from BKLibDB.BKManager.BKRelationLoader import BKRelationLoader
+from BKLibDB.BKModel.BKModel_Base import BKModel
+from BKLibDB.BKModel import BKSerializer
 
+# Sentencias de solo lectura que se pueden agrupar con single-flight
+_READ_ONLY = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
 
-class BKManager:
+
+def _copy_rows(rows):
+    return [dict(row) for row in rows]
+
+
+class BKManager(BKHookMixin):
     """
     Manager base para manejar operaciones SQL y CRUD en la base de datos.
     Los managers específicos pueden sobrescribir consultas y lógica.
+    Los hooks before_/after_ se resuelven una vez por clase (ver BKHookMixin).
     """
-    def __init__(self, session=None, model=None):
+
+    # Perfilador de memoria de la clase (ver enable_memory_profiling)
+    memory_profiler = None
+    # Agrupación de SELECT concurrentes idénticos (ver enable_single_flight)
+    single_flight = None
+    single_flight_timeout = None
+
+    def __init__(self, session=None, model=None, identity_map=None):
         """
         Inicializa BKManager con una sesión de base de datos y un modelo opcional.
 
         Args:
             session (sqlalchemy.orm.session.Session, opcional): Sesión de la base de datos.
             model (class, opcional): Modelo asociado al manager.
+            identity_map (bool | BKIdentityMap, opcional): True para crear un mapa de
+                identidad propio, o un BKIdentityMap para compartirlo entre managers.
         """
         self.session = session
         self.model = model
+        if identity_map is True:
+            identity_map = BKIdentityMap()
+        elif identity_map is False:
+            identity_map = None
+        self.identity_map = identity_map
+        # Serializa el uso de la sesión desde los hilos de aexecute_query/afetch_all
+        self._session_lock = threading.Lock()
+
+    @classmethod
+    def enable_memory_profiling(cls, threshold=None, on_alarm=None, profiler=None):
+        """
+        Activa el perfilado de memoria (tracemalloc) de execute_query y fetch_all en esta
+        clase de manager, por fases: lectura del driver, `_asdict` e hidratación.
+
+        Args:
+            threshold (int, opcional): Pico en bytes que dispara la alarma.
+            on_alarm (callable, opcional): Recibe el registro de la llamada.
+            profiler (BKMemoryProfiler, opcional): Perfilador compartido con otras clases.
+
+        Returns:
+            BKMemoryProfiler: Perfilador con el informe (`report`, `format_report`).
+        """
+        cls.memory_profiler = profiler or BKMemoryProfiler(threshold=threshold, on_alarm=on_alarm)
+        return cls.memory_profiler
+
+    @classmethod
+    def disable_memory_profiling(cls):
+        """
+        Desactiva el perfilado de memoria de la clase y detiene tracemalloc si lo inició.
+        """
+        profiler = cls.__dict__.get("memory_profiler")
+        if profiler is not None:
+            cls.memory_profiler = None
+            profiler.stop()
+
+    @classmethod
+    def enable_single_flight(cls, timeout=None, flight=None):
+        """
+        Activa la agrupación de consultas de lectura concurrentes en esta clase de
+        manager: mientras un SELECT (o WITH) está en curso, las llamadas a execute_query
+        o fetch_all con el mismo SQL, los mismos parámetros y la misma base de datos
+        esperan su resultado en lugar de repetirlo. Cada llamada recibe sus propias
+        copias de las filas.
+
+        Las llamadas agrupadas comparten el resultado leído por la sesión de la llamada
+        en curso, así que no ven los cambios sin confirmar de su propia transacción.
+
+        Args:
+            timeout (float, opcional): Espera máxima por la consulta en curso. Si hay un
+                plazo activo (ver BKDeadline), se usa el menor de los dos.
+            flight (BKSingleFlight, opcional): Instancia compartida con otras clases.
+
+        Returns:
+            BKSingleFlight: Instancia con las métricas (`stats(per_label=True)` las da
+            por texto SQL).
+        """
+        cls.single_flight = flight or BKSingleFlight()
+        cls.single_flight_timeout = timeout
+        return cls.single_flight
+
+    @classmethod
+    def disable_single_flight(cls):
+        """
+        Desactiva la agrupación de consultas de la clase.
+        """
+        cls.single_flight = None
+        cls.single_flight_timeout = None
 
     def open_session(self, db_type, chain_connection, **kwargs):
         """
@@ -34,37 +137,315 @@ class BKManager:
         """
         return get_dbsess(type=db_type, chain_connection=chain_connection, **kwargs)
 
-    def execute_query(self, sql, params=None):
+    def get_dialect(self):
+        """
+        Devuelve el nombre del dialecto SQLAlchemy de la sesión
+        (e.g., "postgresql", "sqlite", "mssql", "oracle", "mysql").
         """
-        Ejecuta una consulta SQL genérica.
+        return self.session.get_bind().dialect.name
+
+    def execute_query(self, sql, params=None, timeout=None):
+        """
+        Ejecuta una consulta SQL genérica. Con single-flight activo (ver
+        enable_single_flight), las lecturas idénticas concurrentes se ejecutan una vez.
     
         Args:
             sql (str): Sentencia SQL.
             params (dict, opcional): Parámetros de la consulta.
+            timeout (float, opcional): Plazo en segundos. Se combina con el plazo activo
+                (ver BKDeadline.deadline) y se aplica también en el servidor.
     
         Returns:
             list[dict]: Resultados de la consulta como una lista de diccionarios.
+
+        Raises:
+            BKDeadline.DeadlineExceeded: Si la consulta no termina dentro del plazo.
+            TimeoutError: Con single-flight, si la consulta en curso que se espera no
+                termina antes de `single_flight_timeout`.
+        """
+        flight = self.single_flight
+        if flight is None or not _READ_ONLY.match(sql):
+            return self._execute_query(sql, params, timeout)
+        key = make_key(str(self.session.get_bind().url), sql, params or {})
+        with BKDeadline.deadline(timeout):
+            return flight.do(
+                key,
+                lambda: self._execute_query(sql, params),
+                timeout=self._flight_wait(),
+                label=sql,
+                share=_copy_rows,
+            )
+
+    def _flight_wait(self):
+        """
+        Espera máxima por una consulta en curso: el menor entre single_flight_timeout
+        y lo que queda del plazo activo.
         """
-        result = self.session.execute(text(sql), params or {})
-        return [row._asdict() for row in result]  # Usa _asdict() para convertir Row en dict
+        waits = [w for w in (self.single_flight_timeout, BKDeadline.remaining()) if w is not None]
+        return max(0.0, min(waits)) if waits else None
+
+    def _execute_query(self, sql, params=None, timeout=None):
+        with BKDeadline.deadline(timeout), BKDeadline.bounded(self.session, "execute_query"):
+            if self.memory_profiler is None:
+                result = self.session.execute(text(sql), params or {})
+                return [row._asdict() for row in result]  # Usa _asdict() para convertir Row en dict
+            with self.memory_profiler.call(self, sql) as call:
+                with call.phase("fetch"):
+                    rows = self.session.execute(text(sql), params or {}).all()
+                with call.phase("asdict"):
+                    return [row._asdict() for row in rows]
     
 
-    def fetch_all(self, sql, params=None):
+    # Tipos de la columna de las tablas temporales de query_by_keys
+    _KEY_TYPES = {
+        "mysql": ("BIGINT", "DOUBLE", "VARCHAR(255)"),
+        "mariadb": ("BIGINT", "DOUBLE", "VARCHAR(255)"),
+        "mssql": ("BIGINT", "FLOAT", "NVARCHAR(255)"),
+    }
+
+    def query_by_keys(self, sql_template, keys, key_column, params=None, ordered=False,
+                      chunk_size=1000, strategy=None, timeout=None):
+        """
+        Ejecuta una consulta filtrada por una lista (posiblemente muy grande) de claves
+        sin construir un `IN (:a, :b, ...)` con un parámetro por clave.
+
+        La plantilla marca con `{keys}` dónde va el filtro sobre `key_column`:
+            "SELECT * FROM cliente c WHERE c.activo = :activo AND {keys}"
+        Solo se sustituye `{keys}`: el resto de llaves (literales JSON o arrays) se
+        dejan tal cual, sin duplicarlas.
+
+        Estrategias (`strategy`; por defecto, según el dialecto):
+            - "array" (PostgreSQL): un único parámetro array, `key_column = ANY(:keys)`.
+            - "temp_table" (SQLite, MySQL, SQL Server): las claves se cargan con un
+              executemany en una tabla temporal y se filtra con una subconsulta.
+            - "chunks" (Oracle y resto): `IN` expandido en bloques de `chunk_size`.
+
+        Args:
+            sql_template (str): Consulta con `{keys}`.
+            keys (iterable): Claves buscadas. Los duplicados se ignoran.
+            key_column (str): Columna (con alias si hace falta) comparada con las claves.
+            params (dict, opcional): Resto de parámetros de la consulta.
+            ordered (bool): Si True, devuelve las filas en el orden de `keys`.
+            chunk_size (int): Claves por consulta en la estrategia "chunks".
+            strategy (str, opcional): Fuerza una estrategia.
+            timeout (float, opcional): Plazo en segundos (ver execute_query).
+
+        Returns:
+            list[dict]: Filas obtenidas.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return []
+        dialect = self.get_dialect()
+        if strategy is None:
+            if dialect == "postgresql":
+                strategy = "array"
+            elif dialect in ("sqlite", "mysql", "mariadb", "mssql"):
+                strategy = "temp_table"
+            else:
+                strategy = "chunks"
+        params = dict(params or {})
+
+        with BKDeadline.deadline(timeout), BKDeadline.bounded(self.session, "query_by_keys"):
+            if strategy == "array":
+                sql = sql_template.replace("{keys}", f"{key_column} = ANY(:bk_keys)")
+                rows = self._query_rows(text(sql), {**params, "bk_keys": keys})
+            elif strategy == "temp_table":
+                rows = self._query_by_temp_table(sql_template, keys, key_column, params, dialect)
+            elif strategy == "chunks":
+                sql = sql_template.replace("{keys}", f"{key_column} IN :bk_keys")
+                statement = text(sql).bindparams(bindparam("bk_keys", expanding=True))
+                rows = []
+                for start in range(0, len(keys), chunk_size):
+                    rows.extend(self._query_rows(statement, {**params, "bk_keys": keys[start:start + chunk_size]}))
+            else:
+                raise ValueError(f"Estrategia no soportada: {strategy}. Usa 'array', 'temp_table' o 'chunks'.")
+
+        if ordered:
+            name = key_column.rpartition(".")[2]
+            position = {key: index for index, key in enumerate(keys)}
+            rows.sort(key=lambda row: position.get(row.get(name), len(position)))
+        return rows
+
+    def _query_rows(self, statement, params):
+        return [row._asdict() for row in self.session.execute(statement, params)]
+
+    def _query_by_temp_table(self, sql_template, keys, key_column, params, dialect):
+        name = f"bk_keys_{uuid.uuid4().hex[:12]}"
+        if dialect == "mssql":
+            name = f"#{name}"
+        if dialect == "sqlite":
+            create = f"CREATE TEMP TABLE {name} (bk_key)"
+        else:
+            integer, real, string = self._KEY_TYPES.get(dialect, ("BIGINT", "FLOAT", "VARCHAR(255)"))
+            sample = keys[0]
+            key_type = integer if isinstance(sample, int) else real if isinstance(sample, float) else string
+            temporary = "TEMPORARY " if dialect != "mssql" else ""
+            create = f"CREATE {temporary}TABLE {name} (bk_key {key_type} PRIMARY KEY)"
+        self.session.execute(text(create))
+        try:
+            self.session.execute(text(f"INSERT INTO {name} (bk_key) VALUES (:bk_key)"),
+                                 [{"bk_key": key} for key in keys])
+            sql = sql_template.replace("{keys}", f"{key_column} IN (SELECT bk_key FROM {name})")
+            return self._query_rows(text(sql), params)
+        finally:
+            self.session.execute(text(f"DROP TABLE {name}"))
+
+    def fetch_by_keys(self, sql_template, keys, key_column, params=None, ordered=False,
+                      chunk_size=1000, strategy=None, timeout=None):
+        """
+        Como query_by_keys, pero mapea las filas al modelo del manager como fetch_all
+        (ver _hydrate).
+
+        Example:
+            clientes = manager.fetch_by_keys("SELECT * FROM cliente WHERE {keys}", ids, "id", ordered=True)
+
+        Returns:
+            list[model]: Instancias del modelo.
+        """
+        if not self.model:
+            raise ValueError("No se ha definido un modelo para este manager.")
+        results = self.query_by_keys(sql_template, keys, key_column, params=params, ordered=ordered,
+                                     chunk_size=chunk_size, strategy=strategy, timeout=timeout)
+        return self._hydrate(results)
+
+    def stream_query(self, sql, params=None, batch_size=1000):
+        """
+        Ejecuta una consulta y devuelve sus filas por lotes, sin cargar el resultado
+        completo en memoria (cursor del lado del servidor cuando el driver lo soporta).
+
+        Args:
+            sql (str): Sentencia SQL.
+            params (dict, opcional): Parámetros de la consulta.
+            batch_size (int): Filas por lote.
+
+        Yields:
+            list[dict]: Lotes de filas como diccionarios.
+        """
+        statement = text(sql).execution_options(stream_results=True, yield_per=batch_size)
+        result = self.session.execute(statement, params or {})
+        try:
+            for partition in result.partitions(batch_size):
+                yield [row._asdict() for row in partition]
+        finally:
+            result.close()
+
+    def parallel_scan(self, sql, params=None, partition_column=None, n=4, merged=True,
+                      batch_size=1000, queue_size=4, hydrate=False):
+        """
+        Lee una consulta grande en paralelo: divide el rango [mínimo, máximo] de
+        `partition_column` en `n` tramos y lee cada uno con su propia sesión sobre el
+        motor de este manager, en streaming. Las filas con la columna a NULL se leen en
+        un tramo adicional.
+
+        Cada tramo ocupa una conexión del pool mientras se lee, por lo que el pool debe
+        admitir `n` conexiones además de la de este manager.
+
+        Args:
+            sql (str): Sentencia SQL; debe devolver `partition_column`.
+            params (dict, opcional): Parámetros de la consulta.
+            partition_column (str, opcional): Columna numérica o de fecha. Por defecto,
+                la clave primaria (BKColumn) del modelo, si es simple.
+            n (int): Número de tramos y de conexiones simultáneas.
+            merged (bool): True para un único iterador con los lotes de todos los tramos
+                según llegan (sin orden); False para una lista de iteradores, uno por
+                tramo en orden de rango.
+            batch_size (int): Filas por lote.
+            queue_size (int): Lotes en cola por tramo antes de frenar su lectura.
+            hydrate (bool): Si True, los lotes son modelos en lugar de diccionarios.
+
+        Returns:
+            iterator | list[iterator]: Lotes (list[dict] o list[model]). Al agotar,
+            cerrar (`close()`) o descartar un iterador, sus lectores se detienen.
+
+        Raises:
+            ValueError: Si no se puede deducir la columna de partición.
+
+        Example:
+            BKExport.export_batches(manager.parallel_scan("SELECT * FROM ventas", n=8),
+                                    "ventas.csv")
+        """
+        if partition_column is None:
+            keys = self.model.get_primary_keys() if self.model is not None and hasattr(self.model, "get_primary_keys") else ()
+            if len(keys) != 1:
+                raise ValueError("parallel_scan requiere `partition_column` o un modelo con una única clave primaria.")
+            partition_column = keys[0]
+        if hydrate and not self.model:
+            raise ValueError("No se ha definido un modelo para este manager.")
+        scan = BKParallelScan(
+            self.session.get_bind(), sql, params, partition_column,
+            n=n, batch_size=batch_size, queue_size=queue_size,
+        )
+        transform = self._hydrate if hydrate else None
+        return scan.stream(transform) if merged else scan.partitions(transform)
+
+    def fetch_all(self, sql, params=None, timeout=None):
         """
         Ejecuta una consulta SQL y mapea los resultados al modelo.
 
         Args:
             sql (str): Sentencia SQL.
             params (dict, opcional): Parámetros de la consulta.
+            timeout (float, opcional): Plazo en segundos (ver execute_query).
 
         Returns:
             list[model]: Lista de instancias del modelo con los datos mapeados.
         """
         if not self.model:
             raise ValueError("No se ha definido un modelo para este manager.")
-        results = self.execute_query(sql, params)
+        with profile_call(self.memory_profiler, self, sql) as call:
+            results = self.execute_query(sql, params, timeout=timeout)
+            with call.phase("hydrate"):
+                return self._hydrate(results)
+
+    def _hydrate(self, results):
+        """
+        Convierte las filas en instancias del modelo (con el mapa de identidad, si hay).
+        """
+        if self.identity_map is not None:
+            return self.model.from_query(results, identity_map=self.identity_map)
         return self.model.from_query(results)
 
+    async def aexecute_query(self, sql, params=None, timeout=None):
+        """
+        Versión asyncio de execute_query: la consulta se ejecuta en un hilo del executor
+        por defecto, sin bloquear el event loop. Con single-flight, si la misma lectura
+        ya está en curso (desde un hilo o desde otra tarea) se espera su resultado sin
+        ocupar un hilo.
+
+        Las llamadas concurrentes sobre el mismo manager usan la sesión de una en una.
+
+        Returns:
+            list[dict]: Resultados de la consulta como una lista de diccionarios.
+        """
+        flight = self.single_flight
+        if flight is not None and _READ_ONLY.match(sql):
+            key = make_key(str(self.session.get_bind().url), sql, params or {})
+            with BKDeadline.deadline(timeout):
+                rows = await flight.join(key, timeout=self._flight_wait(), label=sql, share=_copy_rows)
+            if rows is not MISSING:
+                return rows
+        loop = asyncio.get_running_loop()
+        # Copia del contexto: el hilo hereda el plazo activo (BKDeadline)
+        call = functools.partial(self._locked, self.execute_query, sql, params, timeout)
+        return await loop.run_in_executor(None, contextvars.copy_context().run, call)
+
+    async def afetch_all(self, sql, params=None, timeout=None):
+        """
+        Versión asyncio de fetch_all (ver aexecute_query).
+
+        Returns:
+            list[model]: Lista de instancias del modelo con los datos mapeados.
+        """
+        if not self.model:
+            raise ValueError("No se ha definido un modelo para este manager.")
+        results = await self.aexecute_query(sql, params, timeout=timeout)
+        return self._hydrate(results)
+
+    def _locked(self, func, *args):
+        with self._session_lock:
+            return func(*args)
+
     def insert(self, sql, params):
         """
         Ejecuta una inserción en la base de datos.
@@ -77,15 +458,13 @@ class BKManager:
             int: Número de filas afectadas.
         """
         # Llamar a before_insert si está definido
-        if hasattr(self, "before_insert"):
-            self.before_insert(params)
+        self._run_hook("before_insert", params)
 
         result = self.session.execute(text(sql), params)
         self.session.commit()
 
         # Llamar a after_insert si está definido
-        if hasattr(self, "after_insert"):
-            self.after_insert(params)
+        self._run_hook("after_insert", params)
 
         return result.rowcount
 
@@ -101,15 +480,13 @@ class BKManager:
             int: Número de filas afectadas.
         """
         # Llamar a before_update si está definido
-        if hasattr(self, "before_update"):
-            self.before_update(params)
+        self._run_hook("before_update", params)
 
         result = self.session.execute(text(sql), params)
         self.session.commit()
 
         # Llamar a after_update si está definido
-        if hasattr(self, "after_update"):
-            self.after_update(params)
+        self._run_hook("after_update", params)
 
         return result.rowcount
 
@@ -125,14 +502,133 @@ class BKManager:
             int: Número de filas afectadas.
         """
         # Llamar a before_delete si está definido
-        if hasattr(self, "before_delete"):
-            self.before_delete(params)
+        self._run_hook("before_delete", params)
 
         result = self.session.execute(text(sql), params)
         self.session.commit()
 
         # Llamar a after_delete si está definido
-        if hasattr(self, "after_delete"):
-            self.after_delete(params)
+        self._run_hook("after_delete", params)
 
         return result.rowcount
+
+    def load_related(self, models, column, attr=None, model=None, chunk_size=1000):
+        """
+        Carga en bloque las filas relacionadas por la clave foránea de `column`
+        (`BKColumn(fk="tabla.columna")`) y las asigna a cada modelo, con una consulta
+        por cada `chunk_size` claves distintas en lugar de una por modelo.
+
+        Returns:
+            list[BKModel]: Los mismos modelos, con el atributo `attr` asignado.
+        """
+        loader = BKRelationLoader(self, chunk_size=chunk_size)
+        return loader.attach(models, column, attr=attr, model=model or BKModel)
+
+    def relation_loader(self, chunk_size=1000):
+        """
+        Devuelve un BKRelationLoader sobre este manager para agrupar peticiones de
+        relaciones (`load` + `dispatch`, o `aload` con asyncio).
+        """
+        return BKRelationLoader(self, chunk_size=chunk_size)
+
+    def _model_columns(self):
+        """
+        Devuelve las columnas BKColumn del modelo del manager, o {} si no las declara.
+        """
+        if self.model and hasattr(self.model, "get_columns"):
+            return self.model.get_columns()
+        return {}
+
+    def iter_json(self, sql, params=None, lines=False, batch_size=1000, chunk_size=65536):
+        """
+        Serializa el resultado de una consulta a JSON por trozos, leyendo el cursor por
+        lotes y sin crear modelos: memoria constante para respuestas HTTP en streaming.
+        Los tipos se codifican con el codificador del modelo del manager.
+
+        Args:
+            sql (str): Sentencia SQL.
+            params (dict, opcional): Parámetros de la consulta.
+            lines (bool): Si True, JSON Lines; si no, un array JSON.
+            batch_size (int): Filas leídas por lote.
+            chunk_size (int): Tamaño aproximado en bytes de cada trozo.
+
+        Yields:
+            bytes: Trozos de la salida en UTF-8.
+        """
+        rows = (row for batch in self.stream_query(sql, params, batch_size) for row in batch)
+        return BKSerializer.iter_json(rows, model=self.model, lines=lines, chunk_size=chunk_size)
+
+    def export(self, sql, params, path, format="csv", compress=None, batch_size=10000, on_progress=None):
+        """
+        Exporta el resultado de una consulta a un fichero leyendo el cursor por lotes,
+        con memoria acotada por `batch_size`.
+
+        Args:
+            sql (str): Sentencia SQL.
+            params (dict): Parámetros de la consulta.
+            path (str): Fichero de destino.
+            format (str): "csv", "jsonl" o "parquet" (requiere pyarrow).
+            compress (str, opcional): "gzip" para CSV/JSONL, o códec interno de Parquet.
+            batch_size (int): Filas leídas y escritas por lote.
+            on_progress (callable, opcional): Recibe las estadísticas tras cada lote.
+
+        Returns:
+            dict: `rows`, `seconds`, `rows_per_sec` y `bytes` del fichero generado.
+        """
+        return BKExport.export_batches(
+            self.stream_query(sql, params, batch_size),
+            path,
+            format=format,
+            compress=compress,
+            columns=self._model_columns(),
+            on_progress=on_progress,
+        )
+
+    def snapshot(self, sql, params, path, version=None, batch_size=10000):
+        """
+        Vuelca el resultado de una consulta a una instantánea columnar en disco,
+        leyendo el cursor por lotes. Los tipos de columna se toman de los BKColumn
+        del modelo del manager (o se infieren si no están declarados).
+
+        Args:
+            sql (str): Sentencia SQL.
+            params (dict): Parámetros de la consulta.
+            path (str): Fichero de destino.
+            version (str, opcional): Versión de los datos, para validarla al cargar.
+            batch_size (int): Filas leídas por lote.
+
+        Returns:
+            dict: Metadatos de la instantánea (filas, columnas, fecha de creación...).
+        """
+        return BKSnapshot.write_snapshot(
+            self.stream_query(sql, params, batch_size),
+            path,
+            columns=self._model_columns(),
+            version=version,
+            fingerprint=BKSnapshot.query_fingerprint(sql, params),
+        )
+
+    def load_snapshot(self, path, max_age=None, version=None, sql=None, params=None):
+        """
+        Abre una instantánea mapeada en memoria.
+
+        Args:
+            path (str): Fichero de la instantánea.
+            max_age (float, opcional): Antigüedad máxima en segundos.
+            version (str, opcional): Versión de datos esperada.
+            sql (str, opcional): Si se indica, la instantánea debe provenir de esta consulta
+                (y de `params`).
+
+        Returns:
+            BKSnapshot.BKSnapshot: Lector con acceso por columnas (`column`) y modelos
+            bajo demanda (`iter_models(manager.model)`).
+
+        Raises:
+            ValueError: Si la instantánea está caducada o no corresponde a la consulta.
+        """
+        snap = BKSnapshot.BKSnapshot(path)
+        fingerprint = BKSnapshot.query_fingerprint(sql, params) if sql is not None else None
+        if not snap.is_fresh(max_age=max_age, version=version, fingerprint=fingerprint):
+            snap.close()
+            raise ValueError(f"La instantánea {path} está caducada o no corresponde a la consulta.")
+        return snap
@@ -1,101 +1,280 @@
-from cassandra.cluster import Cluster
-from BKLibDB.BKModel.BKNoSQLModel.Cassandra.CassandraBKModel_Base import CassandraModel
+import asyncio
+import threading
+from concurrent.futures import Future
+from BKLibDB.BKConnect.BKConnectNoSQL import BKConnectNoSQL
+from BKLibDB.BKManager.BKHooks import BKHookMixin, default_hook
+from BKLibDB.BKModel.BKNoSQLModel.Cassandra.CasssandraBKModel_Base import CassandraModel
 
-class CassandraManager:
+class CassandraManager(BKHookMixin):
     """
     Manager base para manejar operaciones CRUD en Cassandra con lógica before_ y after_.
+    Ofrece variantes asíncronas (`*_async`) basadas en `execute_async` con un límite
+    de peticiones en vuelo para aplicar backpressure.
     """
-    def __init__(self, model, keyspace, table, hosts=["127.0.0.1"]):
+    def __init__(self, model, keyspace, table, hosts=["127.0.0.1"], max_in_flight=256, session=None, **options):
         """
         Inicializa la conexión a Cassandra y define el modelo.
+
+        Args:
+            max_in_flight (int, opcional): Máximo de peticiones asíncronas simultáneas.
+                Al alcanzarlo, las nuevas llamadas `*_async` se bloquean hasta que
+                alguna petición termine.
+            session (cassandra.cluster.Session, opcional): Sesión ya creada. Si no se indica,
+                se usa el Cluster compartido de BKConnectNoSQL para `hosts`/`options`.
+            options (dict): Opciones del Cluster (ver BKConnectNoSQL).
         """
         self.model = model
         self.keyspace = keyspace
         self.table = table
-        self.cluster = Cluster(hosts)
-        self.session = self.cluster.connect(keyspace)
+        self._conn = None
+        if session is None:
+            self._conn = BKConnectNoSQL("CASSANDRA", hosts=list(hosts), keyspace=keyspace, **options)
+            session = self._conn.get_connection()
+        self.session = session
+        self.cluster = session.cluster
+        self.max_in_flight = max_in_flight
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
 
     def close(self):
         """
-        Cierra la conexión con la base de datos.
+        Libera el Cluster compartido (solo se cierra si nadie más lo usa).
         """
-        self.cluster.shutdown()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- CONSTRUCCIÓN DE CONSULTAS ---
+    def _build_insert(self, data):
+        values = data.to_dict()
+        columns = ", ".join(values.keys())
+        placeholders = ", ".join(["%s"] * len(values))
+        query = f"INSERT INTO {self.table} ({columns}) VALUES ({placeholders})"
+        return query, tuple(values.values())
+
+    def _build_update(self, condition, updates):
+        set_clause = ", ".join([f"{key} = %s" for key in updates.keys()])
+        query = f"UPDATE {self.table} SET {set_clause} WHERE {condition}"
+        return query, tuple(updates.values())
+
+    def _build_delete(self, condition):
+        return f"DELETE FROM {self.table} WHERE {condition}"
+
+    def _build_find(self, condition=None):
+        query = f"SELECT * FROM {self.table}"
+        if condition:
+            query += f" WHERE {condition}"
+        return query
 
     # --- INSERT ---
     def insert(self, data):
         """
         Inserta un registro en la tabla.
         """
-        if hasattr(self, "before_insert"):
-            self.before_insert(data)
+        self._run_hook("before_insert", data)
 
-        columns = ", ".join(data.to_dict().keys())
-        placeholders = ", ".join(["%s"] * len(data.to_dict()))
-        query = f"INSERT INTO {self.table} ({columns}) VALUES ({placeholders})"
-        self.session.execute(query, tuple(data.to_dict().values()))
+        query, params = self._build_insert(data)
+        self.session.execute(query, params)
 
-        if hasattr(self, "after_insert"):
-            self.after_insert(data)
+        self._run_hook("after_insert", data)
 
+    @default_hook
     def before_insert(self, data):
-        print(f"[Before Insert] Preparando para insertar: {data.to_dict()}")
+        """
+        Lógica personalizada antes de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_insert(self, data):
-        print(f"[After Insert] Registro insertado correctamente: {data.to_dict()}")
+        """
+        Lógica personalizada después de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- UPDATE ---
     def update(self, condition, updates):
         """
         Actualiza registros en la tabla.
         """
-        if hasattr(self, "before_update"):
-            self.before_update(condition, updates)
+        self._run_hook("before_update", condition, updates)
 
-        set_clause = ", ".join([f"{key} = %s" for key in updates.keys()])
-        query = f"UPDATE {self.table} SET {set_clause} WHERE {condition}"
-        self.session.execute(query, tuple(updates.values()))
+        query, params = self._build_update(condition, updates)
+        self.session.execute(query, params)
 
-        if hasattr(self, "after_update"):
-            self.after_update(condition, updates)
+        self._run_hook("after_update", condition, updates)
 
+    @default_hook
     def before_update(self, condition, updates):
-        print(f"[Before Update] Preparando para actualizar: {updates} con condición: {condition}")
+        """
+        Lógica personalizada antes de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_update(self, condition, updates):
-        print(f"[After Update] Registros actualizados correctamente: {updates}")
+        """
+        Lógica personalizada después de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- DELETE ---
     def delete(self, condition):
         """
         Elimina registros que cumplan la condición.
         """
-        if hasattr(self, "before_delete"):
-            self.before_delete(condition)
+        self._run_hook("before_delete", condition)
 
-        query = f"DELETE FROM {self.table} WHERE {condition}"
+        query = self._build_delete(condition)
         self.session.execute(query)
 
-        if hasattr(self, "after_delete"):
-            self.after_delete(condition)
+        self._run_hook("after_delete", condition)
 
+    @default_hook
     def before_delete(self, condition):
-        print(f"[Before Delete] Preparando para eliminar registros con condición: {condition}")
+        """
+        Lógica personalizada antes de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_delete(self, condition):
-        print(f"[After Delete] Registros eliminados correctamente con condición: {condition}")
+        """
+        Lógica personalizada después de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- FIND ---
     def find(self, condition=None):
         """
         Recupera registros de la tabla.
         """
-        query = f"SELECT * FROM {self.table}"
-        if condition:
-            query += f" WHERE {condition}"
-
+        query = self._build_find(condition)
         rows = self.session.execute(query)
         return [self.model.from_row(row) for row in rows]
 
+    # --- ASYNC ---
+    def _execute_async(self, query, params=None, on_done=None, timeout=None):
+        """
+        Lanza `execute_async` respetando el límite de peticiones en vuelo.
+
+        Args:
+            query (str): Sentencia CQL.
+            params (tuple, opcional): Parámetros de la sentencia.
+            on_done (callable, opcional): Recibe la lista de filas y devuelve el resultado final.
+            timeout (float, opcional): Segundos máximos de espera por un hueco libre.
+
+        Returns:
+            concurrent.futures.Future: Future que se resuelve con el resultado.
+
+        Raises:
+            TimeoutError: Si no se libera un hueco antes de `timeout`.
+        """
+        if not self._in_flight.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError(f"Límite de {self.max_in_flight} peticiones en vuelo alcanzado.")
+
+        future = Future()
+        rows = []
+        try:
+            response = self.session.execute_async(query, params)
+        except Exception:
+            self._in_flight.release()
+            raise
+
+        def _on_page(page):
+            # Las páginas siguientes se piden aquí y vuelven a este mismo callback
+            if page:
+                rows.extend(page)
+            if response.has_more_pages:
+                response.start_fetching_next_page()
+                return
+            self._in_flight.release()
+            try:
+                result = on_done(rows) if on_done else rows
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        def _on_error(exc):
+            self._in_flight.release()
+            future.set_exception(exc)
+
+        response.add_callbacks(_on_page, _on_error)
+        return future
+
+    def insert_async(self, data, timeout=None):
+        """
+        Inserta un registro sin bloquear. El hook after_insert se ejecuta al completarse.
+
+        Returns:
+            concurrent.futures.Future: Se resuelve con None.
+        """
+        self._run_hook("before_insert", data)
+
+        def _done(rows):
+            self._run_hook("after_insert", data)
+
+        query, params = self._build_insert(data)
+        return self._execute_async(query, params, on_done=_done, timeout=timeout)
+
+    def update_async(self, condition, updates, timeout=None):
+        """
+        Actualiza registros sin bloquear. El hook after_update se ejecuta al completarse.
+
+        Returns:
+            concurrent.futures.Future: Se resuelve con None.
+        """
+        self._run_hook("before_update", condition, updates)
+
+        def _done(rows):
+            self._run_hook("after_update", condition, updates)
+
+        query, params = self._build_update(condition, updates)
+        return self._execute_async(query, params, on_done=_done, timeout=timeout)
+
+    def delete_async(self, condition, timeout=None):
+        """
+        Elimina registros sin bloquear. El hook after_delete se ejecuta al completarse.
+
+        Returns:
+            concurrent.futures.Future: Se resuelve con None.
+        """
+        self._run_hook("before_delete", condition)
+
+        def _done(rows):
+            self._run_hook("after_delete", condition)
+
+        query = self._build_delete(condition)
+        return self._execute_async(query, on_done=_done, timeout=timeout)
+
+    def find_async(self, condition=None, timeout=None):
+        """
+        Recupera registros sin bloquear, recorriendo todas las páginas.
+
+        Returns:
+            concurrent.futures.Future: Se resuelve con la lista de modelos.
+        """
+        query = self._build_find(condition)
+        return self._execute_async(
+            query,
+            on_done=lambda rows: [self.model.from_row(row) for row in rows],
+            timeout=timeout,
+        )
+
+    @staticmethod
+    def as_awaitable(future):
+        """
+        Convierte un Future devuelto por los métodos `*_async` en un awaitable de asyncio.
+        Debe llamarse desde dentro de un event loop en ejecución.
+        """
+        return asyncio.wrap_future(future)
+
 
 if __name__ == "__main__":
     """
@@ -127,6 +306,14 @@ for usuario in resultados:
 # Eliminar registros
 manager.delete("id = 1")
 
+# Operaciones asíncronas (hasta max_in_flight peticiones simultáneas)
+futuros = [manager.insert_async(Usuario(id=i, nombre="N", edad=i, correo="n@x.com")) for i in range(1000)]
+for futuro in futuros:
+    futuro.result()
+
+# Desde asyncio
+# usuarios = await manager.as_awaitable(manager.find_async("edad >= 30"))
+
 # Cerrar conexión
 manager.close()
 
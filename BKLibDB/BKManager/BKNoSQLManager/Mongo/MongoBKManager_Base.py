@@ -1,73 +1,115 @@
-from pymongo import MongoClient
+from BKLibDB.BKConnect.BKConnectNoSQL import BKConnectNoSQL
+from BKLibDB.BKManager.BKHooks import BKHookMixin, default_hook
 from BKLibDB.BKModel.BKNoSQLModel.Mongo.MongoBKModel_Base import MongoDBModel
 
 
-class MongoDBManager:
+class MongoDBManager(BKHookMixin):
     """
     Manager base para manejar operaciones CRUD en MongoDB con lógica before_ y after_.
     """
-    def __init__(self, model, database, collection, host="localhost", port=27017):
+    def __init__(self, model, database, collection, host="localhost", port=27017, client=None, **options):
         """
         Inicializa la conexión a MongoDB y selecciona la base de datos y colección.
+
+        Args:
+            client (MongoClient, opcional): Cliente ya creado. Si no se indica, se usa el
+                cliente compartido de BKConnectNoSQL para `host`/`port`/`options`.
+            options (dict): Opciones de pool y timeouts (ver BKConnectNoSQL).
         """
         self.model = model
-        self.client = MongoClient(host, port)
+        self._conn = None
+        if client is None:
+            self._conn = BKConnectNoSQL("MONGO", host=host, port=port, **options)
+            client = self._conn.get_connection()
+        self.client = client
         self.db = self.client[database]
         self.collection = self.db[collection]
 
+    def close(self):
+        """
+        Libera el cliente compartido (solo se cierra si nadie más lo usa).
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     # --- INSERT ---
     def insert(self, model):
         """
         Inserta un documento en la colección.
         """
-        if hasattr(self, "before_insert"):
-            self.before_insert(model)
+        self._run_hook("before_insert", model)
         result = self.collection.insert_one(model.to_dict())
-        if hasattr(self, "after_insert"):
-            self.after_insert(model)
+        self._run_hook("after_insert", model)
         return result.inserted_id
 
+    @default_hook
     def before_insert(self, model):
-        print(f"[Before Insert] Preparando para insertar: {model.to_dict()}")
+        """
+        Lógica personalizada antes de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_insert(self, model):
-        print(f"[After Insert] Documento insertado correctamente: {model.to_dict()}")
+        """
+        Lógica personalizada después de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- UPDATE ---
     def update(self, query, new_data):
         """
         Actualiza documentos que coincidan con la condición.
         """
-        if hasattr(self, "before_update"):
-            self.before_update(query, new_data)
+        self._run_hook("before_update", query, new_data)
         result = self.collection.update_many(query, {"$set": new_data})
-        if hasattr(self, "after_update"):
-            self.after_update(query, new_data)
+        self._run_hook("after_update", query, new_data)
         return result.modified_count
 
+    @default_hook
     def before_update(self, query, new_data):
-        print(f"[Before Update] Condición: {query}, Datos a actualizar: {new_data}")
+        """
+        Lógica personalizada antes de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_update(self, query, new_data):
-        print(f"[After Update] Actualización completada. Condición: {query}, Nuevos datos: {new_data}")
+        """
+        Lógica personalizada después de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- DELETE ---
     def delete(self, query):
         """
         Elimina documentos que coincidan con la condición.
         """
-        if hasattr(self, "before_delete"):
-            self.before_delete(query)
+        self._run_hook("before_delete", query)
         result = self.collection.delete_many(query)
-        if hasattr(self, "after_delete"):
-            self.after_delete(query)
+        self._run_hook("after_delete", query)
         return result.deleted_count
 
+    @default_hook
     def before_delete(self, query):
-        print(f"[Before Delete] Preparando para eliminar documentos que coinciden con: {query}")
+        """
+        Lógica personalizada antes de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_delete(self, query):
-        print(f"[After Delete] Documentos eliminados con la condición: {query}")
+        """
+        Lógica personalizada después de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- FIND ---
     def find(self, query=None):
@@ -1,105 +1,580 @@
-from neo4j import GraphDatabase
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from BKLibDB.BKConnect.BKConnectNoSQL import BKConnectNoSQL
+from BKLibDB.BKManager.BKCache import BKTTLCache, MISSING
+from BKLibDB.BKManager.BKHooks import BKHookMixin, default_hook
 from BKLibDB.BKModel.BKNoSQLModel.Neo4j.Neo4jBKModel_Base import Neo4jModel
 
-class Neo4jManager:
+_graph_cache_lock = threading.Lock()
+
+class Neo4jManager(BKHookMixin):
     """
     Manager base para manejar operaciones CRUD en Neo4j con lógica before_ y after_.
     """
-    def __init__(self, model, uri, user, password):
+    # Caché de adyacencias y caminos compartida (ver neighbours y shortest_path)
+    graph_cache_size = 10000
+    graph_cache_ttl = 60
+
+    def __init__(self, model, uri, user, password, driver=None, **options):
         """
         Inicializa la conexión a Neo4j y define el modelo.
+
+        Args:
+            driver (neo4j.Driver, opcional): Driver ya creado. Si no se indica, se usa el
+                driver compartido de BKConnectNoSQL para `uri`/credenciales/`options`.
+            options (dict): Opciones de pool y timeouts (ver BKConnectNoSQL).
         """
         self.model = model
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self._conn = None
+        if driver is None:
+            self._conn = BKConnectNoSQL("NEO4J", uri=uri, username=user, password=password, **options)
+            driver = self._conn.get_connection()
+        self.driver = driver
+        self._session = None  # Sesión abierta con `session()`, si la hay
+        self._tx = None  # Transacción abierta con `transaction()`, si la hay
 
     def close(self):
         """
-        Cierra la conexión con la base de datos.
+        Libera el driver compartido (solo se cierra si nadie más lo usa).
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- SESIONES Y TRANSACCIONES ---
+    @contextmanager
+    def session(self, **config):
+        """
+        Abre una sesión que reutilizan todas las operaciones del manager dentro del bloque.
+        Si ya hay una sesión abierta, se reutiliza. No es segura entre hilos.
+
+        Example:
+            with manager.session():
+                manager.insert("Persona", {...})
+                manager.find("Persona")
+        """
+        if self._session is not None:
+            yield self._session
+            return
+        with self.driver.session(**config) as session:
+            self._session = session
+            try:
+                yield session
+            finally:
+                self._session = None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa las operaciones del bloque en una transacción explícita.
+        Confirma al salir sin errores y revierte si se produce una excepción.
         """
-        self.driver.close()
+        if self._tx is not None:
+            yield self._tx
+            return
+        with self.session() as session:
+            tx = session.begin_transaction()
+            self._tx = tx
+            try:
+                yield tx
+                tx.commit()
+                # Las escrituras de la transacción ya son visibles para otras sesiones
+                self._invalidate_graph()
+            except Exception:
+                tx.rollback()
+                raise
+            finally:
+                self._tx = None
+                tx.close()
+
+    @contextmanager
+    def _runner(self, **config):
+        """
+        Devuelve el objeto sobre el que ejecutar Cypher: la transacción activa,
+        la sesión activa o, si no hay ninguna, una sesión nueva para la operación.
+        """
+        if self._tx is not None:
+            yield self._tx
+        elif self._session is not None:
+            yield self._session
+        else:
+            with self.driver.session(**config) as session:
+                yield session
+
+    def execute_read(self, work, *args, **kwargs):
+        """
+        Ejecuta `work(tx, *args, **kwargs)` como función de transacción de lectura.
+        El driver la reintenta ante errores transitorios, por lo que debe ser idempotente.
+        """
+        with self.session() as session:
+            return session.execute_read(work, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        """
+        Ejecuta `work(tx, *args, **kwargs)` como función de transacción de escritura.
+        El driver la reintenta ante errores transitorios, por lo que debe ser idempotente.
+        """
+        with self.session() as session:
+            return session.execute_write(work, *args, **kwargs)
 
     # --- INSERT ---
     def insert(self, label, properties):
         """
         Inserta un nodo en la base de datos.
         """
-        if hasattr(self, "before_insert"):
-            self.before_insert(label, properties)
+        self._run_hook("before_insert", label, properties)
 
         query = f"CREATE (n:{label} $props)"
-        with self.driver.session() as session:
-            session.run(query, props=properties)
+        with self._runner() as runner:
+            runner.run(query, props=properties).consume()
+        self._invalidate_graph(label)
 
-        if hasattr(self, "after_insert"):
-            self.after_insert(label, properties)
+        self._run_hook("after_insert", label, properties)
 
+    @default_hook
     def before_insert(self, label, properties):
-        print(f"[Before Insert] Preparando para insertar nodo '{label}' con propiedades: {properties}")
+        """
+        Lógica personalizada antes de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_insert(self, label, properties):
-        print(f"[After Insert] Nodo '{label}' insertado correctamente con propiedades: {properties}")
+        """
+        Lógica personalizada después de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- UPDATE ---
     def update(self, label, match_condition, new_data):
         """
         Actualiza nodos que cumplan la condición.
         """
-        if hasattr(self, "before_update"):
-            self.before_update(label, match_condition, new_data)
+        self._run_hook("before_update", label, match_condition, new_data)
 
         query = f"""
         MATCH (n:{label}) WHERE {match_condition}
         SET n += $props
         """
-        with self.driver.session() as session:
-            session.run(query, props=new_data)
+        with self._runner() as runner:
+            runner.run(query, props=new_data).consume()
+        self._invalidate_graph(label)
 
-        if hasattr(self, "after_update"):
-            self.after_update(label, match_condition, new_data)
+        self._run_hook("after_update", label, match_condition, new_data)
 
+    @default_hook
     def before_update(self, label, match_condition, new_data):
-        print(f"[Before Update] Preparando para actualizar nodos '{label}' que coincidan con: {match_condition}, Nuevos datos: {new_data}")
+        """
+        Lógica personalizada antes de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_update(self, label, match_condition, new_data):
-        print(f"[After Update] Nodos '{label}' actualizados correctamente con datos: {new_data}")
+        """
+        Lógica personalizada después de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- DELETE ---
     def delete(self, label, match_condition):
         """
         Elimina nodos que cumplan la condición.
         """
-        if hasattr(self, "before_delete"):
-            self.before_delete(label, match_condition)
+        self._run_hook("before_delete", label, match_condition)
 
         query = f"""
         MATCH (n:{label}) WHERE {match_condition}
         DETACH DELETE n
         """
-        with self.driver.session() as session:
-            session.run(query)
+        with self._runner() as runner:
+            runner.run(query).consume()
+        self._invalidate_graph()
 
-        if hasattr(self, "after_delete"):
-            self.after_delete(label, match_condition)
+        self._run_hook("after_delete", label, match_condition)
 
+    @default_hook
     def before_delete(self, label, match_condition):
-        print(f"[Before Delete] Preparando para eliminar nodos '{label}' que coincidan con: {match_condition}")
+        """
+        Lógica personalizada antes de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_delete(self, label, match_condition):
-        print(f"[After Delete] Nodos '{label}' eliminados correctamente que coincidían con: {match_condition}")
+        """
+        Lógica personalizada después de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- FIND ---
-    def find(self, label, match_condition=None):
+    @staticmethod
+    def _find_query(label, match_condition=None, fields=None):
         """
-        Encuentra nodos que coincidan con una condición.
+        Construye la consulta de búsqueda. Si se indican `fields`, la proyección se hace
+        en el RETURN y solo viajan esas propiedades.
         """
         condition = f"WHERE {match_condition}" if match_condition else ""
-        query = f"""
+        if fields:
+            projection = ", ".join(f".{field}" for field in fields)
+            returning = f"n {{{projection}}} AS n"
+        else:
+            returning = "n"
+        return f"""
         MATCH (n:{label}) {condition}
-        RETURN n
+        RETURN {returning}
+        """
+
+    def _from_record(self, record):
+        node = record["n"]
+        return self.model.from_dict(node if isinstance(node, dict) else node._properties)
+
+    def find(self, label, match_condition=None, fields=None):
+        """
+        Encuentra nodos que coincidan con una condición.
+
+        Args:
+            fields (list[str], opcional): Propiedades a devolver; por defecto, el nodo completo.
+        """
+        query = self._find_query(label, match_condition, fields)
+        with self._runner() as runner:
+            results = runner.run(query)
+            return [self._from_record(record) for record in results]
+
+    def iter_find(self, label, match_condition=None, fields=None, fetch_size=1000):
+        """
+        Igual que `find`, pero devuelve un generador que recibe los registros del servidor
+        en bloques de `fetch_size` y crea los modelos bajo demanda.
+        La sesión permanece abierta hasta agotar o cerrar el generador.
+        """
+        query = self._find_query(label, match_condition, fields)
+        with self._runner(fetch_size=fetch_size) as runner:
+            for record in runner.run(query):
+                yield self._from_record(record)
+
+    # --- RECORRIDOS (con caché) ---
+    @classmethod
+    def _graph_cache(cls):
+        """
+        Devuelve la caché de adyacencias y caminos, creándola la primera vez. Es única
+        para Neo4jManager y todas sus subclases (las claves incluyen el driver), de modo
+        que la escritura de cualquier manager invalida lo que leen los demás. Su tamaño
+        y caducidad se toman de la primera clase que la usa.
+        """
+        with _graph_cache_lock:
+            cache = Neo4jManager.__dict__.get("_bk_graph_cache")
+            if cache is None:
+                cache = BKTTLCache(maxsize=cls.graph_cache_size, ttl=cls.graph_cache_ttl)
+                Neo4jManager._bk_graph_cache = cache
+        return cache
+
+    @classmethod
+    def graph_cache_stats(cls):
+        """
+        Returns:
+            dict: Estadísticas de la caché de recorridos compartida (ver BKTTLCache.stats).
+        """
+        return cls._graph_cache().stats()
+
+    @classmethod
+    def invalidate_graph_cache(cls):
+        """
+        Vacía la caché de recorridos compartida (e.g., tras escrituras externas).
+        """
+        cls._graph_cache().invalidate()
+
+    def _invalidate_graph(self, label=None):
         """
-        with self.driver.session() as session:
-            results = session.run(query)
-            return [self.model.from_dict(record["n"]._properties) for record in results]
+        Descarta las entradas de este driver afectadas por una escritura: las adyacencias
+        que parten de o llegan a nodos `label` y todos los caminos. Sin `label` (cambios
+        de relaciones o borrados), todas las de este driver.
+        """
+        driver = id(self.driver)
+        if label is None:
+            predicate = lambda key: key[0] == driver
+        else:
+            predicate = lambda key: key[0] == driver and (
+                key[1] == "path" or key[2] == label or key[-1] in (label, None)
+            )
+        self._graph_cache().invalidate(predicate=predicate)
+
+    @staticmethod
+    def _pattern(rel_type, direction, hops=""):
+        rel = f"[:{rel_type}{hops}]" if rel_type else f"[{hops}]"
+        if direction == "out":
+            return f"-{rel}->"
+        if direction == "in":
+            return f"<-{rel}-"
+        if direction == "both":
+            return f"-{rel}-"
+        raise ValueError(f"Dirección no soportada: {direction} (use 'out', 'in' o 'both')")
+
+    def _adjacency(self, nodes, key, rel_type, direction, to_label):
+        """
+        Devuelve {(etiqueta, valor): [(etiqueta, valor, propiedades), ...]} con los
+        vecinos directos de `nodes`. Los que no están en caché se piden en una consulta
+        por etiqueta.
+        """
+        cache = self._graph_cache()
+        driver = id(self.driver)
+        adjacency = {}
+        missing = {}
+        for node in nodes:
+            cache_key = (driver, "adj", node[0], key, node[1], rel_type, direction, to_label)
+            cached = cache.get(cache_key)
+            if cached is MISSING:
+                missing.setdefault(node[0], []).append(node[1])
+            else:
+                adjacency[node] = cached
+
+        pattern = self._pattern(rel_type, direction)
+        target = f"m:{to_label}" if to_label else "m"
+        for label, values in missing.items():
+            query = f"""
+            UNWIND $ids AS id
+            MATCH (n:{label} {{{key}: id}}){pattern}({target})
+            WHERE m.{key} IS NOT NULL
+            RETURN id, labels(m)[0] AS label, m.{key} AS key, properties(m) AS props
+            """
+            found = {value: {} for value in values}
+            with self._runner() as runner:
+                for record in runner.run(query, ids=values):
+                    found[record["id"]].setdefault((record["label"], record["key"]), record["props"])
+            for value, neighbours in found.items():
+                entry = tuple((n_label, n_key, props) for (n_label, n_key), props in neighbours.items())
+                adjacency[(label, value)] = entry
+                # Dentro de una transacción la lectura puede incluir cambios sin confirmar
+                if self._tx is None:
+                    cache.set((driver, "adj", label, key, value, rel_type, direction, to_label), entry)
+        return adjacency
+
+    def _to_model(self, props, fields):
+        if fields:
+            props = {field: props.get(field) for field in fields}
+        return self.model.from_dict(dict(props))
+
+    def neighbours(self, label, key, value, rel_type=None, depth=1, direction="both",
+                   to_label=None, fields=None):
+        """
+        Devuelve los nodos a `depth` saltos o menos del nodo `(label {key: value})`,
+        en orden de distancia y sin repetir. Los nodos se identifican por su primera
+        etiqueta y la propiedad `key`; los que no la tienen no se recorren.
+
+        Las adyacencias se guardan en la caché compartida por nodo, etiqueta, tipo de
+        relación y dirección, de modo que los saltos repetidos sobre los mismos nodos no
+        consultan la base de datos. Las escrituras del manager invalidan la caché, que
+        además caduca a los `graph_cache_ttl` segundos.
+
+        Args:
+            rel_type (str, opcional): Tipo de relación a seguir (por defecto, cualquiera).
+            depth (int): Número máximo de saltos.
+            direction (str): "out", "in" o "both".
+            to_label (str, opcional): Etiqueta de los vecinos (por defecto, cualquiera).
+            fields (list[str], opcional): Propiedades de los modelos devueltos.
+
+        Returns:
+            list[model]: Nodos vecinos como instancias del modelo.
+        """
+        start = (label, value)
+        seen = {start}
+        frontier = [start]
+        found = []
+        for _ in range(depth):
+            adjacency = self._adjacency(frontier, key, rel_type, direction, to_label)
+            following = []
+            for node in frontier:
+                for n_label, n_key, props in adjacency[node]:
+                    if (n_label, n_key) in seen:
+                        continue
+                    seen.add((n_label, n_key))
+                    found.append(props)
+                    following.append((n_label, n_key))
+            frontier = following
+            if not frontier:
+                break
+        return [self._to_model(props, fields) for props in found]
+
+    def shortest_path(self, label, key, start, end, rel_type=None, max_depth=15,
+                      direction="both", end_label=None, fields=None):
+        """
+        Devuelve el camino más corto entre `(label {key: start})` y
+        `(end_label {key: end})` con `shortestPath`. El resultado se guarda en la caché
+        de recorridos compartida.
+
+        Args:
+            rel_type (str, opcional): Tipo de relación a seguir (por defecto, cualquiera).
+            max_depth (int): Longitud máxima del camino.
+            direction (str): "out", "in" o "both".
+            end_label (str, opcional): Etiqueta del nodo final (por defecto, `label`).
+            fields (list[str], opcional): Propiedades de los modelos devueltos.
+
+        Returns:
+            list[model] | None: Nodos del camino (incluidos los extremos), o None si no
+            hay camino.
+        """
+        end_label = end_label or label
+        cache = self._graph_cache()
+        cache_key = (id(self.driver), "path", label, key, start, end_label, end, rel_type, direction, max_depth)
+        nodes = cache.get(cache_key)
+        if nodes is MISSING:
+            pattern = self._pattern(rel_type, direction, f"*..{max_depth}")
+            query = f"""
+            MATCH (a:{label} {{{key}: $start}}), (b:{end_label} {{{key}: $end}})
+            MATCH p = shortestPath((a){pattern}(b))
+            RETURN [node IN nodes(p) | properties(node)] AS nodes
+            """
+            with self._runner() as runner:
+                record = runner.run(query, start=start, end=end).single()
+            nodes = tuple(record["nodes"]) if record is not None else None
+            if self._tx is None:
+                cache.set(cache_key, nodes)
+        if nodes is None:
+            return None
+        return [self._to_model(props, fields) for props in nodes]
+
+    # --- BATCH (UNWIND) ---
+    @staticmethod
+    def _chunks(rows, chunk_size):
+        """
+        Divide un iterable en listas de como máximo `chunk_size` elementos sin materializarlo.
+        """
+        iterator = iter(rows)
+        while True:
+            batch = list(islice(iterator, chunk_size))
+            if not batch:
+                return
+            yield batch
+
+    def _run_batches(self, query, rows, chunk_size=1000, parallel=False, workers=4, on_batch=None):
+        """
+        Ejecuta `query` con `UNWIND $rows` por lotes, una transacción de escritura por lote.
+
+        En modo secuencial se reutiliza una única sesión para todos los lotes. En modo
+        paralelo cada hilo usa su propia sesión y toma lotes de un iterador compartido;
+        solo debe usarse cuando los lotes no se bloquean entre sí (p. ej. nodos distintos).
+
+        Args:
+            query (str): Sentencia Cypher que consume el parámetro `$rows`.
+            rows (iterable[dict]): Filas a enviar.
+            chunk_size (int): Filas por transacción.
+            parallel (bool): Si True, reparte los lotes entre `workers` hilos.
+            workers (int): Número de hilos en modo paralelo.
+            on_batch (callable, opcional): Recibe las estadísticas acumuladas tras cada lote.
+
+        Returns:
+            dict: Estadísticas con `rows`, `batches`, `seconds` y `rows_per_sec`.
+        """
+        stats = {"rows": 0, "batches": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        def _record(batch):
+            with lock:
+                stats["rows"] += len(batch)
+                stats["batches"] += 1
+                stats["seconds"] = time.perf_counter() - start
+                stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+                if on_batch:
+                    on_batch(dict(stats))
+
+        def _write(session, batch):
+            session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+            _record(batch)
+
+        batches = self._chunks(rows, chunk_size)
+        if self._tx is not None:
+            # Dentro de `transaction()` los lotes forman parte de la transacción activa
+            for batch in batches:
+                self._tx.run(query, rows=batch).consume()
+                _record(batch)
+        elif not parallel:
+            with self.session() as session:
+                for batch in batches:
+                    _write(session, batch)
+        else:
+            def _worker():
+                with self.driver.session() as session:
+                    while True:
+                        with lock:
+                            batch = next(batches, None)
+                        if batch is None:
+                            return
+                        _write(session, batch)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_worker) for _ in range(workers)]
+                for future in futures:
+                    future.result()
+
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+        return stats
+
+    def insert_many(self, label, rows, chunk_size=1000, parallel=False, workers=4, on_batch=None):
+        """
+        Crea un nodo por fila mediante `UNWIND`, en transacciones de `chunk_size` filas.
+        No ejecuta los hooks before_/after_ por fila.
+
+        Returns:
+            dict: Estadísticas de rendimiento (ver `_run_batches`).
+        """
+        query = f"UNWIND $rows AS row CREATE (n:{label}) SET n = row"
+        try:
+            return self._run_batches(query, rows, chunk_size, parallel, workers, on_batch)
+        finally:
+            self._invalidate_graph(label)
+
+    def merge_many(self, label, key, rows, chunk_size=1000, parallel=False, workers=4, on_batch=None):
+        """
+        Crea o actualiza nodos identificados por `key` (propiedad o lista de propiedades)
+        mediante `UNWIND ... MERGE`. Conviene tener un índice o restricción sobre `key`.
+
+        Returns:
+            dict: Estadísticas de rendimiento (ver `_run_batches`).
+        """
+        keys = [key] if isinstance(key, str) else list(key)
+        match = ", ".join(f"{k}: row.{k}" for k in keys)
+        query = f"UNWIND $rows AS row MERGE (n:{label} {{{match}}}) SET n += row"
+        try:
+            return self._run_batches(query, rows, chunk_size, parallel, workers, on_batch)
+        finally:
+            self._invalidate_graph(label)
+
+    def relate_many(self, start_label, start_key, rel_type, end_label, end_key, rows,
+                    merge=True, chunk_size=1000, parallel=False, workers=4, on_batch=None):
+        """
+        Crea relaciones entre nodos existentes mediante `UNWIND`.
+
+        Cada fila debe tener la forma `{"start": valor, "end": valor, "props": {...}}`,
+        donde `start` y `end` se comparan con `start_key` y `end_key` respectivamente.
+
+        Args:
+            merge (bool): Si True usa MERGE (no duplica relaciones); si False, CREATE.
+
+        Returns:
+            dict: Estadísticas de rendimiento (ver `_run_batches`).
+        """
+        verb = "MERGE" if merge else "CREATE"
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (a:{start_label} {{{start_key}: row.start}})
+        MATCH (b:{end_label} {{{end_key}: row.end}})
+        {verb} (a)-[r:{rel_type}]->(b)
+        SET r += coalesce(row.props, {{}})
+        """
+        try:
+            return self._run_batches(query, rows, chunk_size, parallel, workers, on_batch)
+        finally:
+            self._invalidate_graph()
 
 if __name__ == "__main__":
     """
@@ -125,6 +600,28 @@ resultados = manager.find("Persona", "n.edad >= 30")
 for persona in resultados:
     print(persona.to_dict())
 
+# Recorrer en streaming solo con las propiedades necesarias
+for persona in manager.iter_find("Persona", fields=["nombre"], fetch_size=500):
+    print(persona.nombre)
+
+# Agrupar operaciones en una transacción
+with manager.transaction():
+    manager.insert("Persona", {"nombre": "Ana", "edad": 25, "ciudad": "CDMX"})
+    manager.update("Persona", "n.nombre = 'Ana'", {"edad": 26})
+
+# Función de transacción con reintentos
+total = manager.execute_read(lambda tx: tx.run("MATCH (n:Persona) RETURN count(n) AS c").single()["c"])
+
+# Carga masiva por lotes
+stats = manager.merge_many("Persona", "nombre", [{"nombre": f"P{i}", "edad": i} for i in range(100000)])
+print(f"{stats['rows_per_sec']:.0f} nodos/s")
+manager.relate_many("Persona", "nombre", "CONOCE", "Persona", "nombre",
+                    [{"start": "P1", "end": "P2", "props": {"desde": 2020}}])
+
+# Recorridos con caché: vecinos a 2 saltos y camino más corto
+amigos = manager.neighbours("Persona", "nombre", "Elieser", rel_type="CONOCE", depth=2)
+camino = manager.shortest_path("Persona", "nombre", "P1", "P2", rel_type="CONOCE")
+
 # Eliminar nodos
 manager.delete("Persona", "n.nombre = 'Elieser'")
 
@@ -1,73 +1,115 @@
-import redis
+from BKLibDB.BKConnect.BKConnectNoSQL import BKConnectNoSQL
+from BKLibDB.BKManager.BKHooks import BKHookMixin, default_hook
 from BKLibDB.BKModel.BKNoSQLModel.Redis.RedisBKModel_Base import RedisModel
 
-class RedisManager:
+class RedisManager(BKHookMixin):
     """
     Manager base para manejar operaciones CRUD en Redis con lógica before_ y after_.
     """
-    def __init__(self, model, host="localhost", port=6379, db=0):
+    def __init__(self, model, host="localhost", port=6379, db=0, client=None, **options):
         """
         Inicializa la conexión con Redis y define el modelo.
+
+        Args:
+            client (redis.Redis, opcional): Cliente ya creado. Si no se indica, se usa el
+                cliente compartido de BKConnectNoSQL para `host`/`port`/`db`/`options`.
+            options (dict): Opciones de pool y timeouts (ver BKConnectNoSQL).
         """
-        self.client = redis.Redis(host=host, port=port, db=db)
+        self._conn = None
+        if client is None:
+            self._conn = BKConnectNoSQL("REDIS", host=host, port=port, db=db, **options)
+            client = self._conn.get_connection()
+        self.client = client
         self.model = model
 
+    def close(self):
+        """
+        Libera el cliente compartido (solo se cierra si nadie más lo usa).
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     # --- INSERT ---
     def insert(self, key, model):
         """
         Inserta un modelo en Redis.
         """
-        if hasattr(self, "before_insert"):
-            self.before_insert(key, model)
+        self._run_hook("before_insert", key, model)
         self.client.set(key, model.to_json())
-        if hasattr(self, "after_insert"):
-            self.after_insert(key, model)
+        self._run_hook("after_insert", key, model)
 
+    @default_hook
     def before_insert(self, key, model):
-        print(f"[Before Insert] Preparando para insertar clave '{key}' con valor: {model.to_json()}")
+        """
+        Lógica personalizada antes de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_insert(self, key, model):
-        print(f"[After Insert] Clave '{key}' insertada correctamente.")
+        """
+        Lógica personalizada después de una operación de inserción.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- UPDATE ---
     def update(self, key, new_data):
         """
         Actualiza un modelo existente en Redis.
         """
-        if hasattr(self, "before_update"):
-            self.before_update(key, new_data)
+        self._run_hook("before_update", key, new_data)
         existing = self.client.get(key)
         if existing:
             model_data = RedisModel.from_json(existing)
             model_data.__dict__.update(new_data)
             self.client.set(key, model_data.to_json())
-            if hasattr(self, "after_update"):
-                self.after_update(key, new_data)
+            self._run_hook("after_update", key, new_data)
         else:
             print(f"[Update] Clave '{key}' no encontrada.")
 
+    @default_hook
     def before_update(self, key, new_data):
-        print(f"[Before Update] Preparando para actualizar clave '{key}' con datos: {new_data}")
+        """
+        Lógica personalizada antes de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_update(self, key, new_data):
-        print(f"[After Update] Clave '{key}' actualizada correctamente con datos: {new_data}")
+        """
+        Lógica personalizada después de una operación de actualización.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- DELETE ---
     def delete(self, key):
         """
         Elimina un modelo en Redis.
         """
-        if hasattr(self, "before_delete"):
-            self.before_delete(key)
+        self._run_hook("before_delete", key)
         self.client.delete(key)
-        if hasattr(self, "after_delete"):
-            self.after_delete(key)
+        self._run_hook("after_delete", key)
 
+    @default_hook
     def before_delete(self, key):
-        print(f"[Before Delete] Preparando para eliminar clave '{key}'.")
+        """
+        Lógica personalizada antes de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
+    @default_hook
     def after_delete(self, key):
-        print(f"[After Delete] Clave '{key}' eliminada correctamente.")
+        """
+        Lógica personalizada después de una operación de borrado.
+        Sobrescribir en subclases según sea necesario.
+        """
+        pass
 
     # --- FIND ---
     def find(self, key):
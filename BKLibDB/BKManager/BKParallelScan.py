@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Lectura en paralelo de una consulta dividida por rangos de una columna.
+
+El rango [mínimo, máximo] de la columna se divide en N tramos y cada tramo se lee en
+su propio hilo con su propia sesión (y por tanto su propia conexión del pool), con
+cursor en streaming. Los lotes llegan al consumidor por colas acotadas: la memoria
+depende del tamaño de lote y de la cola, no del tamaño del resultado.
+"""
+
+import contextvars
+import queue
+import threading
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import text
+
+_END = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def split_range(lo, hi, n):
+    """
+    Divide [lo, hi] en como mucho `n` tramos consecutivos.
+
+    Args:
+        lo, hi: Extremos (enteros, decimales, fechas...).
+        n (int): Número de tramos.
+
+    Returns:
+        list[tuple]: (desde, hasta, último); cada tramo incluye `desde` y excluye
+        `hasta`, salvo el último, que lo incluye.
+
+    Raises:
+        ValueError: Si los valores no admiten aritmética (e.g., texto).
+    """
+    if isinstance(lo, int) and isinstance(hi, int):
+        step = max(1, -(-(hi - lo + 1) // n))
+        bounds = list(range(lo, hi + 1, step)) + [hi]
+    else:
+        try:
+            width = hi - lo
+            bounds = [lo + width / n * i for i in range(n)] + [hi]
+        except TypeError:
+            raise ValueError(f"No se puede dividir el rango de valores {type(lo).__name__}.") from None
+    bounds = sorted(set(bounds))
+    if len(bounds) == 1:
+        return [(lo, hi, True)]
+    last = len(bounds) - 2
+    return [(bounds[i], bounds[i + 1], i == last) for i in range(len(bounds) - 1)]
+
+
+class _Batches:
+    """
+    Iterador de lotes de uno o varios tramos. Al agotarlo, cerrarlo o descartarlo, los
+    lectores que le envían lotes se detienen.
+    """
+    def __init__(self, scan, source, stop, producers, transform):
+        self._scan = scan
+        self._source = source
+        self._stop = stop
+        self._pending = producers
+        self._transform = transform
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._scan._start()
+        while self._pending:
+            item = self._source.get()
+            if item is _END:
+                self._pending -= 1
+            elif isinstance(item, _Failure):
+                self.close()
+                raise item.error
+            else:
+                return self._transform(item) if self._transform else item
+        self.close()
+        raise StopIteration
+
+    def close(self):
+        self._pending = 0
+        self._stop.set()
+
+    def __del__(self):
+        self.close()
+
+
+class BKParallelScan:
+    """
+    Lectura en paralelo de `sql` por tramos de `column`. Cada lectura admite un único
+    consumo, con `stream` o con `partitions`; los hilos se inician con la primera
+    lectura de sus iteradores.
+
+    Args:
+        bind (Engine): Motor sobre el que abrir una sesión por tramo.
+        sql (str): Consulta de origen; debe devolver `column`.
+        params (dict): Parámetros de la consulta.
+        column (str): Columna de partición.
+        n (int): Número de tramos (y de conexiones simultáneas).
+        batch_size (int): Filas por lote.
+        queue_size (int): Lotes en espera por cola antes de frenar a los lectores.
+    """
+    def __init__(self, bind, sql, params, column, n=4, batch_size=1000, queue_size=4):
+        self.sql = sql
+        self.params = params or {}
+        self.column = column
+        self.n = n
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._Session = sessionmaker(bind=bind)
+        self._threads = []
+        self._channels = None
+        self._started = False
+        self._lock = threading.Lock()
+        self.ranges = self._plan()
+
+    def _plan(self):
+        """
+        Devuelve las consultas de cada tramo: [(sql, params)].
+        """
+        column = self.column
+        with self._Session() as session:
+            row = session.execute(
+                text(
+                    f"SELECT MIN({column}) AS bk_lo, MAX({column}) AS bk_hi, "
+                    f"COUNT(*) - COUNT({column}) AS bk_nulls FROM ({self.sql}) bk_scan"
+                ),
+                self.params,
+            ).one()
+        lo, hi, nulls = row
+        ranges = []
+        if lo is not None:
+            for start, end, last in split_range(lo, hi, self.n):
+                upper = "<=" if last else "<"
+                ranges.append((
+                    f"SELECT * FROM ({self.sql}) bk_scan "
+                    f"WHERE {column} >= :bk_lo AND {column} {upper} :bk_hi",
+                    {**self.params, "bk_lo": start, "bk_hi": end},
+                ))
+        if nulls:
+            ranges.append((f"SELECT * FROM ({self.sql}) bk_scan WHERE {column} IS NULL", self.params))
+        return ranges
+
+    def _read(self, sql, params, target, stop):
+        """
+        Lee un tramo en streaming y deja sus lotes en `target`.
+        """
+        def put(item):
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            with self._Session() as session:
+                statement = text(sql).execution_options(stream_results=True, yield_per=self.batch_size)
+                result = session.execute(statement, params)
+                try:
+                    for partition in result.partitions(self.batch_size):
+                        if not put([row._asdict() for row in partition]):
+                            return
+                finally:
+                    result.close()
+        except Exception as e:
+            put(_Failure(e))
+        put(_END)
+
+    def _claim(self, channels):
+        """
+        Reserva la lectura para los iteradores de `channels`: los (cola, evento de
+        parada) de cada tramo.
+
+        Raises:
+            RuntimeError: Si ya se pidieron iteradores (con `stream` o `partitions`).
+        """
+        with self._lock:
+            if self._channels is not None:
+                raise RuntimeError(
+                    "BKParallelScan solo admite un consumo: ya se pidieron sus iteradores "
+                    "con stream() o partitions()."
+                )
+            self._channels = channels
+
+    def _start(self):
+        """
+        Arranca un hilo por tramo (solo la primera vez).
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for (sql, params), (target, stop) in zip(self.ranges, self._channels):
+                # Copia del contexto: cada hilo hereda el plazo activo (BKDeadline)
+                thread = threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(self._read, sql, params, target, stop),
+                    name="bk-scan",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stream(self, transform=None):
+        """
+        Returns:
+            iterator: Lotes de todos los tramos según llegan (sin orden entre tramos).
+
+        Raises:
+            RuntimeError: Si ya se pidieron iteradores de esta lectura.
+        """
+        target = queue.Queue(self.queue_size * max(1, len(self.ranges)))
+        stop = threading.Event()
+        self._claim([(target, stop)] * len(self.ranges))
+        return _Batches(self, target, stop, len(self.ranges), transform)
+
+    def partitions(self, transform=None):
+        """
+        Returns:
+            list[iterator]: Un iterador de lotes por tramo, en orden de rango. Los tramos
+            se leen en paralelo aunque se consuman de uno en uno.
+
+        Raises:
+            RuntimeError: Si ya se pidieron iteradores de esta lectura.
+        """
+        channels = [(queue.Queue(self.queue_size), threading.Event()) for _ in self.ranges]
+        self._claim(channels)
+        return [_Batches(self, target, stop, 1, transform) for target, stop in channels]
+
+    def close(self):
+        """
+        Detiene todos los lectores (e.g., si no se van a consumir todos los tramos).
+        """
+        for _, stop in self._channels or ():
+            stop.set()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Perfilado de memoria de las operaciones de los managers con tracemalloc.
+
+Cada llamada perfilada (fetch_all, execute_query...) se divide en fases:
+    - "fetch": lectura de las filas del driver.
+    - "asdict": conversión de las filas a diccionarios (`Row._asdict`).
+    - "hydrate": creación de los modelos (`from_query`).
+De cada fase se mide el pico de memoria sobre el inicio de la llamada y la memoria
+neta que queda asignada al terminar. Los resultados se agrupan por clase de manager
+y huella de la consulta (sin parámetros).
+
+tracemalloc mide el proceso completo: con varios hilos ejecutando consultas a la vez,
+las asignaciones de unos se atribuyen también a otros. Para resultados precisos,
+perfilar en un worker de un solo hilo.
+"""
+
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from BKLibDB.BKManager.BKSnapshot import query_fingerprint
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("fetch", "asdict", "hydrate")
+
+
+class _NullCall:
+    """
+    Llamada sin perfilado: sus fases no hacen nada.
+    """
+    def phase(self, name):
+        return nullcontext()
+
+
+NULL_CALL = _NullCall()
+
+
+def profile_call(profiler, manager, sql):
+    """
+    Devuelve el contexto de perfilado de una llamada, o uno vacío si `profiler` es None.
+    """
+    if profiler is None:
+        return nullcontext(NULL_CALL)
+    return profiler.call(manager, sql)
+
+
+class _Call:
+    def __init__(self, base):
+        self.base = base
+        self.peak = 0
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = peak - self.base
+            self.peak = max(self.peak, peak)
+            self.phases[name] = {
+                "peak": peak,
+                "net": current - start,
+                "seconds": time.perf_counter() - began,
+            }
+
+
+class BKMemoryProfiler:
+    """
+    Acumula el consumo de memoria de las llamadas de uno o varios managers.
+
+    Args:
+        threshold (int, opcional): Pico en bytes a partir del cual se emite una alarma.
+        on_alarm (callable, opcional): Recibe el registro de la llamada que supera el
+            umbral. Sin él, la alarma se escribe en el log como warning.
+        frames (int): Profundidad de las trazas de tracemalloc si hay que iniciarlo.
+
+    Example:
+        profiler = VentaManager.enable_memory_profiling(threshold=200 * 1024 ** 2)
+        ...
+        print(profiler.format_report(top=5))
+    """
+    def __init__(self, threshold=None, on_alarm=None, frames=1):
+        self.threshold = threshold
+        self.on_alarm = on_alarm
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(frames)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def call(self, manager, sql):
+        """
+        Perfila una llamada. Las llamadas anidadas del mismo hilo (e.g., execute_query
+        dentro de fetch_all) se acumulan en la exterior.
+
+        Yields:
+            objeto con `phase(nombre)`, contexto que mide cada fase.
+        """
+        current = getattr(self._local, "call", None)
+        if current is not None:
+            yield current
+            return
+        call = self._local.call = _Call(tracemalloc.get_traced_memory()[0])
+        began = time.perf_counter()
+        try:
+            yield call
+        finally:
+            self._local.call = None
+            net = tracemalloc.get_traced_memory()[0] - call.base
+            self._record(type(manager).__name__, sql, call, net, time.perf_counter() - began)
+
+    def _record(self, manager_name, sql, call, net, seconds):
+        fingerprint = query_fingerprint(sql)
+        record = {
+            "manager": manager_name,
+            "fingerprint": fingerprint,
+            "sql": " ".join(sql.split())[:200],
+            "peak": call.peak,
+            "net": net,
+            "seconds": seconds,
+            "phases": call.phases,
+        }
+        with self._lock:
+            stats = self._stats.get((manager_name, fingerprint))
+            if stats is None:
+                stats = self._stats[(manager_name, fingerprint)] = {
+                    "manager": manager_name,
+                    "fingerprint": fingerprint,
+                    "sql": record["sql"],
+                    "calls": 0,
+                    "peak_max": 0,
+                    "peak_total": 0,
+                    "net_total": 0,
+                    "seconds_total": 0.0,
+                    "phases": {},
+                }
+            stats["calls"] += 1
+            stats["peak_max"] = max(stats["peak_max"], call.peak)
+            stats["peak_total"] += call.peak
+            stats["net_total"] += net
+            stats["seconds_total"] += seconds
+            for name, phase in call.phases.items():
+                totals = stats["phases"].setdefault(name, {"peak_max": 0, "net_total": 0})
+                totals["peak_max"] = max(totals["peak_max"], phase["peak"])
+                totals["net_total"] += phase["net"]
+
+        if self.threshold is not None and call.peak >= self.threshold:
+            if self.on_alarm is not None:
+                self.on_alarm(record)
+            else:
+                logger.warning(
+                    "%s: pico de %.1f MiB en la consulta %s (%s)",
+                    manager_name, call.peak / 1024 ** 2, fingerprint[:12], record["sql"],
+                )
+
+    def report(self, top=10, by="peak_max"):
+        """
+        Devuelve las consultas con mayor consumo.
+
+        Args:
+            top (int): Número de entradas.
+            by (str): Criterio: "peak_max", "peak_avg", "net_avg" o "calls".
+
+        Returns:
+            list[dict]: Entradas con `manager`, `fingerprint`, `sql`, `calls`, `peak_max`,
+            `peak_avg`, `net_avg`, `seconds_avg` y el detalle por fase.
+        """
+        with self._lock:
+            entries = []
+            for stats in self._stats.values():
+                calls = stats["calls"]
+                entries.append({
+                    "manager": stats["manager"],
+                    "fingerprint": stats["fingerprint"],
+                    "sql": stats["sql"],
+                    "calls": calls,
+                    "peak_max": stats["peak_max"],
+                    "peak_avg": stats["peak_total"] / calls,
+                    "net_avg": stats["net_total"] / calls,
+                    "seconds_avg": stats["seconds_total"] / calls,
+                    "phases": {name: dict(phase) for name, phase in stats["phases"].items()},
+                })
+        entries.sort(key=lambda entry: entry[by], reverse=True)
+        return entries[:top]
+
+    def format_report(self, top=10, by="peak_max"):
+        """
+        Returns:
+            str: El informe de `report` como tabla de texto.
+        """
+        lines = [f"{'manager':<24} {'llamadas':>8} {'pico máx':>10} {'pico med':>10} {'neto med':>10}  fases (pico máx)  sql"]
+        for entry in self.report(top, by):
+            phases = " ".join(
+                f"{name}={entry['phases'][name]['peak_max'] / 1024 ** 2:.1f}"
+                for name in PHASES if name in entry["phases"]
+            )
+            lines.append(
+                f"{entry['manager'][:24]:<24} {entry['calls']:>8} "
+                f"{entry['peak_max'] / 1024 ** 2:>9.1f}M {entry['peak_avg'] / 1024 ** 2:>9.1f}M "
+                f"{entry['net_avg'] / 1024 ** 2:>9.1f}M  {phases}  {entry['sql'][:60]}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """
+        Borra las estadísticas acumuladas.
+        """
+        with self._lock:
+            self._stats.clear()
+
+    def stop(self):
+        """
+        Detiene tracemalloc si lo inició este perfilador.
+        """
+        if self._started and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started = False
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future
+from BKLibDB.BKModel.BKModel_Base import BKModel
+
+
+def parse_fk(fk):
+    """
+    Separa una referencia `BKColumn.fk` ("esquema.tabla.columna" o "tabla.columna")
+    en (tabla, columna).
+
+    Raises:
+        ValueError: Si la referencia no incluye tabla y columna.
+    """
+    table, _, column = fk.rpartition(".")
+    if not table or not column:
+        raise ValueError(f"Referencia fk no válida: '{fk}'. Formato esperado: 'tabla.columna'.")
+    return table, column
+
+
+class BKRelationLoader:
+    """
+    Cargador por lotes de relaciones definidas con `BKColumn(fk="tabla.columna")`,
+    al estilo DataLoader: las peticiones de claves se acumulan y se resuelven juntas con
+    `BKManager.query_by_keys` (array en PostgreSQL, tabla temporal o bloques de
+    `chunk_size` claves en el resto), en lugar de una consulta por fila.
+
+    Uso síncrono:
+        loader = BKRelationLoader(manager)
+        futuros = [loader.load("public.cliente.id", p.cliente_id) for p in pedidos]
+        loader.dispatch()  # una consulta para todas las claves
+
+    Uso con asyncio: `await loader.aload(...)`; todas las peticiones hechas en la misma
+    vuelta del event loop se agrupan automáticamente.
+    """
+    def __init__(self, manager, chunk_size=1000):
+        self.manager = manager
+        self.chunk_size = chunk_size
+        self._pending = {}  # (fk, modelo) -> {clave: [futures]}
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def load(self, fk, key, model=BKModel):
+        """
+        Solicita la fila relacionada con `key`. No consulta hasta `dispatch()`.
+
+        Args:
+            fk (str): Referencia "tabla.columna".
+            key (Any): Valor de la clave.
+            model (type): Clase con la que se hidrata la fila relacionada.
+
+        Returns:
+            concurrent.futures.Future: Se resuelve con el modelo relacionado o None.
+        """
+        future = Future()
+        with self._lock:
+            self._pending.setdefault((fk, model), {}).setdefault(key, []).append(future)
+        return future
+
+    async def aload(self, fk, key, model=BKModel):
+        """
+        Versión asyncio de `load`: agrupa las peticiones de la vuelta actual del event
+        loop y, al final de esa vuelta, las resuelve con `dispatch` en un hilo del
+        executor por defecto, sin bloquear el event loop durante la consulta.
+        """
+        future = self.load(fk, key, model)
+        with self._lock:
+            schedule = not self._scheduled
+            self._scheduled = True
+        if schedule:
+            loop = asyncio.get_running_loop()
+            loop.call_soon(self._dispatch_scheduled, loop)
+        return await asyncio.wrap_future(future)
+
+    def _dispatch_scheduled(self, loop):
+        with self._lock:
+            self._scheduled = False
+        # Copia del contexto: el hilo hereda el plazo activo (BKDeadline)
+        call = functools.partial(self.manager._locked, self.dispatch)
+        loop.run_in_executor(None, contextvars.copy_context().run, call)
+
+    def dispatch(self):
+        """
+        Resuelve todas las peticiones pendientes con el mínimo de consultas.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for (fk, model), waiters in pending.items():
+            # Se descartan las peticiones canceladas (e.g., la tarea de `aload` se canceló)
+            live = {}
+            for key, futures in waiters.items():
+                futures = [future for future in futures if future.set_running_or_notify_cancel()]
+                if futures:
+                    live[key] = futures
+            waiters = live
+            if not waiters:
+                continue
+            table, column = parse_fk(fk)
+            try:
+                related = self.fetch(table, column, list(waiters), model)
+            except Exception as e:
+                for futures in waiters.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+            for key, futures in waiters.items():
+                for future in futures:
+                    future.set_result(related.get(key))
+
+    def fetch(self, table, column, keys, model=BKModel):
+        """
+        Obtiene las filas de `table` cuyo `column` está en `keys` (ver BKManager.query_by_keys).
+
+        Returns:
+            dict: {clave: modelo}.
+        """
+        rows = self.manager.query_by_keys(
+            f"SELECT * FROM {table} WHERE {{keys}}", keys, column, chunk_size=self.chunk_size
+        )
+        return {row[column]: obj for row, obj in zip(rows, model.from_query(rows))}
+
+    def attach(self, models, column, attr=None, model=BKModel):
+        """
+        Carga y asigna a cada modelo su fila relacionada a través de la columna `column`,
+        cuya declaración BKColumn debe tener `fk`.
+
+        Args:
+            models (list[BKModel]): Modelos padre.
+            column (str): Columna con la clave foránea.
+            attr (str, opcional): Atributo donde se guarda el relacionado. Por defecto,
+                el nombre de la columna sin el sufijo "_id" (o con "_rel" si no lo tiene).
+            model (type): Clase con la que se hidratan las filas relacionadas.
+
+        Returns:
+            list[BKModel]: Los mismos modelos, ya enlazados.
+        """
+        if not models:
+            return models
+        declared = type(models[0]).get_columns().get(column)
+        if declared is None or not declared.fk:
+            raise ValueError(f"La columna '{column}' no declara una clave foránea (fk).")
+        if attr is None:
+            attr = column[:-3] if column.endswith("_id") else f"{column}_rel"
+        table, target = parse_fk(declared.fk)
+        values = [obj.__dict__.get(column) for obj in models]
+        keys = list({value for value in values if value is not None})
+        related = self.fetch(table, target, keys, model) if keys else {}
+        for obj, value in zip(models, values):
+            setattr(obj, attr, related.get(value))
+        return models
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import asyncio
+import concurrent.futures
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from BKLibDB.BKManager.BKCache import MISSING
+
+# Máximo de etiquetas con métricas propias (se descartan las menos recientes)
+MAX_LABELS = 1000
+
+
+class BKSingleFlight:
+    """
+    Agrupa llamadas concurrentes idénticas: mientras una llamada con una clave está en
+    curso, el resto de hilos (o tareas asyncio, con `join`) que piden la misma clave
+    esperan su resultado en lugar de repetirla.
+
+    Las métricas se acumulan por etiqueta (`label`), que puede agrupar varias claves
+    (e.g., el texto SQL sin los parámetros).
+    """
+    def __init__(self):
+        self._calls = {}  # clave -> Future de la llamada en curso
+        self._lock = threading.Lock()
+        self._labels = OrderedDict()
+        self.calls = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _count(self, label, metric):
+        """
+        Suma uno a la métrica global y a la de la etiqueta. Debe llamarse con el lock.
+        """
+        setattr(self, metric, getattr(self, metric) + 1)
+        if label is None:
+            return
+        stats = self._labels.get(label)
+        if stats is None:
+            stats = self._labels[label] = {"calls": 0, "shared": 0, "timeouts": 0, "errors": 0}
+            if len(self._labels) > MAX_LABELS:
+                self._labels.popitem(last=False)
+        else:
+            self._labels.move_to_end(label)
+        stats[metric] += 1
+
+    def do(self, key, func, timeout=None, label=None, share=None):
+        """
+        Ejecuta `func()` o, si ya hay una llamada en curso con `key`, espera y devuelve
+        su resultado (o relanza su excepción).
+
+        Args:
+            key (hashable): Clave de la llamada.
+            func (callable): Función sin argumentos que produce el resultado.
+            timeout (float, opcional): Espera máxima, en segundos, por una llamada en curso.
+            label (str, opcional): Etiqueta para las métricas.
+            share (callable, opcional): Transforma el resultado que recibe cada llamador,
+                incluido el que ejecuta `func` (e.g., una copia, para que no compartan
+                objetos mutables). El resultado original no se entrega a nadie.
+
+        Raises:
+            TimeoutError: Si la llamada en curso no termina antes de `timeout`.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                # En curso: los que esperan no pueden cancelarla
+                future.set_running_or_notify_cancel()
+                self._count(label, "calls")
+            else:
+                self._count(label, "shared")
+        if not leader:
+            return self._wait(future, timeout, label, share)
+        try:
+            result = func()
+        except BaseException as e:
+            with self._lock:
+                self._count(label, "errors")
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return share(result) if share else result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _wait(self, future, timeout, label, share):
+        try:
+            result = future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            with self._lock:
+                self._count(label, "timeouts")
+            raise TimeoutError(f"Tiempo de espera agotado ({timeout}s) por una llamada en curso") from None
+        return share(result) if share else result
+
+    async def join(self, key, timeout=None, label=None, share=None):
+        """
+        Desde asyncio: si hay una llamada en curso con `key`, espera su resultado sin
+        bloquear el event loop. Si no la hay, devuelve `MISSING` y el llamador debe
+        ejecutarla (normalmente con `do` en un hilo del executor).
+
+        Raises:
+            TimeoutError: Si la llamada en curso no termina antes de `timeout`.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                return MISSING
+            self._count(label, "shared")
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._count(label, "timeouts")
+            raise TimeoutError(f"Tiempo de espera agotado ({timeout}s) por una llamada en curso") from None
+        return share(result) if share else result
+
+    def stats(self, per_label=False):
+        """
+        Returns:
+            dict: `calls` ejecutadas, llamadas `shared` que reutilizaron una en curso,
+            `timeouts`, `errors` e `in_flight`. Con `per_label=True`, también `labels`
+            con las mismas métricas por etiqueta.
+        """
+        with self._lock:
+            stats = {
+                "calls": self.calls,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "in_flight": len(self._calls),
+            }
+            if per_label:
+                stats["labels"] = {label: dict(values) for label, values in self._labels.items()}
+            return stats
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Instantáneas columnares en disco de resultados de consultas.
+
+Formato del fichero:
+    MAGIC | bloques de columnas (alineados a 8 bytes) | pie JSON | longitud del pie (uint64) | MAGIC
+
+Cada columna se guarda en un bloque contiguo según su tipo:
+    - int64, float64, bool: array de ancho fijo en el orden de bytes nativo, más un
+      array de un byte por fila con 1 en las posiciones nulas.
+    - str, bytes, date, datetime, decimal: array de offsets int64 (filas + 1) y un blob
+      con los valores codificados; los nulos se marcan en el mismo array de nulos.
+
+Al leer, el fichero se mapea en memoria: las columnas numéricas se exponen como
+memoryview sin copias y el resto se decodifica bajo demanda.
+"""
+
+import datetime
+import decimal
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+MAGIC = b"BKSNAP01"
+FORMAT_VERSION = 1
+
+_FIXED = {"int64": "q", "float64": "d", "bool": "B"}
+_TYPE_KINDS = {
+    bool: "bool",
+    int: "int64",
+    float: "float64",
+    str: "str",
+    bytes: "bytes",
+    datetime.datetime: "datetime",
+    datetime.date: "date",
+    decimal.Decimal: "decimal",
+}
+
+
+def _kind_of(coltype):
+    """
+    Devuelve el tipo de almacenamiento para un tipo Python (el de BKColumn.coltype).
+    """
+    for pytype, kind in _TYPE_KINDS.items():
+        if isinstance(coltype, type) and issubclass(coltype, pytype):
+            return kind
+    return "str"
+
+
+def _infer_kind(values):
+    """
+    Tipo de almacenamiento del primer valor no nulo, o None si todos son nulos.
+    """
+    for value in values:
+        if value is not None:
+            return _kind_of(type(value))
+    return None
+
+
+def _encode(kind, value):
+    if kind == "bytes":
+        return bytes(value)
+    if kind in ("date", "datetime") and hasattr(value, "isoformat"):
+        return value.isoformat().encode("utf-8")
+    return str(value).encode("utf-8")
+
+
+def _decode(kind, raw):
+    if kind == "bytes":
+        return bytes(raw)
+    text = bytes(raw).decode("utf-8")
+    if kind == "date":
+        return datetime.date.fromisoformat(text)
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(text)
+    if kind == "decimal":
+        return decimal.Decimal(text)
+    return text
+
+
+def query_fingerprint(sql, params=None):
+    """
+    Huella estable de una consulta y sus parámetros, usada para detectar instantáneas
+    generadas con otra consulta.
+    """
+    payload = json.dumps([" ".join(sql.split()), params or {}], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class _ColumnSpool:
+    """
+    Acumula una columna en ficheros temporales mientras se leen los lotes,
+    para escribirla después como bloque contiguo sin mantenerla en memoria.
+
+    Sin tipo (`kind` None), el tipo se fija con el primer valor no nulo; hasta entonces
+    solo se cuentan los nulos iniciales.
+    """
+    def __init__(self, name, kind=None):
+        self.name = name
+        self.kind = None
+        self.values = tempfile.TemporaryFile()
+        self.nulls = tempfile.TemporaryFile()
+        self.offsets = None
+        self.position = 0
+        self.leading_nulls = 0
+        if kind is not None:
+            self._set_kind(kind)
+
+    def _set_kind(self, kind):
+        self.kind = kind
+        if kind not in _FIXED:
+            self.offsets = tempfile.TemporaryFile()
+            array("q", [0]).tofile(self.offsets)
+        pending, self.leading_nulls = self.leading_nulls, 0
+        while pending:
+            count = min(pending, 1 << 16)
+            self._write([None] * count)
+            pending -= count
+
+    def append(self, values):
+        if self.kind is None:
+            kind = _infer_kind(values)
+            if kind is None:
+                self.leading_nulls += len(values)
+                return
+            self._set_kind(kind)
+        self._write(values)
+
+    def finish(self):
+        """
+        Fija el tipo de una columna que solo ha tenido nulos.
+        """
+        if self.kind is None:
+            self._set_kind("str")
+
+    def _write(self, values):
+        if self.kind in _FIXED:
+            typecode = _FIXED[self.kind]
+            zero = 0.0 if typecode == "d" else 0
+            try:
+                data = array(typecode, [zero if value is None else value for value in values])
+            except (TypeError, OverflowError):
+                raise ValueError(
+                    f"La columna '{self.name}' se guarda como {self.kind} y recibió un valor de "
+                    f"otro tipo o fuera de rango. Declare su tipo con BKColumn en `columns`."
+                ) from None
+            array("B", [value is None for value in values]).tofile(self.nulls)
+            data.tofile(self.values)
+            return
+        array("B", [value is None for value in values]).tofile(self.nulls)
+        offsets = array("q")
+        for value in values:
+            if value is not None:
+                raw = _encode(self.kind, value)
+                self.values.write(raw)
+                self.position += len(raw)
+            offsets.append(self.position)
+        offsets.tofile(self.offsets)
+
+    def close(self):
+        for spool in (self.values, self.nulls, self.offsets):
+            if spool is not None:
+                spool.close()
+
+
+def _copy_block(source, target):
+    """
+    Copia un fichero temporal al final de `target`, alineado a 8 bytes.
+
+    Returns:
+        tuple: (offset, longitud) del bloque en `target`.
+    """
+    padding = -target.tell() % 8
+    target.write(b"\0" * padding)
+    offset = target.tell()
+    source.seek(0)
+    while True:
+        chunk = source.read(1 << 20)
+        if not chunk:
+            break
+        target.write(chunk)
+    return offset, target.tell() - offset
+
+
+def write_snapshot(batches, path, columns=None, version=None, fingerprint=None):
+    """
+    Escribe una instantánea a partir de lotes de filas.
+
+    Args:
+        batches (iterable[list[dict]]): Lotes de filas (e.g., `BKManager.stream_query`).
+        path (str): Fichero de destino. Se escribe en un temporal y se renombra al final.
+        columns (dict[str, BKColumn], opcional): Columnas del modelo para fijar los tipos;
+            las columnas no declaradas toman el tipo de su primer valor no nulo.
+        version (str, opcional): Versión de los datos, comprobada al cargar.
+        fingerprint (str, opcional): Huella de la consulta (ver `query_fingerprint`).
+
+    Returns:
+        dict: Metadatos de la instantánea (pie del fichero).
+
+    Raises:
+        ValueError: Si una columna recibe valores que no caben en su tipo (e.g., decimales
+            en una columna inferida como int64). No queda ningún fichero a medias.
+    """
+    columns = columns or {}
+    spools = None
+    rows = 0
+    tmp_path = f"{path}.tmp"
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            if spools is None:
+                spools = [
+                    _ColumnSpool(
+                        name,
+                        _kind_of(columns[name].coltype) if name in columns else None,
+                    )
+                    for name in batch[0]
+                ]
+            for spool in spools:
+                spool.append([row.get(spool.name) for row in batch])
+            rows += len(batch)
+        for spool in spools or []:
+            spool.finish()
+
+        meta = {
+            "format": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "created": time.time(),
+            "version": version,
+            "fingerprint": fingerprint,
+            "rows": rows,
+            "columns": [],
+        }
+        with open(tmp_path, "wb") as target:
+            target.write(MAGIC)
+            for spool in spools or []:
+                entry = {"name": spool.name, "kind": spool.kind}
+                entry["values"] = _copy_block(spool.values, target)
+                entry["nulls"] = _copy_block(spool.nulls, target)
+                if spool.offsets is not None:
+                    entry["offsets"] = _copy_block(spool.offsets, target)
+                meta["columns"].append(entry)
+            footer = json.dumps(meta).encode("utf-8")
+            target.write(footer)
+            target.write(struct.pack("<Q", len(footer)))
+            target.write(MAGIC)
+        os.replace(tmp_path, path)
+        return meta
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        for spool in spools or []:
+            spool.close()
+
+
+class _LazyColumn:
+    """
+    Vista de solo lectura de una columna de longitud variable; decodifica al acceder.
+    """
+    def __init__(self, snapshot, entry):
+        self._buffer = snapshot._buffer
+        self._kind = entry["kind"]
+        self._base = entry["values"][0]
+        self._offsets = snapshot._view(entry["offsets"], "q")
+        self._nulls = snapshot._view(entry["nulls"], "B")
+
+    def __len__(self):
+        return len(self._nulls)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if self._nulls[index]:
+            return None
+        start = self._base + self._offsets[index]
+        end = self._base + self._offsets[index + 1]
+        return _decode(self._kind, self._buffer[start:end])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class BKSnapshot:
+    """
+    Lector de instantáneas mapeado en memoria.
+
+    Example:
+        with BKSnapshot("ventas.bksnap") as snap:
+            importes = snap.column("importe")   # memoryview de float64, sin copias
+            for venta in snap.iter_models(Venta):
+                ...
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Instantánea vacía o corrupta: {path}")
+        self._buffer = memoryview(self._mmap)
+        size = len(self._buffer)
+        if size < 2 * len(MAGIC) + 8 or self._buffer[:8] != MAGIC or self._buffer[size - 8:] != MAGIC:
+            self.close()
+            raise ValueError(f"El fichero no es una instantánea BKLibDB: {path}")
+        (footer_length,) = struct.unpack("<Q", self._buffer[size - 16:size - 8])
+        self.meta = json.loads(bytes(self._buffer[size - 16 - footer_length:size - 16]))
+        if self.meta["format"] != FORMAT_VERSION or self.meta["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"Formato u orden de bytes de la instantánea no soportado: {path}")
+        self._columns = {entry["name"]: entry for entry in self.meta["columns"]}
+        self._cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def columns(self):
+        """
+        list[str]: Nombres de las columnas, en el orden de la consulta.
+        """
+        return list(self._columns)
+
+    def _view(self, block, typecode):
+        offset, length = block
+        return self._buffer[offset:offset + length].cast(typecode)
+
+    def column(self, name):
+        """
+        Devuelve una columna completa sin materializarla.
+
+        Las columnas int64/float64/bool se devuelven como memoryview sobre el fichero
+        mapeado (sin copias; las posiciones nulas contienen 0, ver `nulls`). El resto,
+        como una secuencia que decodifica cada valor al accederlo.
+        """
+        view = self._cache.get(name)
+        if view is None:
+            entry = self._columns[name]
+            if entry["kind"] in _FIXED:
+                view = self._view(entry["values"], _FIXED[entry["kind"]])
+            else:
+                view = _LazyColumn(self, entry)
+            self._cache[name] = view
+        return view
+
+    def nulls(self, name):
+        """
+        Returns:
+            memoryview: Un byte por fila, 1 si el valor es nulo.
+        """
+        return self._view(self._columns[name]["nulls"], "B")
+
+    def row(self, index):
+        """
+        Returns:
+            dict: Fila `index` con sus valores Python.
+        """
+        data = {}
+        for name, entry in self._columns.items():
+            if self.nulls(name)[index]:
+                data[name] = None
+                continue
+            value = self.column(name)[index]
+            data[name] = bool(value) if entry["kind"] == "bool" else value
+        return data
+
+    def iter_rows(self):
+        """
+        Genera las filas como diccionarios, una a una.
+        """
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def iter_models(self, model):
+        """
+        Genera instancias de `model` bajo demanda.
+        """
+        for row in self.iter_rows():
+            yield model(**row)
+
+    def is_fresh(self, max_age=None, version=None, fingerprint=None):
+        """
+        Comprueba si la instantánea sigue siendo válida.
+
+        Args:
+            max_age (float, opcional): Antigüedad máxima en segundos.
+            version (str, opcional): Versión esperada de los datos.
+            fingerprint (str, opcional): Huella esperada de la consulta.
+        """
+        if max_age is not None and time.time() - self.meta["created"] > max_age:
+            return False
+        if version is not None and self.meta["version"] != version:
+            return False
+        if fingerprint is not None and self.meta["fingerprint"] != fingerprint:
+            return False
+        return True
+
+    def close(self):
+        """
+        Libera el mapeo. Las vistas obtenidas con `column` dejan de ser válidas.
+        """
+        self._cache.clear()
+        try:
+            self._buffer.release()
+            self._mmap.close()
+        except BufferError:
+            # Aún hay vistas en uso: el mapeo se liberará cuando se recojan
+            pass
+        self._file.close()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BKWriteBehindBuffer:
+    """
+    Buffer de escritura diferida para inserciones pequeñas desde muchos hilos.
+
+    Las inserciones encoladas con `submit` se agrupan en un hilo propio y se envían
+    como un único executemany (una sola ida y vuelta y un solo commit) cuando se
+    alcanzan `max_rows` filas o pasan `max_delay_ms` milisegundos desde la primera
+    fila pendiente. Cada llamador recibe un Future que se resuelve cuando su fila
+    está confirmada en la base de datos.
+
+    El buffer usa sus propias sesiones sobre `bind`, por lo que no comparte la sesión
+    (no segura entre hilos) de ningún manager.
+    """
+    def __init__(self, bind, max_rows=500, max_delay_ms=50, max_queue=10000, put_timeout=None):
+        """
+        Args:
+            bind (sqlalchemy.engine.Engine): Motor sobre el que se abren las sesiones del buffer.
+            max_rows (int): Filas máximas por lote.
+            max_delay_ms (float): Espera máxima desde la primera fila pendiente hasta el envío.
+            max_queue (int): Tamaño máximo de la cola. Al llenarse, `submit` se bloquea.
+            put_timeout (float, opcional): Segundos máximos de bloqueo en `submit`.
+        """
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000.0
+        self.put_timeout = put_timeout
+        self._Session = sessionmaker(bind=bind)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="bk-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, manager, sql, params):
+        """
+        Encola una inserción.
+
+        Args:
+            manager (BKManager): Manager que la solicita (para el hook after_insert).
+            sql (str): Sentencia INSERT con parámetros nombrados.
+            params (dict): Parámetros de la fila.
+
+        Returns:
+            concurrent.futures.Future: Se resuelve con 1 cuando la fila está confirmada,
+            o con la excepción del lote si falla.
+
+        Raises:
+            RuntimeError: Si el buffer está cerrado.
+            TimeoutError: Si la cola sigue llena tras `put_timeout` segundos.
+        """
+        future = Future()
+        # Con el lock: la fila queda por delante de la parada de `close`
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El buffer de escritura diferida está cerrado.")
+            try:
+                self._queue.put((manager, sql, params, future), timeout=self.put_timeout)
+            except queue.Full:
+                raise TimeoutError("La cola del buffer de escritura diferida está llena.") from None
+        return future
+
+    def _loop(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+        # Vacía lo que haya quedado en la cola tras la señal de parada
+        pending = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                pending.append(item)
+        for start in range(0, len(pending), self.max_rows):
+            self._flush(pending[start:start + self.max_rows])
+
+    def _flush(self, batch):
+        """
+        Envía un lote agrupando las filas por sentencia, una transacción por sentencia.
+        """
+        groups = {}
+        markers = []
+        for entry in batch:
+            if entry[1] is None:
+                markers.append(entry[3])  # Marca de `flush()`
+            else:
+                groups.setdefault(entry[1], []).append(entry)
+
+        for sql, entries in groups.items():
+            with self._Session() as session:
+                try:
+                    session.execute(text(sql), [params for _, _, params, _ in entries])
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    for _, _, _, future in entries:
+                        future.set_exception(e)
+                    continue
+
+            for manager, _, params, future in entries:
+                future.set_result(1)
+                try:
+                    manager._run_hook("after_insert", params)
+                except Exception:
+                    logger.exception("Error en after_insert tras la escritura diferida")
+
+        for future in markers:
+            future.set_result(None)
+
+    def flush(self, timeout=None):
+        """
+        Espera a que se confirmen todas las filas encoladas hasta este momento. Con el
+        buffer cerrado vuelve en el acto: `close` ya envió las filas pendientes.
+        """
+        future = Future()
+        # Con el lock: la marca queda por delante de la parada de `close`
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put((None, None, None, future), timeout=timeout)
+        future.result(timeout=timeout)
+
+    def close(self, timeout=None):
+        """
+        Deja de aceptar filas, envía las pendientes y detiene el hilo del buffer. Si
+        tras detenerlo quedara algo en la cola, su Future falla con RuntimeError.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            return  # Sigue enviando: lo pendiente se resolverá al terminar
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and not item[3].done():
+                item[3].set_exception(RuntimeError("El buffer de escritura diferida está cerrado."))
+
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import threading
+import weakref
+
+
+class BKIdentityMap:
+    """
+    Mapa de identidad para instancias de BKModel.
+
+    Garantiza que, dentro de su ámbito (un manager o varios que lo compartan), cada fila
+    identificada por su clave primaria (columnas `BKColumn(primary_key=True)`) se
+    represente con una única instancia. Las referencias son débiles: una instancia
+    desaparece del mapa cuando nadie más la usa, así que un manager de larga vida no
+    acumula memoria.
+    """
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    @staticmethod
+    def _key(model_cls, values):
+        """
+        Construye la clave (clase, valores de la clave primaria) a partir de un diccionario.
+        Devuelve None si el modelo no tiene clave primaria o faltan valores.
+        """
+        keys = model_cls.get_primary_keys()
+        if not keys:
+            return None
+        try:
+            return model_cls, tuple(values[key] for key in keys)
+        except KeyError:
+            return None
+
+    def get(self, model_cls, key):
+        """
+        Busca una instancia por su clave primaria sin consultar la base de datos.
+
+        Args:
+            model_cls (type): Clase del modelo.
+            key (Any | tuple): Valor de la clave primaria (tupla si es compuesta).
+
+        Returns:
+            BKModel | None: La instancia, si está en el mapa.
+        """
+        values = key if isinstance(key, tuple) else (key,)
+        return self._objects.get((model_cls, values))
+
+    def add(self, obj):
+        """
+        Registra una instancia. Si ya había otra con la misma clave, la sustituye.
+        """
+        key = self._key(type(obj), obj.__dict__)
+        if key is not None:
+            with self._lock:
+                self._objects[key] = obj
+        return obj
+
+    def discard(self, obj):
+        """
+        Elimina una instancia del mapa, si está registrada.
+        """
+        key = self._key(type(obj), obj.__dict__)
+        if key is not None:
+            with self._lock:
+                if self._objects.get(key) is obj:
+                    del self._objects[key]
+
+    def resolve(self, model_cls, row, refresh=False):
+        """
+        Devuelve la instancia ya registrada para la clave de `row` o crea y registra una nueva.
+
+        Args:
+            model_cls (type): Clase del modelo.
+            row (dict): Fila de la consulta.
+            refresh (bool): Si True, actualiza la instancia existente con los valores de `row`.
+
+        Returns:
+            BKModel: Instancia única para esa fila.
+        """
+        key = self._key(model_cls, row)
+        if key is None:
+            return model_cls(**row)
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is None:
+                obj = model_cls(**row)
+                self._objects[key] = obj
+                return obj
+        if refresh:
+            for name, value in row.items():
+                setattr(obj, name, value)
+        return obj
+
+    def clear(self):
+        """
+        Vacía el mapa.
+        """
+        with self._lock:
+            self._objects.clear()
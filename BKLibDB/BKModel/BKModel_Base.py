@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
+from BKLibDB.BKModel.BKSerializer import BKSerializableMixin
+
 class BKColumn:
     """
     Representa una columna personalizada que define metadatos y mapea datos de consultas.
@@ -14,11 +16,18 @@ class BKColumn:
         self.fk = fk
 
 
-class BKModel:
+class BKModel(BKSerializableMixin):
     """
     Clase base para modelos que no dependen directamente de tablas de la base de datos.
     Es flexible y permite crear objetos con datos de consultas personalizadas.
+
+    Los modelos que declaran columnas con BKColumn pueden guardar una instantánea de
+    sus valores (`mark_clean`) para saber después qué columnas han cambiado
+    (`get_changes`). La instantánea vive en un slot, fuera de `__dict__`.
+
+    `to_json_bytes` e `iter_json` serializan directamente a JSON (ver BKSerializer).
     """
+    __slots__ = ("__dict__", "__weakref__", "_bk_snapshot")
     def __init__(self, **kwargs):
         """
         Inicializa el modelo con los valores proporcionados.
@@ -26,6 +35,7 @@ class BKModel:
         Args:
             kwargs (dict): Datos de inicialización, donde cada clave es un atributo del modelo.
         """
+        self._bk_snapshot = None
         for key, value in kwargs.items():
             setattr(self, key, value)
 
@@ -37,22 +47,84 @@ class BKModel:
         return f"<{self.__class__.__name__}({attrs})>"
 
     @classmethod
-    def from_query(cls, results):
+    def get_columns(cls):
+        """
+        Devuelve las columnas BKColumn declaradas en la clase y sus bases, en orden
+        de declaración. Se calcula una sola vez por clase.
+
+        Returns:
+            dict[str, BKColumn]: Columnas indexadas por nombre de columna.
+        """
+        columns = cls.__dict__.get("_bk_columns")
+        if columns is None:
+            columns = {}
+            for klass in reversed(cls.__mro__):
+                for value in vars(klass).values():
+                    if isinstance(value, BKColumn):
+                        columns[value.name] = value
+            cls._bk_columns = columns
+        return columns
+
+    @classmethod
+    def get_primary_keys(cls):
+        """
+        Returns:
+            tuple[str]: Nombres de las columnas con `primary_key=True`.
+        """
+        return tuple(name for name, column in cls.get_columns().items() if column.primary_key)
+
+    def column_values(self):
+        """
+        Returns:
+            dict: Valores de las columnas declaradas que tiene asignados la instancia.
+        """
+        data = self.__dict__
+        return {name: data[name] for name in self.get_columns() if name in data}
+
+    def mark_clean(self):
+        """
+        Guarda una instantánea de los valores actuales de las columnas.
+        Los cambios posteriores se obtienen con `get_changes`.
+        """
+        self._bk_snapshot = self.column_values()
+
+    def get_changes(self):
+        """
+        Devuelve las columnas modificadas desde el último `mark_clean`. Sin instantánea
+        previa, se consideran modificadas todas las columnas asignadas.
+
+        Returns:
+            dict: Columnas modificadas y sus valores actuales.
+        """
+        values = self.column_values()
+        snapshot = getattr(self, "_bk_snapshot", None)
+        if snapshot is None:
+            return values
+        missing = object()
+        return {name: value for name, value in values.items() if snapshot.get(name, missing) != value}
+
+    @classmethod
+    def from_query(cls, results, identity_map=None):
         """
         Convierte resultados de consultas (lista de diccionarios) en una lista de modelos.
 
         Args:
             results (list[dict]): Lista de diccionarios con los datos de la consulta.
+            identity_map (BKIdentityMap, opcional): Si se indica, las filas con una clave
+                primaria ya cargada devuelven la instancia existente.
 
         Returns:
             list[BKModel]: Lista de instancias del modelo con los datos mapeados.
         """
+        if identity_map is not None:
+            return [identity_map.resolve(cls, row) for row in results]
         return [cls(**row) for row in results]
 
     @staticmethod
     def to_dict(data):
         """
         Convierte un modelo o una lista de modelos en un diccionario o lista de diccionarios.
+        Devuelve copias: modificarlas no altera los modelos.
 
         Args:
             data (BKModel | list[BKModel]): Modelo o lista de modelos.
@@ -61,8 +133,8 @@ class BKModel:
             dict | list[dict]: Diccionario o lista de diccionarios.
         """
         if isinstance(data, list):
-            return [obj.__dict__ for obj in data]
-        return data.__dict__
+            return [dict(obj.__dict__) for obj in data]
+        return dict(data.__dict__)
 
     @classmethod
     def ensure_list(cls, results):
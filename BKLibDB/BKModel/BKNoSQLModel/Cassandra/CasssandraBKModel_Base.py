@@ -1,4 +1,6 @@
-class CassandraModel:
+from BKLibDB.BKModel.BKSerializer import BKSerializableMixin
+
+class CassandraModel(BKSerializableMixin):
     """
     Modelo base para representar filas de Cassandra como objetos.
     """
@@ -15,6 +17,6 @@ class CassandraModel:
 
     def to_dict(self):
         """
-        Convierte el modelo a un diccionario.
+        Convierte el modelo a un diccionario (copia de sus atributos).
         """
-        return self.__dict__
+        return dict(self.__dict__)
@@ -1,4 +1,6 @@
-class MongoDBModel:
+from BKLibDB.BKModel.BKSerializer import BKSerializableMixin
+
+class MongoDBModel(BKSerializableMixin):
     """
     Modelo base para representar un documento de MongoDB como objeto.
     """
@@ -15,6 +17,6 @@ class MongoDBModel:
 
     def to_dict(self):
         """
-        Convierte el modelo a un diccionario.
+        Convierte el modelo a un diccionario (copia de sus atributos).
         """
-        return self.__dict__
+        return dict(self.__dict__)
@@ -1,4 +1,6 @@
-class Neo4jModel:
+from BKLibDB.BKModel.BKSerializer import BKSerializableMixin
+
+class Neo4jModel(BKSerializableMixin):
     """
     Modelo base para representar nodos de Neo4j como objetos.
     """
@@ -15,6 +17,6 @@ class Neo4jModel:
 
     def to_dict(self):
         """
-        Convierte el modelo a un diccionario.
+        Convierte el modelo a un diccionario (copia de sus atributos).
         """
-        return self.__dict__
+        return dict(self.__dict__)
@@ -1,6 +1,7 @@
 import json
+from BKLibDB.BKModel.BKSerializer import BKSerializableMixin
 
-class RedisModel:
+class RedisModel(BKSerializableMixin):
     """
     Modelo base para representar datos en Redis como objetos.
     """
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Serialización JSON directa de modelos a bytes.
+
+Cada clase de modelo tiene un codificador propio, creado una sola vez, con el nombre
+ya codificado de cada campo y la función que codifica su valor según el tipo de la
+columna (BKColumn.coltype) o, para atributos sin declarar, según el tipo del valor.
+Las fechas se escriben en ISO 8601, los Decimal como texto y los bytes en base64,
+igual que en BKExport.
+
+`iter_json` genera la salida por trozos, de modo que una respuesta HTTP puede
+alimentarse de una consulta en streaming con memoria constante:
+
+    return StreamingResponse(manager.iter_json("SELECT * FROM venta"), media_type="application/json")
+"""
+
+import base64
+import datetime
+import decimal
+import math
+from json.encoder import encode_basestring
+
+# Máximo de nombres de campo cacheados por clase (documentos con claves arbitrarias)
+MAX_FIELDS = 1024
+
+
+def _float(value):
+    if math.isfinite(value):
+        return float.__repr__(value)
+    if value != value:
+        return "NaN"
+    return "Infinity" if value > 0 else "-Infinity"
+
+
+def _isoformat(value):
+    return '"' + value.isoformat() + '"'
+
+
+def _decimal(value):
+    return '"' + str(value) + '"'
+
+
+def _bytes(value):
+    return '"' + base64.b64encode(bytes(value)).decode("ascii") + '"'
+
+
+def _dict(value):
+    return "{" + ",".join(
+        encode_basestring(str(key)) + ":" + encode_value(item) for key, item in value.items()
+    ) + "}"
+
+
+def _list(value):
+    return "[" + ",".join(encode_value(item) for item in value) + "]"
+
+
+_ENCODERS = {
+    str: encode_basestring,
+    int: int.__repr__,
+    bool: lambda value: "true" if value else "false",
+    float: _float,
+    type(None): lambda value: "null",
+    decimal.Decimal: _decimal,
+    datetime.datetime: _isoformat,
+    datetime.date: _isoformat,
+    datetime.time: _isoformat,
+    bytes: _bytes,
+    bytearray: _bytes,
+    memoryview: _bytes,
+    dict: _dict,
+    list: _list,
+    tuple: _list,
+}
+
+
+def _encoder_for_type(pytype):
+    """
+    Devuelve la función de codificación para un tipo, incluidas sus subclases.
+    """
+    encoder = _ENCODERS.get(pytype)
+    if encoder is not None:
+        return encoder
+    for base in (bool, int, float, str, decimal.Decimal, datetime.date, datetime.time, bytes, dict, list, tuple):
+        if isinstance(pytype, type) and issubclass(pytype, base):
+            if base is int:
+                # Enteros derivados (IntEnum...) con su valor numérico
+                return lambda value: int.__repr__(int(value))
+            return _ENCODERS[base]
+    return None
+
+
+def encode_value(value):
+    """
+    Codifica un valor Python como texto JSON.
+    """
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    encoder = _encoder_for_type(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if hasattr(value, "__dict__"):
+        # Modelos anidados (e.g., relaciones cargadas con load_related)
+        return encoder_for(type(value)).encode(value.__dict__)
+    return encode_basestring(str(value))
+
+
+def _typed(coltype):
+    """
+    Codificador de una columna declarada: ruta directa para su tipo y genérica
+    para el resto (e.g., fechas que el driver devuelve como texto).
+    """
+    encoder = _encoder_for_type(coltype)
+    if encoder is None:
+        return encode_value
+    return lambda value: encoder(value) if type(value) is coltype else encode_value(value)
+
+
+class BKEncoder:
+    """
+    Codificador JSON de una clase de modelo. Se obtiene con `encoder_for`.
+    """
+    def __init__(self, model_cls):
+        self.fields = {}  # nombre -> (prefijo '"nombre":', codificador)
+        get_columns = getattr(model_cls, "get_columns", None)
+        if get_columns is not None:
+            for name, column in get_columns().items():
+                self.fields[name] = (encode_basestring(name) + ":", _typed(column.coltype))
+
+    def _field(self, name):
+        field = (encode_basestring(str(name)) + ":", encode_value)
+        if len(self.fields) < MAX_FIELDS:
+            self.fields[name] = field
+        return field
+
+    def encode(self, data):
+        """
+        Codifica los atributos de un modelo (su `__dict__`) o una fila como objeto JSON.
+
+        Returns:
+            str: Texto JSON.
+        """
+        fields = self.fields
+        parts = []
+        for name, value in data.items():
+            prefix, encoder = fields.get(name) or self._field(name)
+            parts.append(prefix + ("null" if value is None else encoder(value)))
+        return "{" + ",".join(parts) + "}"
+
+
+def encoder_for(model_cls):
+    """
+    Devuelve el codificador de una clase de modelo, creándolo la primera vez.
+    """
+    encoder = model_cls.__dict__.get("_bk_encoder")
+    if encoder is None:
+        encoder = BKEncoder(model_cls)
+        try:
+            model_cls._bk_encoder = encoder
+        except (AttributeError, TypeError):
+            # Tipos que no admiten atributos (dict...): no se cachea
+            pass
+    return encoder
+
+
+_DICT_ENCODER = BKEncoder(dict)
+
+
+def _encode_item(item, encoder):
+    if isinstance(item, dict):
+        return (encoder or _DICT_ENCODER).encode(item)
+    return encoder_for(type(item)).encode(item.__dict__)
+
+
+def dumps(data):
+    """
+    Serializa un modelo, un diccionario o una lista de ellos.
+
+    Returns:
+        bytes: JSON en UTF-8.
+    """
+    if isinstance(data, (list, tuple)):
+        return b"".join(iter_json(data))
+    return _encode_item(data, None).encode("utf-8")
+
+
+def iter_json(items, model=None, lines=False, chunk_size=65536):
+    """
+    Serializa una secuencia de modelos o filas por trozos de unos `chunk_size` bytes.
+
+    Args:
+        items (iterable): Modelos o diccionarios; puede ser un generador.
+        model (type, opcional): Clase cuyo codificador se usa para las filas (dict).
+        lines (bool): Si True, JSON Lines (un objeto por línea); si no, un array JSON.
+        chunk_size (int): Tamaño aproximado de cada trozo.
+
+    Yields:
+        bytes: Trozos de la salida en UTF-8.
+    """
+    encoder = encoder_for(model) if model is not None else None
+    separator, end = ("\n", "\n") if lines else (",", "]")
+    buffer = [] if lines else ["["]
+    size = 0
+    first = True
+    for item in items:
+        text = _encode_item(item, encoder)
+        if not first:
+            buffer.append(separator)
+        first = False
+        buffer.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            size = 0
+    if not (lines and first):
+        buffer.append(end)
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+class BKSerializableMixin:
+    """
+    Añade la serialización JSON directa a bytes a una clase de modelo.
+    """
+    __slots__ = ()
+
+    def to_json_bytes(self):
+        """
+        Returns:
+            bytes: El modelo como JSON en UTF-8.
+        """
+        return encoder_for(type(self)).encode(self.__dict__).encode("utf-8")
+
+    @classmethod
+    def iter_json(cls, models, lines=False, chunk_size=65536):
+        """
+        Serializa una secuencia (o generador) de modelos por trozos. Ver BKSerializer.iter_json.
+        """
+        return iter_json(models, model=cls, lines=lines, chunk_size=chunk_size)
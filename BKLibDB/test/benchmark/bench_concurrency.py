@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Benchmark de escalado concurrente de BKManagerDB.
+
+Lanza M procesos con N hilos cada uno; cada hilo usa su propio manager y ejecuta
+durante `--duration` segundos una mezcla configurable de getlist, insert, update y
+call_function. Para cada punto (motor, procesos, hilos) informa del rendimiento total,
+las latencias p50/p95/p99 por operación y la espera para obtener conexión del pool
+(el tiempo de `session.connection()` antes de cada operación).
+
+Modos de conexión (`--engine`):
+    - per-thread: cada hilo abre su sesión con `get_dbsess`, como hace BKManagerDB
+      al recibir `db_type` (un motor y un pool por hilo).
+    - shared: un único motor por proceso con un pool de `--pool-size` conexiones
+      compartido por todos los hilos.
+
+Siempre se mide SQLite (fichero temporal en modo WAL). PostgreSQL se mide si se indica
+una URL con `--postgres` o en la variable BKLIBDB_BENCH_POSTGRES.
+
+Uso (desde la raíz del repositorio):
+    python -m BKLibDB.test.benchmark.bench_concurrency [--threads 1,2,4,8] [--processes 1,2] [--duration 3]
+                                                       [--mix getlist=70,insert=10,update=10,call_function=10]
+                                                       [--engine per-thread] [--json resultados.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import sqlalchemy
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKConnect import get_dbsess
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+OPERATIONS = ("getlist", "insert", "update", "call_function")
+SEED_ROWS = 10000
+
+
+class BenchItem(BKModel):
+    id = BKColumn("id", int, primary_key=True)
+    nombre = BKColumn("nombre", str)
+    valor = BKColumn("valor", float)
+
+
+class BenchManager(BKManagerDB):
+    auto_sql = True
+    table = "bk_bench_item"
+
+    def get_sql_select(self):
+        return "SELECT * FROM bk_bench_item WHERE id >= :desde ORDER BY id LIMIT 50", {
+            "desde": random.randrange(SEED_ROWS)
+        }
+
+
+def setup_database(url, db_type):
+    """
+    Crea la tabla del benchmark con SEED_ROWS filas.
+    """
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        if db_type == "SQLITE":
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        conn.exec_driver_sql("DROP TABLE IF EXISTS bk_bench_item")
+        conn.exec_driver_sql(
+            "CREATE TABLE bk_bench_item (id INTEGER PRIMARY KEY, nombre VARCHAR(64), valor FLOAT)"
+        )
+        conn.execute(
+            text("INSERT INTO bk_bench_item (id, nombre, valor) VALUES (:id, :nombre, :valor)"),
+            [{"id": i, "nombre": f"item-{i}", "valor": i * 0.5} for i in range(SEED_ROWS)],
+        )
+    engine.dispose()
+
+
+def parse_mix(text_mix):
+    mix = {}
+    for part in text_mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Operación desconocida en --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return {"count": len(samples), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def run_thread(session_factory, mix, duration, worker_id, results):
+    """
+    Ejecuta operaciones durante `duration` segundos y acumula sus latencias en `results`.
+    """
+    started = time.perf_counter()
+    session = session_factory()
+    results["session_open"].append(time.perf_counter() - started)
+    manager = BenchManager(model=BenchItem, session=session)
+    names, weights = zip(*mix.items())
+    rng = random.Random(worker_id)
+    next_id = SEED_ROWS + worker_id * 10_000_000
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        operation = rng.choices(names, weights)[0]
+        begin = time.perf_counter()
+        try:
+            session.connection()  # checkout del pool (o conexión ya asignada)
+            acquired = time.perf_counter()
+            if operation == "getlist":
+                manager.getlist()
+            elif operation == "insert":
+                next_id += 1
+                manager.insert(objmodel=BenchItem(id=next_id, nombre="nuevo", valor=1.0))
+            elif operation == "update":
+                key = rng.randrange(SEED_ROWS)
+                manager.update(objmodel=BenchItem(id=key, nombre=f"item-{key}", valor=rng.random()))
+            else:
+                manager.call_function("abs", {"x": -rng.randrange(1000)})
+                session.commit()  # libera la conexión como el resto de operaciones
+        except Exception as e:
+            results["errors"].append(f"{operation}: {type(e).__name__}: {str(e).splitlines()[0][:120]}")
+            session.rollback()
+            continue
+        end = time.perf_counter()
+        results["pool_wait"].append(acquired - begin)
+        results[operation].append(end - begin)
+    session.close()
+
+
+def run_process(url, db_type, engine_mode, pool_size, threads, mix, duration, process_id):
+    """
+    Ejecuta `threads` hilos en este proceso. Devuelve las muestras de latencia.
+    """
+    if engine_mode == "shared":
+        engine = create_engine(url, pool_size=pool_size, max_overflow=0, pool_timeout=60)
+        factory = sessionmaker(bind=engine)
+    else:
+        factory = lambda: get_dbsess(type=db_type, chain_connection=url)
+
+    results = {name: [] for name in OPERATIONS + ("pool_wait", "session_open", "errors", "elapsed")}
+    started = time.perf_counter()
+    workers = [
+        threading.Thread(
+            target=run_thread, args=(factory, mix, duration, process_id * 1000 + index, results)
+        )
+        for index in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results["elapsed"].append(time.perf_counter() - started)
+    return results
+
+
+def _run_process(args):
+    return run_process(*args)
+
+
+def run_point(url, db_type, engine_mode, pool_size, processes, threads, mix, duration):
+    tasks = [(url, db_type, engine_mode, pool_size, threads, mix, duration, p) for p in range(processes)]
+    if processes == 1:
+        partials = [_run_process(tasks[0])]
+    else:
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            partials = pool.map(_run_process, tasks)
+    merged = {name: [] for name in partials[0]}
+    for partial in partials:
+        for name, samples in partial.items():
+            merged[name].extend(samples)
+    total = sum(len(merged[name]) for name in OPERATIONS)
+    # Ventana de medida de los procesos, sin el arranque de los procesos hijos
+    elapsed = max(merged["elapsed"])
+    return {
+        "processes": processes,
+        "threads": threads,
+        "workers": processes * threads,
+        "ops": total,
+        "ops_per_sec": total / elapsed,
+        "latency": {name: percentiles(merged[name]) for name in OPERATIONS if name in mix},
+        "all": percentiles([s for name in OPERATIONS for s in merged[name]]),
+        "pool_wait": percentiles(merged["pool_wait"]),
+        "session_open": percentiles(merged["session_open"]),
+        "errors": len(merged["errors"]),
+        "error_samples": sorted(set(merged["errors"]))[:5],
+    }
+
+
+def format_point(point):
+    latency = point["all"]
+    wait = point["pool_wait"]
+    return (
+        f"  {point['processes']:>2}p x {point['threads']:>3}h: {point['ops_per_sec']:9.1f} ops/s  "
+        f"p50 {latency['p50_ms'] or 0:7.2f} ms  p95 {latency['p95_ms'] or 0:7.2f} ms  "
+        f"p99 {latency['p99_ms'] or 0:7.2f} ms  espera pool p95 {wait['p95_ms'] or 0:7.2f} ms  "
+        f"errores {point['errors']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", default="1,2,4,8", help="Hilos por proceso (lista)")
+    parser.add_argument("--processes", default="1,2", help="Procesos (lista)")
+    parser.add_argument("--duration", type=float, default=3.0, help="Segundos por punto")
+    parser.add_argument("--mix", default="getlist=70,insert=10,update=10,call_function=10")
+    parser.add_argument("--engine", choices=("per-thread", "shared"), default="per-thread")
+    parser.add_argument("--pool-size", type=int, default=5, help="Tamaño del pool en modo shared")
+    parser.add_argument("--postgres", default=os.environ.get("BKLIBDB_BENCH_POSTGRES"),
+                        help="URL SQLAlchemy de PostgreSQL (opcional)")
+    parser.add_argument("--json", metavar="FICHERO", help="Guarda las curvas de escalado en JSON")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    threads = [int(n) for n in args.threads.split(",")]
+    processes = [int(n) for n in args.processes.split(",")]
+
+    targets = []
+    tmpdir = tempfile.TemporaryDirectory()
+    targets.append(("sqlite", "SQLITE", f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"))
+    if args.postgres:
+        targets.append(("postgresql", "POSTGRESQL", args.postgres))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "engine": args.engine,
+            "pool_size": args.pool_size,
+            "duration": args.duration,
+            "mix": mix,
+        },
+        "results": {},
+    }
+    for name, db_type, url in targets:
+        try:
+            setup_database(url, db_type)
+        except Exception as e:
+            print(f"{name}: no disponible ({type(e).__name__}: {e})", file=sys.stderr)
+            continue
+        print(f"{name} ({args.engine}):")
+        curve = []
+        for process_count in processes:
+            for thread_count in threads:
+                setup_database(url, db_type)  # mismos datos de partida en cada punto
+                point = run_point(url, db_type, args.engine, args.pool_size, process_count,
+                                  thread_count, mix, args.duration)
+                print(format_point(point))
+                curve.append(point)
+        base = curve[0]["ops_per_sec"] if curve else 0
+        for point in curve:
+            point["speedup"] = point["ops_per_sec"] / base if base else None
+        report["results"][name] = curve
+    tmpdir.cleanup()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Resultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Benchmark de arranque en frío para un worker que solo usa SQL.
+
+Mide, en procesos Python nuevos, el tiempo de importación y la memoria al importar
+los módulos SQL de BKLibDB, y lo compara con el escenario anterior en el que los
+cuatro drivers NoSQL se importaban siempre. También comprueba que ningún driver
+NoSQL queda cargado tras importar los módulos SQL.
+
+Uso:
+    python bench_import.py [--repeat 10] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+NOSQL_DRIVERS = ["pymongo", "redis", "cassandra.cluster", "neo4j"]
+
+SQL_ONLY = """
+import BKLibDB.BKManager.BKManagerDB
+import BKLibDB.BKConnect.BKConnectNoSQL
+"""
+
+# Simula el comportamiento previo: importar los drivers junto con la librería
+EAGER = SQL_ONLY + "".join(f"""
+try:
+    import {module}
+except ImportError:
+    pass
+""" for module in NOSQL_DRIVERS)
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+drivers = [m for m in {drivers!r} if m in sys.modules]
+print(json.dumps({{
+    "seconds": elapsed,
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "drivers_loaded": drivers,
+}}))
+"""
+
+
+def run_probe(code):
+    """
+    Ejecuta el código de importación en un intérprete nuevo y devuelve sus métricas.
+    """
+    script = PROBE.format(code=code, drivers=NOSQL_DRIVERS)
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(code, repeat):
+    runs = [run_probe(code) for _ in range(repeat)]
+    return {
+        "median_ms": statistics.median(r["seconds"] for r in runs) * 1000,
+        "min_ms": min(r["seconds"] for r in runs) * 1000,
+        "maxrss_kb": statistics.median(r["maxrss_kb"] for r in runs),
+        "modules": runs[-1]["modules"],
+        "drivers_loaded": runs[-1]["drivers_loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Procesos por escenario")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    results = {"lazy": measure(SQL_ONLY, args.repeat), "eager": measure(EAGER, args.repeat)}
+    results["speedup"] = results["eager"]["median_ms"] / results["lazy"]["median_ms"]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name in ("lazy", "eager"):
+        r = results[name]
+        print(
+            f"{name:>5}: {r['median_ms']:8.1f} ms (min {r['min_ms']:.1f}), "
+            f"RSS {r['maxrss_kb'] / 1024:6.1f} MiB, {r['modules']} módulos, "
+            f"drivers: {', '.join(r['drivers_loaded']) or '-'}"
+        )
+    print(f"Mejora de arranque: x{results['speedup']:.2f}")
+    if results["lazy"]["drivers_loaded"]:
+        sys.exit("Error: los módulos SQL han cargado drivers NoSQL.")
+
+
+if __name__ == "__main__":
+    main()
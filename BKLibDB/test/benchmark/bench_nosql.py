@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Benchmark y control de regresiones de los managers NoSQL sin servidores externos.
+
+Ejecuta las rutas insert/find/update/delete de MongoDBManager, RedisManager,
+CassandraManager y Neo4jManager contra los sustitutos en memoria de `nosql_fakes`
+(inyectados con `client`, `session` y `driver`), y contra un `redis-server` local
+lanzado en un socket Unix temporal si está instalado junto con redis-py.
+
+Para cada operación mide el coste por llamada de la capa Python (construcción de
+consultas, serialización, hidratación de modelos y hooks):
+    - Operaciones unitarias en µs/op.
+    - Búsquedas y cargas en bloque con `--sizes` elementos, en µs por elemento.
+    - Coste de los hooks: la misma inserción con hooks definidos en la subclase
+      (`insert_hooked`) frente a los hooks por defecto, que no se llaman.
+
+Con `--save-baseline` se guardan los resultados; con `--baseline` se comparan y el
+proceso termina con error si alguna métrica empeora más de `--tolerance`.
+
+Uso (desde la raíz del repositorio):
+    python -m BKLibDB.test.benchmark.bench_nosql [--number 2000] [--repeat 5] [--sizes 100,1000,10000]
+                                                 [--json] [--save-baseline base.json | --baseline base.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from BKLibDB.BKManager.BKNoSQLManager.Cassandra.CassandraBKManager_Base import CassandraManager
+from BKLibDB.BKManager.BKNoSQLManager.Mongo.MongoBKManager_Base import MongoDBManager
+from BKLibDB.BKManager.BKNoSQLManager.Neo4j.Neo4jBKManager_Base import Neo4jManager
+from BKLibDB.BKManager.BKNoSQLManager.Redis.RedisBKManager_Base import RedisManager
+from BKLibDB.BKModel.BKNoSQLModel.Cassandra.CasssandraBKModel_Base import CassandraModel
+from BKLibDB.BKModel.BKNoSQLModel.Mongo.MongoBKModel_Base import MongoDBModel
+from BKLibDB.BKModel.BKNoSQLModel.Neo4j.Neo4jBKModel_Base import Neo4jModel
+from BKLibDB.BKModel.BKNoSQLModel.Redis.RedisBKModel_Base import RedisModel
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import nosql_fakes  # noqa: E402
+
+
+def sample(index):
+    return {"id": index, "nombre": f"usuario-{index}", "edad": 20 + index % 50, "correo": f"u{index}@example.com"}
+
+
+class MongoUsuario(MongoDBModel):
+    pass
+
+
+class RedisUsuario(RedisModel):
+    pass
+
+
+class CassandraUsuario(CassandraModel):
+    pass
+
+
+class Neo4jUsuario(Neo4jModel):
+    pass
+
+
+def with_hooks(manager_cls):
+    """
+    Subclase con hooks before_/after_insert definidos (sin trabajo), para medir su coste.
+    """
+    def before_insert(self, *args):
+        pass
+
+    def after_insert(self, *args):
+        pass
+
+    return type(f"Hooked{manager_cls.__name__}", (manager_cls,), {
+        "before_insert": before_insert,
+        "after_insert": after_insert,
+    })
+
+
+def timeit(func, number, repeat):
+    """
+    Returns:
+        float: Mediana de `repeat` mediciones, en microsegundos por llamada.
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for index in range(number):
+            func(index)
+        runs.append((time.perf_counter() - start) / number * 1e6)
+    return statistics.median(runs)
+
+
+def timeit_bulk(setup, func, size, repeat):
+    """
+    Returns:
+        float: Mediana en microsegundos por elemento de `func()` sobre `size` elementos.
+    """
+    runs = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        func()
+        runs.append((time.perf_counter() - start) / size * 1e6)
+    return statistics.median(runs)
+
+
+def bench_mongo(number, repeat, sizes):
+    results = {}
+    for name, manager_cls in (("insert", MongoDBManager), ("insert_hooked", with_hooks(MongoDBManager))):
+        manager = manager_cls(MongoUsuario, "bench", "usuarios", client=nosql_fakes.FakeMongoClient())
+        results[name] = timeit(lambda i: manager.insert(MongoUsuario(**sample(i))), number, repeat)
+
+    manager = MongoDBManager(MongoUsuario, "bench", "usuarios", client=nosql_fakes.FakeMongoClient())
+    manager.insert(MongoUsuario(**sample(0)))
+    results["find"] = timeit(lambda i: manager.find({"id": 0}), number, repeat)
+    results["update"] = timeit(lambda i: manager.update({"id": 0}, {"edad": i}), number, repeat)
+    results["delete"] = timeit(lambda i: manager.delete({"id": -1}), number, repeat)
+    results["to_json_bytes"] = timeit(lambda i: MongoUsuario(**sample(i)).to_json_bytes(), number, repeat)
+
+    for size in sizes:
+        collection = manager.collection
+        collection.documents = [dict(sample(i), _id=i) for i in range(size)]
+        results[f"find_{size}"] = timeit_bulk(lambda: None, lambda: manager.find(), size, repeat)
+    return results
+
+
+def bench_redis(client_factory, number, repeat, sizes):
+    results = {}
+    for name, manager_cls in (("insert", RedisManager), ("insert_hooked", with_hooks(RedisManager))):
+        manager = manager_cls(RedisUsuario, client=client_factory())
+        results[name] = timeit(lambda i: manager.insert(f"bench:{i}", RedisUsuario(**sample(i))), number, repeat)
+
+    manager = RedisManager(RedisUsuario, client=client_factory())
+    for index in range(number):
+        manager.insert(f"bench:{index}", RedisUsuario(**sample(index)))
+    results["find"] = timeit(lambda i: manager.find(f"bench:{i}"), number, repeat)
+    results["update"] = timeit(lambda i: manager.update(f"bench:{i}", {"edad": i}), number, repeat)
+    results["delete"] = timeit(lambda i: manager.delete(f"bench:{i}"), number, repeat)
+    for size in sizes:
+        keys = [f"bulk:{i}" for i in range(size)]
+
+        def setup():
+            for index, key in enumerate(keys):
+                manager.client.set(key, RedisUsuario(**sample(index)).to_json())
+
+        results[f"find_{size}"] = timeit_bulk(setup, lambda: [manager.find(key) for key in keys], size, repeat)
+    return results
+
+
+def bench_cassandra(number, repeat, sizes):
+    results = {}
+    for name, manager_cls in (("insert", CassandraManager), ("insert_hooked", with_hooks(CassandraManager))):
+        manager = manager_cls(CassandraUsuario, "bench", "usuarios", session=nosql_fakes.FakeCassandraSession())
+        results[name] = timeit(lambda i: manager.insert(CassandraUsuario(**sample(i))), number, repeat)
+
+    manager = CassandraManager(CassandraUsuario, "bench", "usuarios", session=nosql_fakes.FakeCassandraSession())
+    results["insert_async"] = timeit(
+        lambda i: manager.insert_async(CassandraUsuario(**sample(i))).result(), number, repeat
+    )
+    results["update"] = timeit(lambda i: manager.update("id = 0", {"edad": i}), number, repeat)
+    results["delete"] = timeit(lambda i: manager.delete(f"id = {i}"), number, repeat)
+    for size in sizes:
+        session = nosql_fakes.FakeCassandraSession()
+        manager = CassandraManager(CassandraUsuario, "bench", "usuarios", session=session)
+        for index in range(size):
+            manager.insert(CassandraUsuario(**sample(index)))
+        results[f"find_{size}"] = timeit_bulk(lambda: None, lambda: manager.find(), size, repeat)
+        results[f"find_async_{size}"] = timeit_bulk(lambda: None, lambda: manager.find_async().result(), size, repeat)
+    return results
+
+
+def bench_neo4j(number, repeat, sizes):
+    results = {}
+    for name, manager_cls in (("insert", Neo4jManager), ("insert_hooked", with_hooks(Neo4jManager))):
+        manager = manager_cls(Neo4jUsuario, None, None, None, driver=nosql_fakes.FakeNeo4jDriver())
+        results[name] = timeit(lambda i: manager.insert("Usuario", sample(i)), number, repeat)
+
+    driver = nosql_fakes.FakeNeo4jDriver()
+    manager = Neo4jManager(Neo4jUsuario, None, None, None, driver=driver)
+    manager.insert("Usuario", sample(0))
+    results["update"] = timeit(lambda i: manager.update("Usuario", "n.id = 0", {"edad": i}), number, repeat)
+    results["delete"] = timeit(lambda i: manager.delete("Vacio", "n.id = 0"), number, repeat)
+    for size in sizes:
+        rows = [sample(i) for i in range(size)]
+
+        def setup():
+            driver.nodes.clear()
+
+        results[f"insert_many_{size}"] = timeit_bulk(setup, lambda: manager.insert_many("Usuario", rows), size, repeat)
+        driver.nodes["Usuario"] = [dict(row) for row in rows]
+        results[f"find_{size}"] = timeit_bulk(lambda: None, lambda: manager.find("Usuario"), size, repeat)
+        results[f"find_fields_{size}"] = timeit_bulk(
+            lambda: None, lambda: manager.find("Usuario", fields=["id", "nombre"]), size, repeat
+        )
+    return results
+
+
+class LocalRedisServer:
+    """
+    `redis-server` temporal escuchando solo en un socket Unix, sin persistencia.
+    """
+    def __init__(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.socket = os.path.join(self._dir.name, "redis.sock")
+        self._process = subprocess.Popen(
+            ["redis-server", "--port", "0", "--unixsocket", self.socket, "--save", "", "--appendonly", "no"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        redis = importlib.import_module("redis")
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                redis.Redis(unix_socket_path=self.socket).ping()
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("redis-server no respondió a tiempo")
+                time.sleep(0.05)
+
+    def client(self):
+        redis = importlib.import_module("redis")
+        return redis.Redis(unix_socket_path=self.socket)
+
+    def stop(self):
+        self._process.terminate()
+        self._process.wait()
+        self._dir.cleanup()
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns:
+        list[str]: Métricas que empeoran más de `tolerance` respecto a la línea base.
+    """
+    regressions = []
+    for backend, metrics in results.items():
+        for name, value in metrics.items():
+            base = baseline.get(backend, {}).get(name)
+            if base and value > base * (1 + tolerance):
+                regressions.append(f"{backend}.{name}: {base:.2f} -> {value:.2f} µs (+{(value / base - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000, help="Llamadas por medición unitaria")
+    parser.add_argument("--repeat", type=int, default=5, help="Mediciones por métrica (se toma la mediana)")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Tamaños de las pruebas en bloque")
+    parser.add_argument("--no-redis-server", action="store_true", help="No lanzar redis-server aunque exista")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    parser.add_argument("--save-baseline", metavar="FICHERO", help="Guarda los resultados como línea base")
+    parser.add_argument("--baseline", metavar="FICHERO", help="Compara con una línea base guardada")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento admitido (0.25 = 25%%)")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    results = {
+        "mongo": bench_mongo(args.number, args.repeat, sizes),
+        "redis": bench_redis(nosql_fakes.FakeRedis, args.number, args.repeat, sizes),
+        "cassandra": bench_cassandra(args.number, args.repeat, sizes),
+        "neo4j": bench_neo4j(args.number, args.repeat, sizes),
+    }
+    if not args.no_redis_server and shutil.which("redis-server") and importlib.util.find_spec("redis"):
+        server = LocalRedisServer()
+        try:
+            results["redis_server"] = bench_redis(server.client, args.number, args.repeat, sizes)
+        finally:
+            server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for backend, metrics in results.items():
+            print(f"{backend}:")
+            for name, value in metrics.items():
+                unit = "µs/elem" if name.rsplit("_", 1)[-1].isdigit() else "µs/op"
+                print(f"  {name:<22} {value:10.2f} {unit}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        if regressions:
+            print("Regresiones:", *regressions, sep="\n  ", file=sys.stderr)
+            sys.exit(1)
+        print(f"Sin regresiones respecto a {args.baseline} (tolerancia {args.tolerance:.0%}).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Sustitutos en proceso de los clientes NoSQL para los benchmarks.
+
+Implementan solo la parte de la API de pymongo, redis, cassandra-driver y neo4j que
+usan los managers de BKLibDB, guardando los datos en memoria. Se inyectan con los
+parámetros `client`, `session` y `driver` de los managers, de modo que lo que se mide
+es el coste de la capa Python (construcción de consultas, serialización, hidratación
+y hooks), no el del servidor.
+"""
+
+import re
+from collections import namedtuple
+
+
+# --- MongoDB ---
+
+class _InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class _CountResult:
+    def __init__(self, count):
+        self.modified_count = self.deleted_count = count
+
+
+def _matches(document, query):
+    return all(document.get(key) == value for key, value in query.items())
+
+
+class FakeMongoCollection:
+    def __init__(self):
+        self.documents = []
+        self._next_id = 0
+
+    def insert_one(self, document):
+        document = dict(document)
+        self._next_id += 1
+        document.setdefault("_id", self._next_id)
+        self.documents.append(document)
+        return _InsertOneResult(document["_id"])
+
+    def update_many(self, query, update):
+        changes = update.get("$set", {})
+        count = 0
+        for document in self.documents:
+            if _matches(document, query):
+                document.update(changes)
+                count += 1
+        return _CountResult(count)
+
+    def delete_many(self, query):
+        kept = [document for document in self.documents if not _matches(document, query)]
+        count = len(self.documents) - len(kept)
+        self.documents = kept
+        return _CountResult(count)
+
+    def find(self, query):
+        return (dict(document) for document in self.documents if _matches(document, query))
+
+
+class FakeMongoClient:
+    def __init__(self):
+        self._databases = {}
+
+    def __getitem__(self, name):
+        return self._databases.setdefault(name, _FakeMongoDatabase())
+
+
+class _FakeMongoDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        return self._collections.setdefault(name, FakeMongoCollection())
+
+
+# --- Redis ---
+
+class FakeRedis:
+    """
+    Cliente Redis en memoria (valores como bytes, igual que redis-py sin decode_responses).
+    """
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value):
+        self.data[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+# --- Cassandra ---
+
+_INSERT = re.compile(r"INSERT INTO (\S+) \(([^)]*)\)", re.I)
+
+
+class _FakeResponseFuture:
+    has_more_pages = False
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def add_callbacks(self, callback, errback):
+        callback(self._rows)
+
+    def start_fetching_next_page(self):
+        raise RuntimeError("No hay más páginas")
+
+
+class FakeCassandraSession:
+    """
+    Sesión Cassandra en memoria: guarda las filas insertadas y las devuelve en los SELECT
+    (sin evaluar la condición), como namedtuples igual que el row factory por defecto.
+    """
+    def __init__(self):
+        self.cluster = self
+        self.tables = {}
+        self._row_types = {}
+
+    def execute(self, query, params=None):
+        verb = query.lstrip()[:6].upper()
+        if verb == "INSERT":
+            table, columns = _INSERT.match(query.lstrip()).groups()
+            columns = tuple(column.strip() for column in columns.split(","))
+            row_type = self._row_types.get(columns)
+            if row_type is None:
+                row_type = self._row_types[columns] = namedtuple("Row", columns)
+            self.tables.setdefault(table, []).append(row_type(*params))
+            return []
+        if verb == "SELECT":
+            table = query.split()[3]
+            return list(self.tables.get(table, []))
+        return []
+
+    def execute_async(self, query, params=None):
+        return _FakeResponseFuture(self.execute(query, params))
+
+    def shutdown(self):
+        pass
+
+
+# --- Neo4j ---
+
+class _FakeNode:
+    def __init__(self, properties):
+        self._properties = properties
+
+
+class _FakeResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self):
+        return self._records[0] if self._records else None
+
+    def consume(self):
+        return None
+
+
+class FakeNeo4jTransaction:
+    def __init__(self, graph):
+        self._graph = graph
+
+    def run(self, query, **params):
+        return self._graph.run(query, params)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeNeo4jSession(FakeNeo4jTransaction):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def begin_transaction(self):
+        return FakeNeo4jTransaction(self._graph)
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(FakeNeo4jTransaction(self._graph), *args, **kwargs)
+
+    execute_write = execute_read
+
+
+class FakeNeo4jDriver:
+    """
+    Driver Neo4j en memoria. Reconoce CREATE de un nodo, UNWIND de lotes, SET y
+    DETACH DELETE sobre todos los nodos de la etiqueta, y MATCH ... RETURN n con la
+    proyección opcional `n {.a, .b}`. Las condiciones WHERE no se evalúan.
+    """
+    _LABEL = re.compile(r"\(n:(\w+)")
+
+    def __init__(self):
+        self.nodes = {}
+
+    def session(self, **config):
+        return FakeNeo4jSession(self)
+
+    def close(self):
+        pass
+
+    def run(self, query, params):
+        label_match = self._LABEL.search(query)
+        label = label_match.group(1) if label_match else None
+        nodes = self.nodes.setdefault(label, [])
+        if "UNWIND" in query:
+            for row in params.get("rows", []):
+                nodes.append(dict(row))
+            return _FakeResult([])
+        if query.lstrip().startswith("CREATE"):
+            nodes.append(dict(params["props"]))
+            return _FakeResult([])
+        if "DETACH DELETE" in query:
+            nodes.clear()
+            return _FakeResult([])
+        if "SET n +=" in query:
+            for node in nodes:
+                node.update(params["props"])
+            return _FakeResult([])
+        projection = re.search(r"RETURN n \{([^}]*)\}", query)
+        if projection:
+            fields = [field.strip().lstrip(".") for field in projection.group(1).split(",")]
+            return _FakeResult([{"n": {field: node.get(field) for field in fields}} for node in nodes])
+        return _FakeResult([{"n": _FakeNode(dict(node))} for node in nodes])
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de auto_sql (UPDATE de las columnas modificadas) sobre un fichero
+SQLite temporal.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_auto_sql.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+
+class Cliente(BKModel):
+    id = BKColumn("id", int, primary_key=True)
+    nombre = BKColumn("nombre", str, nullable=False)
+    ciudad = BKColumn("ciudad", str)
+
+
+class ClienteManager(BKManagerDB):
+    auto_sql = True
+    table = "cliente"
+
+
+def _crear_bd(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE cliente (id INTEGER PRIMARY KEY, nombre VARCHAR(64) NOT NULL, ciudad VARCHAR(64))"
+        )
+    return engine
+
+
+def _registrar_sentencias(engine):
+    sent = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: sent.append(sql))
+    return sent
+
+
+def test_update_solo_columnas_modificadas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "a.db"))
+        manager = ClienteManager(session=sessionmaker(bind=engine)(), model=Cliente)
+        sent = _registrar_sentencias(engine)
+        try:
+            cliente = Cliente(id=1, nombre="ana", ciudad="x")
+            assert manager.insert(objmodel=cliente) == 1
+            assert cliente.get_changes() == {}
+
+            cliente.ciudad = "y"
+            del sent[:]
+            assert manager.update(objmodel=cliente) == 1
+            updates = [sql for sql in sent if sql.startswith("UPDATE")]
+            assert len(updates) == 1 and "ciudad" in updates[0] and "nombre" not in updates[0]
+
+            # Sin cambios no hay consulta
+            del sent[:]
+            assert manager.update(objmodel=cliente) == 0
+            assert not any(sql.startswith("UPDATE") for sql in sent)
+
+            cliente.nombre = None
+            try:
+                manager.update(objmodel=cliente)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("nombre no admite nulos")
+
+            cargado = manager.get_by_pk(1)
+            assert (cargado.nombre, cargado.ciudad) == ("ana", "y")
+            assert cargado.get_changes() == {}
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_update_solo_columnas_modificadas()
+    print("OK")
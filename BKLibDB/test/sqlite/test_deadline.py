@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de los plazos por consulta (BKDeadline) sobre SQLite, donde la sentencia
+se interrumpe con el manejador de progreso.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_deadline.py
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager import BKDeadline
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+
+# Consulta que tarda varios segundos en SQLite
+LENTA = (
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50000000) "
+    "SELECT COUNT(*) AS total FROM n"
+)
+
+
+def _manager(tmpdir):
+    engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'd.db')}")
+    return BKManagerDB(session=sessionmaker(bind=engine)()), engine
+
+
+def test_cancela_la_consulta_al_vencer_el_plazo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager, engine = _manager(tmpdir)
+        BKDeadline.reset_timeout_stats()
+        try:
+            start = time.monotonic()
+            try:
+                manager.execute_query(LENTA, timeout=0.2)
+            except BKDeadline.DeadlineExceeded:
+                pass
+            else:
+                raise AssertionError("la consulta debería superar el plazo")
+            assert time.monotonic() - start < 2
+            assert BKDeadline.timeout_stats() == {("sqlite", "execute_query"): 1}
+
+            # La sesión sigue siendo utilizable y sin el manejador de progreso
+            assert manager.execute_query("SELECT 1 AS uno", timeout=5) == [{"uno": 1}]
+            assert manager.execute_query("SELECT 2 AS dos") == [{"dos": 2}]
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+def test_plazo_anidado_y_vencido():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager, engine = _manager(tmpdir)
+        try:
+            with BKDeadline.deadline(10) as outer:
+                with BKDeadline.deadline(0.2) as inner:
+                    assert inner < outer
+                    try:
+                        manager.execute_query(LENTA, timeout=5)
+                    except BKDeadline.DeadlineExceeded:
+                        pass
+                    else:
+                        raise AssertionError("manda el plazo más restrictivo")
+            with BKDeadline.deadline(0):
+                try:
+                    manager.execute_query("SELECT 1")
+                except BKDeadline.DeadlineExceeded:
+                    pass
+                else:
+                    raise AssertionError("un plazo ya vencido no ejecuta la consulta")
+            assert BKDeadline.remaining() is None
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_cancela_la_consulta_al_vencer_el_plazo()
+    test_plazo_anidado_y_vencido()
+    print("OK")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación del mapa de identidad de BKManagerDB sobre un fichero SQLite temporal.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_identity_map.py
+"""
+
+import gc
+import os
+import tempfile
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+
+class Cliente(BKModel):
+    id = BKColumn("id", int, primary_key=True)
+    nombre = BKColumn("nombre", str, nullable=False)
+    ciudad = BKColumn("ciudad", str)
+
+
+class ClienteManager(BKManagerDB):
+    auto_sql = True
+    table = "cliente"
+
+
+def _crear_bd(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE cliente (id INTEGER PRIMARY KEY, nombre VARCHAR(64) NOT NULL, ciudad VARCHAR(64))"
+        )
+    return engine
+
+
+def _registrar_sentencias(engine):
+    sent = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: sent.append(sql))
+    return sent
+
+
+def test_mapa_de_identidad():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "a.db"))
+        manager = ClienteManager(session=sessionmaker(bind=engine)(), model=Cliente, identity_map=True)
+        sent = _registrar_sentencias(engine)
+        try:
+            manager.insert(objmodel=Cliente(id=1, nombre="ana"))
+            manager.insert(objmodel=Cliente(id=2, nombre="luis"))
+            primero = manager.get_by_pk(1)
+            todos = manager.fetch_all("SELECT * FROM cliente ORDER BY id")
+            assert todos[0] is primero
+
+            # Ya cargado: get_by_pk no consulta
+            del sent[:]
+            assert manager.get_by_pk(2) is todos[1]
+            assert sent == []
+
+            # Sin referencias fuertes, la instancia se libera y se vuelve a consultar
+            del primero, todos
+            gc.collect()
+            assert manager.identity_map.get(Cliente, (1,)) is None
+            assert manager.get_by_pk(1).nombre == "ana"
+            assert sent
+
+            cliente = manager.get_by_pk(2)
+            manager.delete(objmodel=cliente)
+            assert manager.identity_map.get(Cliente, (2,)) is None
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_mapa_de_identidad()
+    print("OK")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de la lectura en paralelo por tramos sobre un fichero SQLite temporal.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_parallel_scan.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKManager.BKParallelScan import BKParallelScan
+
+
+def _crear_bd(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE venta (id INTEGER PRIMARY KEY, tienda INTEGER)")
+        conn.exec_driver_sql(
+            "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000) "
+            "INSERT INTO venta SELECT i, CASE WHEN i % 10 = 0 THEN NULL ELSE i % 7 END FROM n"
+        )
+    return engine
+
+
+def test_stream_y_partitions():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "p.db"))
+        manager = BKManagerDB(session=sessionmaker(bind=engine)())
+        try:
+            batches = manager.parallel_scan("SELECT * FROM venta", partition_column="id", n=4, batch_size=64)
+            ids = sorted(row["id"] for batch in batches for row in batch)
+            assert ids == list(range(1, 1001))
+
+            # Las filas con la columna a NULL se leen en un tramo aparte
+            parts = manager.parallel_scan(
+                "SELECT * FROM venta", partition_column="tienda", n=3, merged=False, batch_size=50
+            )
+            tiendas = [{row["tienda"] for batch in part for row in batch} for part in parts]
+            assert tiendas[-1] == {None}
+            assert set().union(*tiendas[:-1]) == set(range(7))
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+def test_un_solo_consumo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "p.db"))
+        scan = BKParallelScan(engine, "SELECT * FROM venta", None, "id", n=2)
+        try:
+            first = scan.stream()
+            for request in (scan.stream, scan.partitions):
+                try:
+                    request()
+                except RuntimeError:
+                    pass
+                else:
+                    raise AssertionError("un segundo consumo debería fallar en lugar de bloquearse")
+            assert sum(len(batch) for batch in first) == 1000
+        finally:
+            scan.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_stream_y_partitions()
+    test_un_solo_consumo()
+    print("OK")
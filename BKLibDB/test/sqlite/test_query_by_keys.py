@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de query_by_keys y fetch_by_keys sobre un fichero SQLite temporal.
+
+La estrategia "array" (`= ANY(:bk_keys)`) solo existe en PostgreSQL: aquí se comprueba
+la sentencia que genera.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_query_by_keys.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+
+class Cliente(BKModel):
+    id = BKColumn("id", int, primary_key=True)
+    nombre = BKColumn("nombre", str)
+    ciudad = BKColumn("ciudad", str)
+
+
+class ClienteManager(BKManagerDB):
+    auto_sql = True
+    table = "cliente"
+
+
+class _SentenciasArray(ClienteManager):
+    """
+    Registra las sentencias en lugar de ejecutarlas (SQLite no tiene ANY).
+    """
+    def _query_rows(self, statement, params):
+        self.sent = (str(statement), params)
+        return []
+
+
+def _crear_bd(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE cliente (id INTEGER PRIMARY KEY, nombre VARCHAR(64), ciudad VARCHAR(64))"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO cliente VALUES (1, 'ana', 'x'), (2, 'luis', '{x}'), (3, 'eva', 'y'), "
+            "(4, 'rosa', 'x'), (5, 'juan', 'z')"
+        )
+    return engine
+
+
+def _manager(engine, cls=ClienteManager):
+    return cls(session=sessionmaker(bind=engine)(), model=Cliente)
+
+
+def test_estrategias_sqlite():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "q.db"))
+        manager = _manager(engine)
+        try:
+            sql = "SELECT id, nombre FROM cliente WHERE {keys}"
+            for strategy in (None, "temp_table", "chunks"):
+                rows = manager.query_by_keys(
+                    sql, [4, 1, 9, 4, 3], "id", ordered=True, chunk_size=2, strategy=strategy
+                )
+                assert [row["id"] for row in rows] == [4, 1, 3], strategy
+            # Las llaves que no son `{keys}` se dejan tal cual
+            rows = manager.query_by_keys(
+                "SELECT id FROM cliente WHERE ciudad <> '{x}' AND {keys}", [1, 2, 3], "id",
+                strategy="chunks",
+            )
+            assert sorted(row["id"] for row in rows) == [1, 3]
+            assert manager.query_by_keys(sql, [], "id") == []
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+def test_estrategia_array():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "q.db"))
+        manager = _manager(engine, _SentenciasArray)
+        try:
+            manager.query_by_keys(
+                "SELECT * FROM cliente c WHERE c.ciudad = :ciudad AND {keys}", [3, 1, 3], "c.id",
+                params={"ciudad": "x"}, strategy="array",
+            )
+            sql, params = manager.sent
+            assert sql == "SELECT * FROM cliente c WHERE c.ciudad = :ciudad AND c.id = ANY(:bk_keys)"
+            assert params == {"ciudad": "x", "bk_keys": [3, 1]}
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+def test_fetch_by_keys_con_auto_sql():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "q.db"))
+        manager = _manager(engine)
+        try:
+            clientes = manager.fetch_by_keys("SELECT * FROM cliente WHERE {keys}", [2, 5], "id", ordered=True)
+            assert [c.nombre for c in clientes] == ["luis", "juan"]
+            # Recién cargados: sin cambios pendientes, el UPDATE no se envía
+            assert all(c.get_changes() == {} for c in clientes)
+            assert manager.update(objmodel=clientes[0]) == 0
+
+            clientes[0].nombre = "luisa"
+            sql, params = manager._objmodel_statement("update", clientes[0])
+            assert params == {"nombre": "luisa", "id": 2}
+            assert manager.update(objmodel=clientes[0]) == 1
+            assert manager.execute_query("SELECT nombre, ciudad FROM cliente WHERE id = 2") == [
+                {"nombre": "luisa", "ciudad": "{x}"}
+            ]
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_estrategias_sqlite()
+    test_estrategia_array()
+    test_fetch_by_keys_con_auto_sql()
+    print("OK")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de BKManagerSharded con dos shards SQLite en ficheros temporales.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_sharded.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKManager.BKManagerSharded import BKManagerSharded, BKRangeRouter
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+
+class Cliente(BKModel):
+    id = BKColumn("id", int, primary_key=True)
+    nombre = BKColumn("nombre", str)
+
+
+class ClienteManager(BKManagerDB):
+    auto_sql = True
+    table = "cliente"
+
+    def get_sql_select(self):
+        return "SELECT id, nombre FROM cliente", {}
+
+
+def _crear_shard(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE cliente (id INTEGER PRIMARY KEY, nombre VARCHAR(64))")
+    engine.dispose()
+    return {"db_type": "SQLITE", "chain_connection": f"sqlite:///{path}"}
+
+
+def test_getlist_combina_los_shards():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shards = {
+            "s0": _crear_shard(os.path.join(tmpdir, "s0.db")),
+            "s1": _crear_shard(os.path.join(tmpdir, "s1.db")),
+        }
+        clientes = BKManagerSharded(
+            ClienteManager, shards, router=BKRangeRouter([(50, "s0"), (None, "s1")]), model=Cliente
+        )
+        try:
+            for key in (70, 3, 55, 41, 90, 12):
+                clientes.insert(objmodel=Cliente(id=key, nombre=f"c{key}"))
+
+            assert [c.id for c in clientes.getlist(order_by="id")] == [3, 12, 41, 55, 70, 90]
+            assert [c.id for c in clientes.getlist(order_by="-id", limit=2)] == [90, 70]
+            # Cada clave está solo en su shard
+            assert [c.id for c in clientes.managers["s0"].getlist()] == [3, 12, 41]
+            assert clientes.get_by_pk(55).nombre == "c55"
+        finally:
+            clientes.close()
+
+
+if __name__ == "__main__":
+    test_getlist_combina_los_shards()
+    print("OK")
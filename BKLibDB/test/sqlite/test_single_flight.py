@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de single-flight en execute_query sobre un fichero SQLite temporal.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_single_flight.py
+"""
+
+import os
+import tempfile
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKManager.BKSingleFlight import BKSingleFlight
+
+# Consulta de unas décimas de segundo, para que las llamadas coincidan
+LENTA = (
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000) "
+    "SELECT COUNT(*) AS total, :tag AS tag FROM n"
+)
+
+
+class ContadorManager(BKManagerDB):
+    pass
+
+
+def test_do_entrega_copias_a_todos():
+    flight = BKSingleFlight()
+    original = [{"a": 1}]
+    result = flight.do("k", lambda: original, share=lambda rows: [dict(row) for row in rows])
+    assert result == original and result is not original and result[0] is not original[0]
+
+
+def test_lecturas_concurrentes_agrupadas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 's.db')}")
+        flight = ContadorManager.enable_single_flight(timeout=30)
+        results = [None] * 6
+        start = threading.Barrier(len(results))
+
+        def reader(index):
+            manager = ContadorManager(session=sessionmaker(bind=engine)())
+            try:
+                start.wait()
+                rows = manager.execute_query(LENTA, {"tag": "x"})
+                # Cada llamador puede modificar sus filas sin afectar a los demás
+                rows[0]["tag"] = index
+                rows.append(index)
+                results[index] = rows
+            finally:
+                manager.session.close()
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(len(results))]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert results == [[{"total": 1000000, "tag": i}, i] for i in range(6)]
+            stats = flight.stats()
+            assert stats["calls"] + stats["shared"] == 6
+            assert stats["shared"] >= 1 and stats["in_flight"] == 0
+        finally:
+            ContadorManager.disable_single_flight()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_do_entrega_copias_a_todos()
+    test_lecturas_concurrentes_agrupadas()
+    print("OK")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de la inferencia de tipos de write_snapshot.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_snapshot.py
+"""
+
+import decimal
+import os
+import tempfile
+
+from BKLibDB.BKManager.BKSnapshot import BKSnapshot, write_snapshot
+
+
+def test_columna_nula_en_el_primer_lote():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "s.bksnap")
+        write_snapshot([[{"a": None}], [{"a": None}], [{"a": 5}]], path)
+        with BKSnapshot(path) as snap:
+            assert snap.meta["columns"][0]["kind"] == "int64"
+            assert [row["a"] for row in snap.iter_rows()] == [None, None, 5]
+
+
+def test_valor_de_otro_tipo_no_deja_temporal():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "s.bksnap")
+        for bad in (1.5, decimal.Decimal("1.1"), 2 ** 64):
+            try:
+                write_snapshot([[{"x": 1}], [{"x": bad}]], path)
+            except ValueError as e:
+                assert "'x'" in str(e)
+            else:
+                raise AssertionError(f"{bad!r} debería fallar en una columna int64")
+            assert os.listdir(tmpdir) == []
+
+
+if __name__ == "__main__":
+    test_columna_nula_en_el_primer_lote()
+    test_valor_de_otro_tipo_no_deja_temporal()
+    print("OK")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de BKManagerDB.upsert_many (ON CONFLICT) sobre un fichero SQLite temporal.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_upsert_many.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+
+class Producto(BKModel):
+    sku = BKColumn("sku", str, primary_key=True)
+    nombre = BKColumn("nombre", str)
+    stock = BKColumn("stock", int)
+
+
+class ProductoManager(BKManagerDB):
+    table = "producto"
+
+
+def _crear_bd(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE producto (sku VARCHAR(16) PRIMARY KEY, nombre VARCHAR(64), stock INTEGER)"
+        )
+    return engine
+
+
+def test_inserta_y_luego_actualiza():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "u.db"))
+        manager = ProductoManager(session=sessionmaker(bind=engine)(), model=Producto)
+        try:
+            rows = [Producto(sku=f"p{i}", nombre=f"n{i}", stock=i) for i in range(5)]
+            assert manager.upsert_many(rows, chunk_size=2) == 5
+
+            # Dos existentes (una como dict, sin `nombre`) y una nueva
+            assert manager.upsert_many([
+                Producto(sku="p1", nombre="uno", stock=10),
+                {"sku": "p3", "stock": 30},
+                Producto(sku="p9", nombre="n9", stock=9),
+            ]) == 3
+
+            result = manager.execute_query("SELECT sku, nombre, stock FROM producto ORDER BY sku")
+            assert result == [
+                {"sku": "p0", "nombre": "n0", "stock": 0},
+                {"sku": "p1", "nombre": "uno", "stock": 10},
+                {"sku": "p2", "nombre": "n2", "stock": 2},
+                {"sku": "p3", "nombre": "n3", "stock": 30},
+                {"sku": "p4", "nombre": "n4", "stock": 4},
+                {"sku": "p9", "nombre": "n9", "stock": 9},
+            ]
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+def test_requiere_claves():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "u.db"))
+        manager = ProductoManager(session=sessionmaker(bind=engine)())
+        try:
+            manager.upsert_many([{"sku": "p1", "stock": 1}])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("upsert_many sin modelo ni conflict_keys debería fallar")
+        finally:
+            manager.session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_inserta_y_luego_actualiza()
+    test_requiere_claves()
+    print("OK")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+Comprobación de BKWriteBehindBuffer sobre un fichero SQLite temporal.
+
+Uso:
+    python -m pytest BKLibDB/test/sqlite
+    python BKLibDB/test/sqlite/test_write_behind.py
+"""
+
+import os
+import tempfile
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from BKLibDB.BKManager.BKManagerDB import BKManagerDB
+from BKLibDB.BKModel.BKModel_Base import BKModel, BKColumn
+
+
+class Evento(BKModel):
+    id = BKColumn("id", int, primary_key=True)
+    texto = BKColumn("texto", str)
+
+
+class EventoManager(BKManagerDB):
+    auto_sql = True
+    table = "evento"
+
+    def get_sql_select(self):
+        return "SELECT id, texto FROM evento", {}
+
+
+def _crear_bd(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE evento (id INTEGER PRIMARY KEY, texto VARCHAR(64))")
+    return engine
+
+
+def _contar(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("SELECT COUNT(*) FROM evento").scalar()
+
+
+def test_futures_y_flush():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "wb.db"))
+        manager = EventoManager(session=sessionmaker(bind=engine)(), model=Evento)
+        EventoManager.enable_write_behind(engine, max_rows=10, max_delay_ms=20)
+        try:
+            futures = [manager.insert(objmodel=Evento(id=i, texto=f"e{i}")) for i in range(25)]
+            EventoManager.write_behind.flush(timeout=5)
+            assert all(future.done() for future in futures)
+            assert [future.result() for future in futures] == [1] * 25
+            assert _contar(engine) == 25
+        finally:
+            EventoManager.disable_write_behind()
+            manager.session.close()
+            engine.dispose()
+
+
+def test_close_concurrente_no_pierde_filas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = _crear_bd(os.path.join(tmpdir, "wb.db"))
+        manager = EventoManager(session=sessionmaker(bind=engine)(), model=Evento)
+        buffer = EventoManager.enable_write_behind(engine, max_rows=50, max_delay_ms=5)
+        sql, _ = manager._objmodel_statement("insert", Evento(id=0, texto=""))
+        futures, rejected = [], []
+        lock = threading.Lock()
+        start = threading.Barrier(5)
+
+        def producer(base):
+            start.wait()
+            for i in range(base, base + 500):
+                try:
+                    future = buffer.submit(manager, sql, {"id": i, "texto": f"e{i}"})
+                except RuntimeError:
+                    with lock:
+                        rejected.append(i)
+                    continue
+                with lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=producer, args=(n * 1000,)) for n in range(4)]
+        try:
+            for thread in threads:
+                thread.start()
+            start.wait()
+            buffer.close(timeout=10)
+            for thread in threads:
+                thread.join()
+            # Toda fila aceptada se resuelve: confirmada o con error, nunca pendiente
+            assert all(future.result(timeout=5) == 1 for future in futures)
+            assert _contar(engine) == len(futures)
+            assert len(futures) + len(rejected) == 2000
+        finally:
+            EventoManager.disable_write_behind()
+            manager.session.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_futures_y_flush()
+    test_close_concurrente_no_pierde_filas()
+    print("OK")
@@ -33,12 +33,22 @@ setup(
         "pyodbc>=5.2.0",             # SQL Server
         "oracledb>=3.1.0",           # Oracle database
         "SQLAlchemy>=2.0.36",        # ORM para bases de datos relacionales
-        "pymongo>=4.6.0",            # MongoDB
-        "cassandra-driver>=3.25.0",  # Cassandra
-        "redis>=5.0.1",              # Redis
-        "neo4j>=5.17.0",             # Neo4j
         "typing_extensions>=4.12.2", # Extensiones de tipado
     ],
+    # Drivers NoSQL opcionales: se importan solo al usar su backend
+    # (e.g., pip install BKLibDB[mongo,redis] o pip install BKLibDB[nosql])
+    extras_require={
+        "mongo": ["pymongo>=4.6.0"],
+        "cassandra": ["cassandra-driver>=3.25.0"],
+        "redis": ["redis>=5.0.1"],
+        "neo4j": ["neo4j>=5.17.0"],
+        "nosql": [
+            "pymongo>=4.6.0",
+            "cassandra-driver>=3.25.0",
+            "redis>=5.0.1",
+            "neo4j>=5.17.0",
+        ],
+    },
     include_package_data=True,  # Incluye archivos adicionales en MANIFEST.in
     project_urls={
         "Source": "https://github.com/theleerise/BKLibDB.git",